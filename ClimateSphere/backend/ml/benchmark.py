@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+ClimateSphere ML API - latency and throughput benchmark
+Runs fixed, seeded request mixes against the API at set concurrency levels
+and batch sizes, writes the results as JSON and compares them with a stored
+baseline (exit status 1 on a regression).
+
+    python benchmark.py                          # in-process (Flask test client)
+    python benchmark.py --serve-workers 4        # real pre-fork server on a free port
+    python benchmark.py --save-baseline          # record benchmarks/baseline.json
+"""
+
+import argparse
+import http.client
+import io
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from datetime import datetime
+
+import numpy as np
+
+ML_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCHMARK_DIR = os.path.join(ML_DIR, 'benchmarks')
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'baseline.json')
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIR, 'latest.json')
+
+
+# ---------------------------------------------------------------- workloads
+
+def random_conditions(rng):
+    return {
+        'temperature': round(float(rng.uniform(-5, 45)), 2),
+        'rainfall': round(float(rng.uniform(0, 300)), 2),
+        'humidity': round(float(rng.uniform(10, 100)), 2),
+        'co2_level': round(float(rng.uniform(350, 600)), 2)
+    }
+
+
+def json_body(payload):
+    return json.dumps(payload).encode(), {'Content-Type': 'application/json'}
+
+
+def predict_payload(rng, batch_rows):
+    return json_body(random_conditions(rng))
+
+
+def future_payload(rng, batch_rows):
+    conditions = random_conditions(rng)
+    return json_body({
+        'year': int(rng.integers(2025, 2101)),
+        'base_temperature': conditions['temperature'],
+        'base_rainfall': conditions['rainfall'],
+        'base_humidity': conditions['humidity'],
+        'base_co2': conditions['co2_level']
+    })
+
+
+def future_range_payload(rng, batch_rows):
+    conditions = random_conditions(rng)
+    return json_body({
+        'year_range': {'start': 2025, 'end': 2100},
+        'base_temperature': conditions['temperature'],
+        'base_rainfall': conditions['rainfall'],
+        'base_humidity': conditions['humidity'],
+        'base_co2': conditions['co2_level']
+    })
+
+
+def scenario_payload(rng, batch_rows):
+    return json_body({
+        'co2_change': round(float(rng.uniform(-50, 100)), 1),
+        'deforestation': round(float(rng.uniform(0, 100)), 1),
+        'renewable_energy': round(float(rng.uniform(0, 100)), 1)
+    })
+
+
+def scenario_grid_payload(rng, batch_rows):
+    steps = round(batch_rows ** (1 / 3))
+    return json_body({'axes': {
+        'co2_change': {'min': -50, 'max': 100, 'steps': steps},
+        'deforestation': {'min': 0, 'max': 100, 'steps': steps},
+        'renewable_energy': {'min': float(rng.uniform(0, 10)), 'max': 100, 'steps': steps}
+    }})
+
+
+def batch_columns(rng, batch_rows):
+    return {
+        'temperature': np.round(rng.uniform(-5, 45, batch_rows), 2),
+        'rainfall': np.round(rng.uniform(0, 300, batch_rows), 2),
+        'humidity': np.round(rng.uniform(10, 100, batch_rows), 2),
+        'co2_level': np.round(rng.uniform(350, 600, batch_rows), 2)
+    }
+
+
+def batch_json_payload(rng, batch_rows):
+    return json_body({name: values.tolist() for name, values in batch_columns(rng, batch_rows).items()})
+
+
+def batch_npy_payload(rng, batch_rows):
+    columns = batch_columns(rng, batch_rows)
+    buffer = io.BytesIO()
+    np.save(buffer, np.column_stack([columns[name] for name in ('temperature', 'rainfall', 'humidity', 'co2_level')]))
+    return buffer.getvalue(), {'Content-Type': 'application/x-npy', 'Accept': 'application/x-npy'}
+
+
+# name, path, payload builder, batch sizes (None for single-row routes)
+WORKLOADS = [
+    ('predict', '/predict', predict_payload, [None]),
+    ('future', '/future', future_payload, [None]),
+    ('future_range', '/future', future_range_payload, [None]),
+    ('scenario', '/scenario', scenario_payload, [None]),
+    ('predict_batch', '/predict/batch', batch_json_payload, [100, 1000, 10000]),
+    ('predict_batch_npy', '/predict/batch', batch_npy_payload, [1000, 10000]),
+    ('scenario_grid', '/scenario/grid', scenario_grid_payload, [1000, 8000])
+]
+
+
+# ---------------------------------------------------------------- transports
+
+class InProcessTransport:
+    """Calls the Flask app directly through its test client"""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, path, body, headers):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.post(path, data=body, headers=headers)
+        return response.status_code, len(response.data)
+
+
+class HttpTransport:
+    """HTTP/1.1 client with one connection per thread (reopened as needed)"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self._local = threading.local()
+
+    def request(self, path, body, headers):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(self.host, self.port, timeout=120)
+        try:
+            connection.request('POST', path, body=body, headers=headers)
+            response = connection.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            raise
+        return response.status, len(data)
+
+
+# ---------------------------------------------------------------- runner
+
+def run_level(transport, requests, concurrency):
+    """Send ``requests`` (path, body, headers) with ``concurrency`` threads"""
+    latencies = np.zeros(len(requests))
+    statuses = [None] * len(requests)
+    next_index = iter(range(len(requests)))
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                index = next(next_index, None)
+            if index is None:
+                return
+            path, body, headers = requests[index]
+            started = time.perf_counter()
+            try:
+                statuses[index], _ = transport.request(path, body, headers)
+            except Exception:
+                statuses[index] = 'error'
+            latencies[index] = time.perf_counter() - started
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies_ms = latencies * 1000.0
+    errors = sum(status != 200 for status in statuses)
+    return {
+        'requests': len(requests),
+        'errors': errors,
+        'seconds': round(elapsed, 4),
+        'throughput_rps': round(len(requests) / elapsed, 2),
+        'latency_ms': {
+            'mean': round(float(latencies_ms.mean()), 3),
+            'p50': round(float(np.percentile(latencies_ms, 50)), 3),
+            'p95': round(float(np.percentile(latencies_ms, 95)), 3),
+            'p99': round(float(np.percentile(latencies_ms, 99)), 3),
+            'max': round(float(latencies_ms.max()), 3)
+        }
+    }
+
+
+def run_benchmarks(transport, concurrency_levels, n_requests, n_batch_requests, workloads, seed=0, warmup=10):
+    results = []
+    for name, path, build_payload, batch_sizes in WORKLOADS:
+        if workloads and name not in workloads:
+            continue
+        for batch_rows in batch_sizes:
+            count = n_requests if batch_rows is None else n_batch_requests
+            for concurrency in concurrency_levels:
+                # Same seed per case, so every run (and the baseline) sends identical bodies
+                rng = np.random.default_rng([seed, len(results)])
+                requests = [(path,) + build_payload(rng, batch_rows) for _ in range(count + warmup)]
+                run_level(transport, requests[:warmup], concurrency)
+                result = run_level(transport, requests[warmup:], concurrency)
+                result.update(name=name, route=path, batch_rows=batch_rows, concurrency=concurrency)
+                if batch_rows:
+                    result['rows_per_second'] = round(result['throughput_rps'] * batch_rows, 1)
+                results.append(result)
+                print(f"⏱️ {case_key(result):<38} {result['throughput_rps']:>9.1f} req/s  "
+                      f"p50 {result['latency_ms']['p50']:>8.2f} ms  p99 {result['latency_ms']['p99']:>8.2f} ms"
+                      + (f"  ({result['errors']} errors)" if result['errors'] else ''))
+    return results
+
+
+def case_key(result):
+    rows = f"[{result['batch_rows']} rows]" if result.get('batch_rows') else ''
+    return f"{result['name']}{rows} c={result['concurrency']}"
+
+
+# ---------------------------------------------------------------- memory
+
+def process_memory(pid):
+    """RSS and PSS (shared pages split between processes) in bytes, Linux only"""
+    memory = {'pid': pid, 'rss_bytes': None, 'pss_bytes': None}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                key, value = line.split(':', 1)
+                if key in ('Rss', 'Pss'):
+                    memory[f'{key.lower()}_bytes'] = int(value.split()[0]) * 1024
+    except (OSError, ValueError):
+        pass
+    return memory
+
+
+def child_pids(pid):
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+
+# ---------------------------------------------------------------- server mode
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers, port, timeout=180):
+    """Launch serve.py and wait until /ready answers 200"""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ML_DIR, 'serve.py'), '--host', '127.0.0.1', '--port', str(port),
+         '--workers', str(workers), '--no-pin'],
+        cwd=ML_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'serve.py exited with status {process.returncode}')
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/ready', timeout=5) as response:
+                if response.status == 200 and len(child_pids(process.pid)) >= workers:
+                    return process
+        except OSError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError('serve.py did not become ready in time')
+
+
+# ---------------------------------------------------------------- baseline
+
+def compare_reports(report, baseline, tolerance):
+    """Regressions versus ``baseline``: slower p99, lower throughput, more errors or memory"""
+    previous = {case_key(result): result for result in baseline.get('results', [])}
+    regressions = []
+    for result in report['results']:
+        before = previous.get(case_key(result))
+        if before is None:
+            continue
+        p99, p99_before = result['latency_ms']['p99'], before['latency_ms']['p99']
+        if p99 > p99_before * (1 + tolerance):
+            regressions.append(f"{case_key(result)}: p99 {p99_before:.2f} -> {p99:.2f} ms")
+        if result['throughput_rps'] < before['throughput_rps'] * (1 - tolerance):
+            regressions.append(f"{case_key(result)}: throughput {before['throughput_rps']:.1f} -> "
+                               f"{result['throughput_rps']:.1f} req/s")
+        if result['errors'] > before['errors']:
+            regressions.append(f"{case_key(result)}: errors {before['errors']} -> {result['errors']}")
+
+    memory = report['memory']['per_worker']
+    memory_before = baseline.get('memory', {}).get('per_worker', {})
+    for key in ('rss_bytes', 'pss_bytes'):
+        now, then = memory.get(key), memory_before.get(key)
+        if now and then and now > then * (1 + tolerance):
+            regressions.append(f"memory per worker: {key} {then / 2**20:.1f} -> {now / 2**20:.1f} MiB")
+    return regressions
+
+
+def mean_worker_memory(workers):
+    memory = {}
+    for key in ('rss_bytes', 'pss_bytes'):
+        values = [worker[key] for worker in workers if worker.get(key)]
+        memory[key] = int(np.mean(values)) if values else None
+    return memory
+
+
+def environment():
+    versions = {}
+    for module in ('numpy', 'sklearn', 'flask', 'xgboost'):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            versions[module] = None
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ML_DIR, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'versions': versions,
+        'ml_settings': {key: value for key, value in sorted(os.environ.items()) if key.startswith('ML_')}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the ClimateSphere ML API')
+    parser.add_argument('--concurrency', default='1,4,16', help='comma-separated concurrency levels')
+    parser.add_argument('--requests', type=int, default=200, help='timed requests per single-row case')
+    parser.add_argument('--batch-requests', type=int, default=20, help='timed requests per batch case')
+    parser.add_argument('--workloads', default='', help='comma-separated subset of: '
+                        + ', '.join(name for name, *_ in WORKLOADS))
+    parser.add_argument('--serve-workers', type=int, default=0,
+                        help='benchmark a serve.py server with this many workers instead of in-process')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed relative slowdown / memory growth before a case counts as a regression')
+    args = parser.parse_args()
+
+    concurrency_levels = [int(level) for level in args.concurrency.split(',') if level]
+    workloads = [name for name in args.workloads.split(',') if name]
+    report = {'environment': environment()}
+
+    server = None
+    if args.serve_workers:
+        port = free_port()
+        print(f"🚀 Starting serve.py with {args.serve_workers} workers on port {port}...")
+        server = start_server(args.serve_workers, port)
+        transport = HttpTransport('127.0.0.1', port)
+        report['mode'] = {'transport': 'http', 'workers': args.serve_workers}
+    else:
+        sys.path.insert(0, ML_DIR)
+        import prediction_api
+        prediction_api.warm_up()
+        transport = InProcessTransport(prediction_api.app)
+        report['mode'] = {'transport': 'in-process', 'workers': 1}
+
+    try:
+        results = run_benchmarks(transport, concurrency_levels, args.requests, args.batch_requests, workloads,
+                                 seed=args.seed)
+        pids = child_pids(server.pid) if server else [os.getpid()]
+        workers = [process_memory(pid) for pid in pids]
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=60)
+
+    report['results'] = results
+    report['memory'] = {'workers': workers, 'per_worker': mean_worker_memory(workers)}
+    per_worker = report['memory']['per_worker']
+    if per_worker['rss_bytes']:
+        print(f"🧠 Memory per worker: RSS {per_worker['rss_bytes'] / 2**20:.1f} MiB"
+              + (f", PSS {per_worker['pss_bytes'] / 2**20:.1f} MiB" if per_worker['pss_bytes'] else ''))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"📁 Results written to {args.output}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📌 Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"ℹ️ No baseline at {args.baseline}; run with --save-baseline to record one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('mode') != report['mode']:
+        print(f"⚠️ Baseline was recorded in mode {baseline.get('mode')}, this run is {report['mode']}")
+    regressions = compare_reports(report, baseline, args.tolerance)
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) against {args.baseline} (tolerance {args.tolerance:.0%}):")
+        for regression in regressions:
+            print(f"   {regression}")
+        return 1
+    print(f"✅ No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Binary columnar payloads for the ClimateSphere ML API
+Batch routes can exchange NumPy .npy buffers instead of JSON: request bodies
+are decoded in place (no parse, no copy) and results go back as one
+structured array with a field per column
+"""
+
+import io
+
+import numpy as np
+
+NPY_MIMETYPE = 'application/x-npy'
+JSON_MIMETYPE = 'application/json'
+
+# Risk level codes used in binary responses (index into RISK_LEVEL_NAMES)
+RISK_LEVEL_NAMES = ('Low', 'Medium', 'High')
+
+
+class PayloadError(ValueError):
+    """Raised for binary payloads that cannot be decoded"""
+
+
+def wants_npy(accept_mimetypes):
+    """True when the client's Accept header prefers .npy over JSON"""
+    return accept_mimetypes.best_match([JSON_MIMETYPE, NPY_MIMETYPE]) == NPY_MIMETYPE
+
+
+def decode_npy(buffer):
+    """View an .npy byte buffer as an array without copying the data.
+
+    The result is read-only and shares memory with ``buffer``. Object dtypes
+    are rejected (they would require unpickling untrusted input).
+    """
+    stream = io.BytesIO(buffer)
+    try:
+        version = np.lib.format.read_magic(stream)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+    except ValueError as e:
+        raise PayloadError(f'not a valid .npy buffer: {e}')
+    if dtype.hasobject:
+        raise PayloadError('object arrays are not accepted')
+
+    count = int(np.prod(shape, dtype=np.int64))
+    offset = stream.tell()
+    if len(buffer) - offset < count * dtype.itemsize:
+        raise PayloadError('.npy buffer is truncated')
+    array = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+    return array.reshape(shape, order='F' if fortran_order else 'C')
+
+
+def npy_columns(array, names):
+    """Split a decoded array into named 1-D column views.
+
+    Accepts a structured array (fields are matched by name, any subset of
+    ``names``) or a 2-D numeric array whose columns are in ``names`` order.
+    """
+    if array.dtype.names:
+        unknown = set(array.dtype.names) - set(names)
+        if unknown:
+            raise PayloadError(f"unknown fields {sorted(unknown)}, expected some of {list(names)}")
+        if array.ndim != 1:
+            raise PayloadError('structured arrays must be 1-D')
+        return {name: array[name] for name in array.dtype.names}
+    if array.ndim != 2 or array.shape[1] != len(names):
+        raise PayloadError(f'expected an N×{len(names)} array with columns {list(names)}')
+    if not np.issubdtype(array.dtype, np.number):
+        raise PayloadError(f'expected numeric data, got {array.dtype}')
+    return {name: array[:, i] for i, name in enumerate(names)}
+
+
+def risk_level_codes(probabilities):
+    """Probabilities -> int8 codes into RISK_LEVEL_NAMES (-1 where NaN)"""
+    codes = np.where(probabilities > 0.7, 2, np.where(probabilities > 0.4, 1, 0)).astype(np.int8)
+    codes[np.isnan(probabilities)] = -1
+    return codes
+
+
+def encode_npy(columns, shape=None):
+    """Serialize named equal-length columns as one structured .npy buffer.
+
+    ``shape`` reshapes the records (e.g. to a scenario grid's axes).
+    """
+    dtype = np.dtype([(name, values.dtype) for name, values in columns.items()])
+    n_rows = len(next(iter(columns.values()))) if columns else 0
+    records = np.empty(n_rows, dtype=dtype)
+    for name, values in columns.items():
+        records[name] = values
+    if shape is not None:
+        records = records.reshape(shape)
+    output = io.BytesIO()
+    np.lib.format.write_array(output, records, allow_pickle=False)
+    return output.getvalue()
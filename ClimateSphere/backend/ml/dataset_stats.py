@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Dataset statistics sidecars
+Computes summary statistics for a climate CSV in one chunked pass and caches
+them next to the file as <name>.csv.stats.json, keyed by size, mtime and hash
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+SIDECAR_SUFFIX = '.stats.json'
+CHUNK_ROWS = 100000
+RISK_COLUMNS = {'flood': 'Flood_Risk', 'drought': 'Drought_Risk', 'heatwave': 'Heatwave_Risk'}
+
+
+def sidecar_path(csv_path):
+    return csv_path + SIDECAR_SUFFIX
+
+
+def file_fingerprint(csv_path, with_hash=True):
+    """Size, mtime and (optionally) SHA-256 of a file"""
+    stat = os.stat(csv_path)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(csv_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        fingerprint['sha256'] = digest.hexdigest()
+    return fingerprint
+
+
+class StatsAccumulator:
+    """Summary statistics built up one chunk (DataFrame) at a time"""
+
+    def __init__(self):
+        self.total_records = 0
+        self.columns = None
+        self.regions = {}
+        self.date_min = self.date_max = None
+        self.numeric = {}
+        self.risk_sums = {name: 0 for name in RISK_COLUMNS}
+
+    def add(self, chunk):
+        if self.columns is None:
+            self.columns = chunk.columns.tolist()
+        self.total_records += len(chunk)
+
+        if 'Region' in chunk.columns:
+            for region in chunk['Region'].dropna().unique():
+                self.regions.setdefault(region, None)
+
+        if 'Date' in chunk.columns:
+            dates = chunk['Date'].dropna().astype(str)
+            if len(dates):
+                self.date_min = min(self.date_min, dates.min()) if self.date_min is not None else dates.min()
+                self.date_max = max(self.date_max, dates.max()) if self.date_max is not None else dates.max()
+
+        for column in chunk.select_dtypes(include='number').columns:
+            values = chunk[column]
+            summary = self.numeric.setdefault(column, {'min': None, 'max': None, 'sum': 0.0, 'count': 0})
+            count = int(values.count())
+            if count == 0:
+                continue
+            column_min, column_max = float(values.min()), float(values.max())
+            summary['min'] = column_min if summary['min'] is None else min(summary['min'], column_min)
+            summary['max'] = column_max if summary['max'] is None else max(summary['max'], column_max)
+            summary['sum'] += float(values.sum())
+            summary['count'] += count
+
+        for name, column in RISK_COLUMNS.items():
+            if column in chunk.columns:
+                self.risk_sums[name] += int(chunk[column].sum())
+
+    def stats(self):
+        numeric_columns = {
+            column: {
+                'min': summary['min'],
+                'max': summary['max'],
+                'mean': summary['sum'] / summary['count'] if summary['count'] else None
+            }
+            for column, summary in self.numeric.items()
+        }
+        temperature = numeric_columns.get('Temperature_C', {})
+
+        return {
+            'total_records': self.total_records,
+            'regions': list(self.regions),
+            'date_range': {'start': self.date_min, 'end': self.date_max},
+            'features': self.columns or [],
+            'temperature_range': {'min': temperature.get('min'), 'max': temperature.get('max')},
+            'risk_distribution': self.risk_sums,
+            'numeric_columns': numeric_columns
+        }
+
+
+def compute_dataset_stats(csv_path, chunk_rows=CHUNK_ROWS):
+    """Summary statistics for a CSV, read in fixed-size chunks"""
+    accumulator = StatsAccumulator()
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_rows):
+        accumulator.add(chunk)
+    return accumulator.stats()
+
+
+def write_stats_sidecar(csv_path, stats=None):
+    """Compute (unless given) and atomically write the sidecar for ``csv_path``"""
+    if stats is None:
+        stats = compute_dataset_stats(csv_path)
+    payload = {'source': file_fingerprint(csv_path), 'stats': stats}
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(csv_path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(payload, f, indent=2)
+        os.replace(tmp_path, sidecar_path(csv_path))
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return stats
+
+
+def load_dataset_stats(csv_path):
+    """Return (stats, from_sidecar), recomputing only when the CSV changed.
+
+    A matching size and mtime is trusted; a matching size with a new mtime is
+    resolved by comparing the content hash.
+    """
+    try:
+        with open(sidecar_path(csv_path), 'r') as f:
+            payload = json.load(f)
+        source = payload['source']
+        current = file_fingerprint(csv_path, with_hash=False)
+        if source['size'] == current['size']:
+            if source['mtime_ns'] == current['mtime_ns']:
+                return payload['stats'], True
+            if file_fingerprint(csv_path)['sha256'] == source['sha256']:
+                # Same bytes, new mtime: refresh the key without recomputing
+                _try_write_sidecar(csv_path, payload['stats'])
+                return payload['stats'], True
+    except (FileNotFoundError, ValueError, KeyError):
+        pass
+    return _try_write_sidecar(csv_path, compute_dataset_stats(csv_path)), False
+
+
+def _try_write_sidecar(csv_path, stats):
+    """Write the sidecar if the directory allows it; stats are returned either way"""
+    try:
+        write_stats_sidecar(csv_path, stats)
+    except OSError as e:
+        print(f"⚠️ Could not write stats sidecar for {csv_path}: {e}")
+    return stats
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Usage: python dataset_stats.py <dataset.csv> [more.csv ...]")
+        sys.exit(1)
+    for path in sys.argv[1:]:
+        stats = write_stats_sidecar(path)
+        print(f"📁 {sidecar_path(path)}: {stats['total_records']:,} records")
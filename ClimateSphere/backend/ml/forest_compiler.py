@@ -0,0 +1,129 @@
+"""
+Forest compiler for the ClimateSphere ML API
+Flattens sklearn RandomForest classifiers into contiguous NumPy arrays and
+evaluates every tree for a whole batch at once
+"""
+
+import numpy as np
+
+# Rows traversed per step; keeps the (rows × trees) index arrays small
+CHUNK_ROWS = 8192
+
+
+class CompiledForest:
+    """Array form of a fitted RandomForestClassifier.
+
+    All trees share flat ``feature``/``threshold``/``left``/``right`` arrays;
+    leaves point to themselves so a fixed number of steps (the max depth)
+    walks every row down every tree without branching. Leaf class
+    probabilities are normalized and averaged exactly as sklearn does, so
+    ``predict_proba`` matches the original model bit for bit.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, classes, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        # Interleaved [left, right] pairs so one lookup picks the next node
+        self.children = np.stack([left, right], axis=1).ravel()
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+
+    def _leaves(self, X):
+        """Return the leaf index reached in every tree, shape (rows, trees)"""
+        flat = X.ravel()
+        row_offsets = (np.arange(X.shape[0]) * X.shape[1])[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], len(self.roots)))
+        for _ in range(self.max_depth):
+            goes_right = np.take(flat, row_offsets + np.take(self.feature, nodes)) > np.take(self.threshold, nodes)
+            nodes = np.take(self.children, nodes * 2 + goes_right)
+        return nodes
+
+    def predict_proba(self, X):
+        """Class probabilities for an N×F matrix, identical to sklearn's.
+
+        NaN inputs are not supported (sklearn routes them per split); callers
+        should fall back to the original model for those rows.
+        """
+        # sklearn's trees compare float32 inputs against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f'Expected a 2-D array with {self.n_features_in_} features')
+
+        proba = np.empty((X.shape[0], len(self.classes_)), dtype=np.float64)
+        for start in range(0, X.shape[0], CHUNK_ROWS):
+            chunk = X[start:start + CHUNK_ROWS]
+            tree_proba = self.value[self._leaves(chunk)]  # (rows, trees, classes)
+            # Accumulate tree by tree, in order, like sklearn does
+            proba[start:start + CHUNK_ROWS] = np.cumsum(tree_proba, axis=1)[:, -1]
+        proba /= len(self.roots)
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+
+def compile_forest(model):
+    """Compile a fitted RandomForestClassifier; returns None for other models"""
+    estimators = getattr(model, 'estimators_', None)
+    if not estimators or not hasattr(model, 'classes_') or getattr(model, 'n_outputs_', 1) != 1:
+        return None
+    if not all(hasattr(estimator, 'tree_') for estimator in estimators):
+        return None
+
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in estimators:
+        tree = estimator.tree_
+        n_nodes = tree.node_count
+        node_ids = np.arange(offset, offset + n_nodes, dtype=np.intp)
+        is_leaf = tree.children_left == -1
+
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.intp))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+        lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+        rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+
+        # Per-node class probabilities, normalized the way DecisionTreeClassifier does
+        value = tree.value[:, 0, :len(model.classes_)].astype(np.float64)
+        normalizer = value.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        values.append(value / normalizer)
+
+        roots.append(offset)
+        max_depth = max(max_depth, tree.max_depth)
+        offset += n_nodes
+
+    return CompiledForest(
+        feature=np.concatenate(features),
+        threshold=np.concatenate(thresholds),
+        left=np.concatenate(lefts).astype(np.intp),
+        right=np.concatenate(rights).astype(np.intp),
+        value=np.concatenate(values),
+        roots=np.array(roots, dtype=np.intp),
+        max_depth=max_depth,
+        classes=np.asarray(model.classes_),
+        n_features=model.n_features_in_
+    )
+
+
+def verify_compiled(model, compiled, n_samples=512, seed=0):
+    """Check the compiled forest reproduces ``model.predict_proba`` exactly"""
+    rng = np.random.default_rng(seed)
+    # Probe each feature across the range of its split thresholds (standardized
+    # or raw units), so every split is exercised in both directions
+    low = np.full(compiled.n_features_in_, -3.0)
+    high = np.full(compiled.n_features_in_, 3.0)
+    splits = np.isfinite(compiled.threshold)
+    for column in range(compiled.n_features_in_):
+        thresholds = compiled.threshold[splits & (compiled.feature == column)]
+        if len(thresholds):
+            low[column] = thresholds.min() - 1.0
+            high[column] = thresholds.max() + 1.0
+    probe = rng.uniform(low, high, size=(n_samples, compiled.n_features_in_))
+    return np.array_equal(model.predict_proba(probe), compiled.predict_proba(probe))
@@ -0,0 +1,78 @@
+"""
+Parallel per-model inference for the ClimateSphere ML API
+Fans one feature matrix out to every model on a shared thread pool, so a
+request takes as long as its slowest model rather than the sum of all of
+them (sklearn and xgboost release the GIL while walking their trees)
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def available_cpu_count():
+    """CPUs this process may run on (respects affinity pinning)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+class InferenceExecutor:
+    """Runs ``fn(name, model)`` for several models at once and gathers the results.
+
+    The calling thread scores one model itself while the pool handles the
+    rest. Execution is serial when ``serial`` is set, when only one model is
+    given, when the process may only use one CPU (e.g. a pinned serve.py
+    worker), or when the caller's expected ``cost`` of all model calls (in
+    seconds) is under ``min_cost``, too little to outweigh the hand-off to
+    another thread.
+    """
+
+    def __init__(self, max_workers=None, serial=False, min_cost=0.002):
+        self.max_workers = max_workers
+        self.serial = serial
+        self.min_cost = min_cost
+        self._pool = None
+        self._workers = None
+        self._lock = threading.Lock()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        # Pool threads do not survive fork, and the child may be pinned to fewer CPUs
+        self._pool = None
+        self._workers = None
+        self._lock = threading.Lock()
+
+    def workers(self):
+        if self._workers is None:
+            self._workers = self.max_workers or available_cpu_count()
+        return self._workers
+
+    @property
+    def parallel(self):
+        return not self.serial and self.workers() > 1
+
+    def pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers(), thread_name_prefix='inference')
+        return self._pool
+
+    def map(self, fn, models, cost=None):
+        """``{name: fn(name, model)}`` for a dict of models, preserving order"""
+        items = list(models.items())
+        if len(items) <= 1 or not self.parallel or (cost is not None and cost < self.min_cost):
+            return {name: fn(name, model) for name, model in items}
+        pool = self.pool()
+        futures = [(name, pool.submit(fn, name, model)) for name, model in items[1:]]
+        first_name, first_model = items[0]
+        results = {first_name: fn(first_name, first_model)}
+        for name, future in futures:
+            results[name] = future.result()
+        return results
+
+    def status(self):
+        return {'parallel': self.parallel, 'workers': self.workers(), 'serial_forced': self.serial,
+                'min_cost_ms': self.min_cost * 1000}
@@ -0,0 +1,203 @@
+"""
+Inference pipelines for the ClimateSphere risk models
+One artifact per model holds the whole path from API inputs to a probability:
+feature derivation, scaling and the estimator. For tree ensembles the
+StandardScaler is folded into the split thresholds when the pipeline is
+built, so serving feeds raw feature values straight to the trees.
+
+Folding is exact for float32 inputs only: a float64 value next to a split
+can round to the other side of the folded threshold. A fold is therefore
+only kept after it is checked on sample rows (held-out rows at export,
+a fixed probe at load time) and drifts no more than FOLD_TOLERANCE.
+"""
+
+import copy
+
+import numpy as np
+
+# Columns the risk models are trained on, in training order
+FEATURE_COLUMNS = [
+    'Rainfall_mm', 'Temperature_C', 'Soil_Moisture', 'Humidity_%',
+    'Wind_Speed_mps', 'CO2_ppm', 'Evaporation_mm_day', 'Rainfall_Lag_mm',
+    'Heat_Index', 'Drought_Index'
+]
+
+# Bumped whenever derive_features changes; pipelines record the version they
+# were exported with and are rejected by serving when it differs
+DERIVATION_VERSION = 1
+
+# Expected values of the random terms in create_complete_dataset.py
+MEAN_WIND_SPEED = 12.0        # np.random.normal(12, 4)
+RAINFALL_LAG_RATIO = 0.775    # np.random.uniform(0.6, 0.95)
+
+# Largest probability difference from scaling + the estimator that a folded
+# pipeline may show on the check rows before export keeps the scaler instead
+FOLD_TOLERANCE = 0.02
+
+
+def derive_features(rainfall, temperature, humidity, co2_level):
+    """Build the N×10 training feature matrix from the four API inputs.
+
+    Accepts scalars or equal-length arrays in raw units (mm, °C, %, ppm).
+    Columns the API does not receive are derived with the relationships the
+    dataset generator uses, taking the mean for its noise terms.
+    """
+    rainfall = np.atleast_1d(np.asarray(rainfall, dtype=float))
+    temperature = np.atleast_1d(np.asarray(temperature, dtype=float))
+    humidity = np.atleast_1d(np.asarray(humidity, dtype=float))
+    co2_level = np.atleast_1d(np.asarray(co2_level, dtype=float))
+
+    n_rows = max(len(rainfall), len(temperature), len(humidity), len(co2_level))
+    features = np.empty((n_rows, len(FEATURE_COLUMNS)), dtype=float)
+    features[:, 0] = rainfall                                                  # Rainfall_mm
+    features[:, 1] = temperature                                               # Temperature_C
+    features[:, 2] = np.clip(humidity * 0.7 + rainfall * 0.08, 0, 100)         # Soil_Moisture
+    features[:, 3] = humidity                                                  # Humidity_%
+    features[:, 4] = MEAN_WIND_SPEED                                           # Wind_Speed_mps
+    features[:, 5] = co2_level                                                 # CO2_ppm
+    features[:, 6] = np.maximum(0, temperature * 0.25 + MEAN_WIND_SPEED * 0.15)  # Evaporation_mm_day
+    features[:, 7] = rainfall * RAINFALL_LAG_RATIO                             # Rainfall_Lag_mm
+    features[:, 8] = temperature + (humidity / 100) * 5                        # Heat_Index
+    features[:, 9] = np.maximum(0, 100 - rainfall - humidity / 2)              # Drought_Index
+    return features
+
+
+class InferencePipeline:
+    """Feature derivation, optional scaling and an estimator, saved as one file.
+
+    ``predict_proba`` takes the feature matrix from ``derive_features``;
+    ``predict_conditions`` takes the raw API inputs. ``scaler`` is None when
+    it has been folded into the estimator.
+    """
+
+    def __init__(self, estimator, scaler=None, feature_columns=FEATURE_COLUMNS,
+                 derivation_version=DERIVATION_VERSION, metadata=None):
+        self.estimator = estimator
+        self.scaler = scaler
+        self.feature_columns = list(feature_columns)
+        self.derivation_version = derivation_version
+        self.metadata = dict(metadata or {})
+
+    @property
+    def fused(self):
+        return self.scaler is None
+
+    @property
+    def classes_(self):
+        return self.estimator.classes_
+
+    @property
+    def n_features_in_(self):
+        return len(self.feature_columns)
+
+    def fused_estimator(self):
+        """The estimator, if it takes unscaled features directly (else None)"""
+        return self.estimator if self.fused else None
+
+    def transform(self, features):
+        features = np.asarray(features, dtype=float)
+        return features if self.scaler is None else self.scaler.transform(features)
+
+    def predict_proba(self, features):
+        return self.estimator.predict_proba(self.transform(features))
+
+    def predict(self, features):
+        return self.estimator.predict(self.transform(features))
+
+    def predict_conditions(self, rainfall, temperature, humidity, co2_level):
+        """Risk probabilities straight from the raw API inputs"""
+        return self.predict_proba(derive_features(rainfall, temperature, humidity, co2_level))[:, 1]
+
+    def compatible(self):
+        """True when this pipeline expects the features derive_features builds"""
+        return self.feature_columns == FEATURE_COLUMNS and self.derivation_version == DERIVATION_VERSION
+
+
+def _ordered_keys(values):
+    """float32 values -> integers in the same order (for bisection over floats)"""
+    bits = values.view(np.int32).astype(np.int64)
+    return np.where(bits < 0, -(bits & 0x7FFFFFFF), bits)
+
+
+def _from_ordered_keys(keys):
+    bits = np.where(keys < 0, (-keys) | 0x80000000, keys)
+    return bits.astype(np.uint32).view(np.float32)
+
+
+def unscaled_thresholds(threshold, mean, scale):
+    """Thresholds ``t'`` on raw values equivalent to ``t`` on standardized ones.
+
+    sklearn trees compare float32 inputs; ``t'`` is the largest float32 ``x``
+    with ``float32((x - mean) / scale) <= t``, found by bisection over the
+    float32 range, so the folded split agrees with scaling and then
+    splitting for every float32-representable input.
+    """
+    threshold = np.asarray(threshold, dtype=np.float64)
+
+    def goes_left(keys):
+        x = _from_ordered_keys(keys).astype(np.float64)
+        with np.errstate(invalid='ignore', over='ignore'):
+            return ((x - mean) / scale).astype(np.float32) <= threshold
+
+    low = np.full(threshold.shape, _ordered_keys(np.array([-np.inf], dtype=np.float32))[0])
+    high = np.full(threshold.shape, _ordered_keys(np.array([np.inf], dtype=np.float32))[0])
+    while np.any(high - low > 1):
+        middle = (low + high) // 2
+        left = goes_left(middle)
+        low = np.where(left, middle, low)
+        high = np.where(left, high, middle)
+    return _from_ordered_keys(low).astype(np.float64)
+
+
+def fold_scaler(estimator, scaler):
+    """Copy of a fitted tree ensemble whose splits apply to unscaled features.
+
+    Supports StandardScaler in front of sklearn tree ensembles (or single
+    trees); returns None for anything else.
+    """
+    if type(scaler).__name__ != 'StandardScaler':
+        return None
+    trees = getattr(estimator, 'estimators_', None)
+    if trees is None and hasattr(estimator, 'tree_'):
+        trees = [estimator]
+    if not trees or not all(hasattr(tree, 'tree_') for tree in trees):
+        return None
+
+    mean = scaler.mean_ if scaler.with_mean else np.zeros(scaler.n_features_in_)
+    scale = scaler.scale_ if scaler.with_std else np.ones(scaler.n_features_in_)
+
+    folded = copy.deepcopy(estimator)
+    for tree in getattr(folded, 'estimators_', [folded]):
+        state = tree.tree_.__getstate__()
+        nodes = state['nodes'].copy()
+        split = nodes['left_child'] != -1
+        columns = nodes['feature'][split]
+        nodes['threshold'][split] = unscaled_thresholds(nodes['threshold'][split], mean[columns], scale[columns])
+        state['nodes'] = nodes
+        tree.tree_.__setstate__(state)
+    return folded
+
+
+def build_pipeline(estimator, scaler=None, metadata=None, check_features=None, tolerance=FOLD_TOLERANCE):
+    """Pipeline for a trained estimator and its scaler, folding the scaler in when possible.
+
+    The fold is kept only if its max_fold_error on ``check_features`` is
+    within ``tolerance`` (recorded as ``max_fold_error``); without check
+    rows the scaler stays a separate step.
+    """
+    metadata = dict(metadata or {})
+    folded = fold_scaler(estimator, scaler) if scaler is not None and check_features is not None else None
+    if folded is not None:
+        metadata['max_fold_error'] = max_fold_error(InferencePipeline(folded), estimator, scaler, check_features)
+        if metadata['max_fold_error'] > tolerance:
+            folded = None
+    metadata['scaler_folded'] = folded is not None
+    if folded is not None:
+        return InferencePipeline(folded, metadata=metadata)
+    return InferencePipeline(estimator, scaler, metadata=metadata)
+
+
+def max_fold_error(pipeline, estimator, scaler, features):
+    """Largest probability difference between ``pipeline`` and scaling + ``estimator``"""
+    reference = estimator.predict_proba(scaler.transform(features) if scaler is not None else features)
+    return float(np.abs(pipeline.predict_proba(features) - reference).max())
@@ -0,0 +1,121 @@
+"""
+Micro-batching dispatcher for the ClimateSphere ML API
+Coalesces concurrent single-row predictions into one batched model call
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatcher:
+    """Queue single feature rows and score them together.
+
+    Requests wait at most ``window_ms`` (or until ``max_rows`` rows are queued)
+    before one batched call to ``predict_fn`` is made. ``predict_fn`` takes an
+    N×F matrix and returns a dict of model name -> probability array or
+    exception, like ``predict_probabilities`` in prediction_api.py.
+    """
+
+    def __init__(self, predict_fn, window_ms=2.0, max_rows=64, stats_size=10000):
+        self.predict_fn = predict_fn
+        self.window = window_ms / 1000.0
+        self.max_rows = max_rows
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._latencies = deque(maxlen=stats_size)
+        self._batch_sizes = deque(maxlen=stats_size)
+        self._requests = 0
+        self._batches = 0
+        self._start()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _start(self):
+        self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._worker.start()
+
+    def _after_fork(self):
+        """Threads do not survive fork: give the child its own queue and worker"""
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._latencies.clear()
+        self._batch_sizes.clear()
+        self._requests = 0
+        self._batches = 0
+        self._start()
+
+    def submit(self, row, timeout=30.0):
+        """Score one feature row; blocks until its batch has been predicted"""
+        future = Future()
+        self._queue.put((np.asarray(row, dtype=float), time.perf_counter(), future))
+        return future.result(timeout=timeout)
+
+    def _collect(self):
+        """Block for the first row, then gather more until the window closes"""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_rows:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                features = np.vstack([row for row, _, _ in batch])
+                results = self.predict_fn(features)
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            finished = time.perf_counter()
+            for i, (_, queued_at, future) in enumerate(batch):
+                future.set_result({
+                    model_name: result if isinstance(result, Exception) else float(result[i])
+                    for model_name, result in results.items()
+                })
+
+            with self._stats_lock:
+                self._requests += len(batch)
+                self._batches += 1
+                self._batch_sizes.append(len(batch))
+                self._latencies.extend(finished - queued_at for _, queued_at, _ in batch)
+
+    def stats(self):
+        """Latency percentiles (ms) and batch-size stats over recent traffic"""
+        with self._stats_lock:
+            latencies = np.array(self._latencies) * 1000.0
+            batch_sizes = np.array(self._batch_sizes)
+            stats = {
+                'window_ms': self.window * 1000.0,
+                'max_rows': self.max_rows,
+                'requests': self._requests,
+                'batches': self._batches,
+                'queue_depth': self._queue.qsize()
+            }
+        if len(latencies):
+            stats['latency_ms'] = {
+                'p50': float(np.percentile(latencies, 50)),
+                'p99': float(np.percentile(latencies, 99)),
+                'max': float(latencies.max())
+            }
+            stats['batch_size'] = {
+                'mean': float(batch_sizes.mean()),
+                'p50': float(np.percentile(batch_sizes, 50)),
+                'p99': float(np.percentile(batch_sizes, 99)),
+                'max': int(batch_sizes.max())
+            }
+        return stats
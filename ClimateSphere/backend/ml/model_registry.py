@@ -0,0 +1,234 @@
+"""
+Model registry for the ClimateSphere ML API
+Resolves model artifacts from configured directories, loads them lazily
+(memory-mapped where joblib allows) and hot-swaps retrained files
+"""
+
+import hashlib
+import os
+import threading
+import time
+
+import joblib
+
+
+def files_sha256(*paths, chunk_size=1 << 20):
+    """SHA-256 over the contents of one or more files, read in chunks"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def check_training_ids(model, scaler):
+    """Refuse a model and scaler saved by different training runs.
+
+    train_models_complete.py stamps both with the same ``training_id_``;
+    files without one (older exports) are accepted as they are.
+    """
+    model_id = getattr(model, 'training_id_', None)
+    scaler_id = getattr(scaler, 'training_id_', None)
+    if model_id is not None and scaler_id is not None and model_id != scaler_id:
+        raise ValueError(f'scaler is from training run {scaler_id}, model from {model_id}')
+
+
+class ModelArtifact:
+    """One registered model file plus its optional scaler"""
+
+    def __init__(self, name, path, group, scaler_path=None, assemble=None):
+        self.name = name
+        self.path = path
+        self.group = group
+        self.scaler_path = scaler_path
+        self.assemble = assemble
+        self.model = None
+        self.scaler = None
+        self.version = None
+        self.signature = None
+        self.loaded_at = None
+        self.error = None
+
+    def existing_paths(self):
+        return [path for path in (self.path, self.scaler_path) if path and os.path.exists(path)]
+
+    def content_version(self):
+        """Short hash of the model and scaler file contents"""
+        return files_sha256(*self.existing_paths())[:12]
+
+    def stat_signature(self):
+        """(mtime, size) of the model file, None if it is missing.
+
+        Only the model file is watched: training writes the scaler first and
+        the model last, so a changed model means both files are in place.
+        """
+        if not os.path.exists(self.path):
+            return None
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def status(self):
+        return {
+            'group': self.group,
+            'path': self.path,
+            'available': os.path.exists(self.path),
+            'loaded': self.model is not None,
+            'scaler_loaded': self.scaler is not None,
+            'version': self.version,
+            'loaded_at': self.loaded_at,
+            'error': self.error
+        }
+
+
+class ModelRegistry:
+    """Lazily loaded, hot-reloadable set of model artifacts.
+
+    Models are loaded on first ``get``; ``check_for_updates`` (or the watcher
+    thread) reloads any artifact whose file changed and swaps it in under a
+    lock, so in-flight requests keep using the object they already hold.
+    Listeners are called as ``listener(name, artifact)`` after every load.
+    An artifact's ``assemble(model, scaler)`` hook, if given, turns the
+    loaded files into the object served as its model.
+    """
+
+    def __init__(self, model_dir, mmap_mode='r'):
+        self.model_dir = model_dir
+        self.mmap_mode = mmap_mode
+        self._artifacts = {}
+        self._lock = threading.RLock()
+        self._listeners = []
+        self._watcher = None
+        self._watch_interval = None
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        """Threads do not survive fork: reset the lock and restart the watcher in the child"""
+        self._lock = threading.RLock()
+        if self._watcher is not None:
+            self._watcher = None
+            self.start_watcher(self._watch_interval)
+
+    def register(self, name, filename, group='risk', directory=None, scaler_filename=None, assemble=None):
+        """Register an artifact; ``directory`` defaults to the registry's model_dir"""
+        directory = directory or self.model_dir
+        scaler_path = os.path.join(directory, scaler_filename) if scaler_filename else None
+        self._artifacts[name] = ModelArtifact(name, os.path.join(directory, filename), group, scaler_path,
+                                              assemble)
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def _load(self, artifact):
+        """Load an artifact's files and swap them in; returns True on success"""
+        signature = artifact.stat_signature()
+        if signature is None:
+            artifact.error = 'file not found'
+            return False
+        try:
+            version = artifact.content_version()
+            model = joblib.load(artifact.path, mmap_mode=self.mmap_mode)
+            scaler = None
+            if artifact.scaler_path and os.path.exists(artifact.scaler_path):
+                scaler = joblib.load(artifact.scaler_path, mmap_mode=self.mmap_mode)
+                check_training_ids(model, scaler)
+            if artifact.assemble is not None:
+                model = artifact.assemble(model, scaler)
+        except Exception as e:
+            artifact.error = str(e)
+            artifact.signature = signature
+            print(f"❌ Error loading {artifact.name} model: {e}")
+            return False
+
+        with self._lock:
+            artifact.model = model
+            artifact.scaler = scaler
+            artifact.version = version
+            artifact.signature = signature
+            artifact.loaded_at = time.time()
+            artifact.error = None
+        print(f"✅ Loaded {artifact.name} model from {artifact.path} (version {version})")
+
+        for listener in self._listeners:
+            try:
+                listener(artifact.name, artifact)
+            except Exception as e:
+                print(f"⚠️ Model load listener failed for {artifact.name}: {e}")
+        return True
+
+    def get(self, name):
+        """Return the model for ``name``, loading it on first use (None if unavailable)"""
+        artifact = self._artifacts[name]
+        if artifact.model is None:
+            with self._lock:
+                if artifact.model is None and artifact.signature != artifact.stat_signature():
+                    self._load(artifact)
+        return artifact.model
+
+    def scaler(self, name):
+        """Return the scaler saved next to ``name``'s model, if any"""
+        self.get(name)
+        return self._artifacts[name].scaler
+
+    def version(self, name):
+        return self._artifacts[name].version
+
+    def artifact(self, name):
+        return self._artifacts[name]
+
+    def group(self, group):
+        """Dict of name -> model for every available model in ``group``"""
+        loaded = {}
+        for name, artifact in self._artifacts.items():
+            if artifact.group == group:
+                model = self.get(name)
+                if model is not None:
+                    loaded[name] = model
+        return loaded
+
+    def names(self, group=None):
+        return [name for name, artifact in self._artifacts.items() if group is None or artifact.group == group]
+
+    def load_all(self):
+        """Eagerly load every registered artifact"""
+        for name in self._artifacts:
+            self.get(name)
+
+    def check_for_updates(self):
+        """Reload artifacts whose files changed on disk; returns the reloaded names"""
+        reloaded = []
+        for name, artifact in self._artifacts.items():
+            if artifact.model is None:
+                continue
+            signature = artifact.stat_signature()
+            if signature is None or signature == artifact.signature:
+                continue
+            if artifact.content_version() == artifact.version:
+                # Touched but unchanged (e.g. copied over with the same bytes)
+                artifact.signature = signature
+                continue
+            if self._load(artifact):
+                reloaded.append(name)
+        return reloaded
+
+    def start_watcher(self, interval=5.0):
+        """Poll for changed artifacts every ``interval`` seconds on a daemon thread"""
+        if self._watcher is not None or interval <= 0:
+            return
+        self._watch_interval = interval
+
+        def watch():
+            while True:
+                time.sleep(interval)
+                try:
+                    for name in self.check_for_updates():
+                        print(f"🔄 Reloaded {name} model")
+                except Exception as e:
+                    print(f"⚠️ Model watcher error: {e}")
+
+        self._watcher = threading.Thread(target=watch, name='model-watcher', daemon=True)
+        self._watcher.start()
+
+    def status(self):
+        return {name: artifact.status() for name, artifact in self._artifacts.items()}
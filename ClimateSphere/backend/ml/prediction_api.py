@@ -1,56 +1,422 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
-import joblib
 import pandas as pd
 import numpy as np
+import multiprocessing
 import os
+import sys
+import time
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+from columnar import (NPY_MIMETYPE, RISK_LEVEL_NAMES, PayloadError, decode_npy, encode_npy,
+                      npy_columns, risk_level_codes, wants_npy)
+from dataset_stats import load_dataset_stats
+from forest_compiler import CompiledForest, compile_forest, verify_compiled
+from inference_pipeline import InferencePipeline, build_pipeline, derive_features
+from model_registry import ModelRegistry
+from inference_executor import InferenceExecutor
+from metrics import BATCH_BUCKETS, MetricsRegistry, process_rss_bytes
+from micro_batcher import MicroBatcher
+from prediction_cache import PredictionCache
+from refine_jobs import JobLimitReached, RefineJobManager
+from regional_store import DEFAULT_REGION_DATA, RegionalDataStore
+from upload_scoring import CHUNK_ROWS, processed_filename, stream_scored_csv
+from warmup import WARMUP_BATCH_SIZES, Readiness, warm_up_model
+
 app = Flask(__name__)
 CORS(app)
 
-# Load pre-trained models
-models = {}
+# False inside multiprocessing children such as refine jobs: spawn re-imports
+# the main module (this file, or serve.py which imports it) as a separate
+# __mp_main__ module, and those processes must not start the API's
+# background threads (multiprocessing aliases __mp_main__ to __main__ otherwise)
+SERVING_PROCESS = (sys.modules.get('__mp_main__', sys.modules.get('__main__')) is sys.modules.get('__main__')
+                   and multiprocessing.parent_process() is None)
+
+# Prometheus metrics served on /metrics
+metrics = MetricsRegistry()
+request_latency = metrics.histogram(
+    'climatesphere_request_duration_seconds', 'HTTP request latency by route', ('route', 'method', 'status'))
+model_latency = metrics.histogram(
+    'climatesphere_model_inference_seconds', 'Time spent in one model call', ('model', 'engine'))
+batch_rows = metrics.histogram(
+    'climatesphere_inference_batch_rows', 'Rows scored per predict_probabilities call', buckets=BATCH_BUCKETS)
+model_errors = metrics.counter(
+    'climatesphere_model_errors_total', 'Model calls that raised an exception', ('model',))
+
+# Model artifact locations (override with ML_MODEL_DIR / ML_MODEL1_DIR / ML_MODEL4_DIR)
+ML_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.abspath(os.path.join(ML_DIR, '..', '..', '..'))
+MODEL_DIR = os.environ.get('ML_MODEL_DIR', os.path.abspath(os.path.join(ML_DIR, '..', '..')))
+MODEL1_DIR = os.environ.get('ML_MODEL1_DIR', os.path.join(
+    REPO_ROOT, 'model_one_three_four', 'One_Earth', 'Model 1_updated', 'Model 1'))
+MODEL4_DIR = os.environ.get('ML_MODEL4_DIR', os.path.join(
+    REPO_ROOT, 'model_one_three_four', 'One_Earth', 'Model 4'))
+
+# Generated datasets and summaries (override with ML_DATA_DIR)
+DATA_DIR = os.environ.get('ML_DATA_DIR', os.path.abspath(os.path.join(ML_DIR, '..', '..')))
+
+# Datasets described by /dataset-info, and the scripts that generate them
+dataset_files = {
+    'synthetic': 'synthetic_climate_dataset.csv',
+    'complete': 'complete_climate_dataset.csv',
+    'monthly': 'monthly_climate_timeseries.csv'
+}
+dataset_generators = {
+    'synthetic': 'generate_synthetic_data.py',
+    'complete': 'create_complete_dataset.py',
+    'monthly': 'create_complete_dataset.py'
+}
+
+# Uploaded datasets (override with ML_UPLOAD_DIR): raw files in, scored files out
+UPLOAD_DIR = os.environ.get('ML_UPLOAD_DIR', os.path.join(REPO_ROOT, 'uploads'))
+RAW_UPLOAD_DIR = os.path.join(UPLOAD_DIR, 'raw')
+PROCESSED_UPLOAD_DIR = os.path.join(UPLOAD_DIR, 'processed')
+
+regional_store = RegionalDataStore(
+    os.path.join(DATA_DIR, 'regional_climate_data.json'),
+    os.path.join(DATA_DIR, 'regional_climate_summary.csv')
+)
+
+# Pre-trained models, loaded lazily on first use and hot-reloaded when retrained
 model_files = {
     'flood': 'FloodRisk_Model.pkl',
     'drought': 'DroughtRisk_Model.pkl', 
     'heatwave': 'HeatwaveRisk_Model.pkl'
 }
+# Risk models are served as inference pipelines (feature derivation, scaler
+# folded into the forest) exported by train_models_complete.py; where only the
+# model and scaler files exist, the same pipeline is assembled at load time,
+# folding the scaler only if that holds on a fixed probe of realistic inputs
+pipeline_files = {name: filename.replace('_Model.pkl', '_Pipeline.pkl') for name, filename in model_files.items()}
+
+def as_inference_pipeline(model, scaler):
+    """Registry hook: serve an exported pipeline, or build one from a model and its scaler"""
+    if isinstance(model, InferencePipeline):
+        if not model.compatible():
+            raise ValueError('pipeline expects different input features; retrain it with train_models_complete.py')
+        return model
+    pipeline = build_pipeline(model, scaler, check_features=fold_probe_features())
+    if scaler is not None and not pipeline.fused:
+        print(f"ℹ️ Scaler kept as a separate step (folding it changes probe probabilities by "
+              f"{pipeline.metadata.get('max_fold_error', 0):.4f})")
+    return pipeline
+
+def fold_probe_features(n_rows=2000, seed=0):
+    """Fixed sample of realistic API inputs (2 decimals, like requests) for checking a scaler fold"""
+    rng = np.random.default_rng(seed)
+    return build_features(*[rng.uniform(low, high, n_rows).round(2) for low, high in INPUT_RANGES.values()])
+
+registry = ModelRegistry(MODEL_DIR)
+for model_name, filename in model_files.items():
+    if os.path.exists(os.path.join(MODEL_DIR, pipeline_files[model_name])):
+        registry.register(model_name, pipeline_files[model_name], group='risk', assemble=as_inference_pipeline)
+    else:
+        registry.register(model_name, filename, group='risk', scaler_filename=filename.replace('.pkl', '_scaler.pkl'),
+                          assemble=as_inference_pipeline)
+registry.register('model1_temperature', 'model1_temperature_xgb.pkl', group='temperature',
+                  directory=MODEL1_DIR, scaler_filename='model1_scaler.pkl')
+registry.register('whatif_temperature', 'whatif_temperature_model.pkl', group='whatif', directory=MODEL4_DIR)
+registry.register('whatif_risk', 'whatif_risk_model.pkl', group='whatif', directory=MODEL4_DIR)
+
+# Compiled forests keyed by model name, as (source model, compiled forest)
+compiled_models = {}
 
 def load_models():
-    """Load all ML models"""
-    global models
-    for model_name, filename in model_files.items():
+    """Eagerly load all registered ML models"""
+    registry.load_all()
+
+# Compiled forests are used for batches up to this many rows; sklearn's
+# Cython tree walk is faster beyond that
+USE_COMPILED_FORESTS = os.environ.get('ML_COMPILED_FORESTS', '1') == '1'
+COMPILED_MAX_ROWS = int(os.environ.get('ML_COMPILED_MAX_ROWS', 1024))
+
+def compile_model(model_name, artifact):
+    """Build the array-based evaluator for a loaded forest, if it reproduces the model exactly"""
+    if artifact.group != 'risk' or not USE_COMPILED_FORESTS:
+        return
+    compiled_models.pop(model_name, None)
+    try:
+        model = artifact.model
+        # Only pipelines whose scaler is folded into the trees can skip straight to the forest
+        compiled = compile_forest(model.fused_estimator())
+        if compiled is None:
+            return
+        if verify_compiled(model, compiled):
+            compiled_models[model_name] = (model, compiled)
+            print(f"⚡ Compiled {model_name} model ({len(compiled.roots)} trees, depth {compiled.max_depth})")
+        else:
+            print(f"⚠️ Compiled {model_name} model does not match sklearn output, using sklearn")
+    except Exception as e:
+        print(f"⚠️ Could not compile {model_name} model: {e}")
+
+registry.add_listener(compile_model)
+
+def estimator_for(model_name, model, features):
+    """Pick the compiled forest for small NaN-free batches, else the original model"""
+    source, compiled = compiled_models.get(model_name, (None, None))
+    if source is model and len(features) <= COMPILED_MAX_ROWS and not np.isnan(features).any():
+        return compiled
+    return model
+
+# Watch model files so retrained artifacts are swapped in without a restart
+if SERVING_PROCESS:
+    registry.start_watcher(float(os.environ.get('ML_MODEL_WATCH_INTERVAL', 5)))
+
+# Upper bound on rows accepted by a single /predict/batch call
+MAX_BATCH_ROWS = int(os.environ.get('ML_MAX_BATCH_ROWS', 100000))
+
+def build_features(rainfall, temperature, humidity, co2_level):
+    """Build the N×10 feature matrix expected by the risk pipelines.
+
+    Accepts scalars or equal-length arrays of raw values; the remaining
+    training columns are derived by ``inference_pipeline.derive_features``.
+    """
+    return derive_features(rainfall, temperature, humidity, co2_level)
+
+# Realistic raw ranges of the four API inputs (build_features argument order)
+INPUT_RANGES = {
+    'rainfall': (0, 300),
+    'temperature': (-10, 50),
+    'humidity': (0, 100),
+    'co2_level': (300, 600)
+}
+
+# Shared pool that scores the models of one request side by side
+# (ML_SERIAL_INFERENCE=1 forces one model after another, e.g. for debugging)
+inference_executor = InferenceExecutor(
+    max_workers=int(os.environ.get('ML_INFERENCE_THREADS', 0)) or None,
+    serial=os.environ.get('ML_SERIAL_INFERENCE', '0') == '1',
+    min_cost=float(os.environ.get('ML_PARALLEL_MIN_COST_MS', 2)) / 1000
+)
+
+# Expected seconds per model call by engine, as (per call, per row). sklearn
+# walks the 100 trees one Python call at a time (~10 ms even for one row); the
+# compiled evaluator costs a fraction of a millisecond plus its per-row work
+ENGINE_COSTS = {
+    'sklearn': (0.010, 4.5e-6),
+    'compiled': (0.0002, 13e-6)
+}
+
+def engine_name(model):
+    return 'compiled' if isinstance(model, CompiledForest) else 'sklearn'
+
+def expected_cost(estimators, rows):
+    """Expected seconds to run every estimator on ``rows`` rows, one after another"""
+    return sum(per_call + per_row * rows
+               for per_call, per_row in (ENGINE_COSTS[engine_name(model)] for model in estimators))
+
+def predict_probabilities(features):
+    """Score a feature matrix with every loaded model (one call per model,
+    run in parallel on the inference executor).
+
+    Returns a dict of model name -> probability array, or the exception
+    raised by that model.
+    """
+    batch_rows.observe(len(features))
+
+    estimators = {name: estimator_for(name, model, features) for name, model in registry.group('risk').items()}
+
+    def score(model_name, model):
         try:
-            # Try to load from current directory first, then parent directories
-            model_path = None
-            for path in [filename, f'../../{filename}', f'../../../{filename}']:
-                if os.path.exists(path):
-                    model_path = path
-                    break
-            
-            if model_path:
-                models[model_name] = joblib.load(model_path)
-                print(f"✅ Loaded {model_name} model from {model_path}")
+            engine = engine_name(model)
+            started = time.perf_counter()
+            if hasattr(model, 'predict_proba'):
+                prob = model.predict_proba(features)
+                result = prob[:, 1] if prob.shape[1] > 1 else prob[:, 0]
             else:
-                print(f"⚠️ Model file {filename} not found")
+                result = np.asarray(model.predict(features), dtype=float)
+            model_latency.observe(time.perf_counter() - started, model_name, engine)
+            return result
+        except Exception as e:
+            print(f"Error predicting with {model_name}: {e}")
+            model_errors.inc(model_name)
+            return e
+
+    # Slow single-row sklearn calls still run side by side; cheap compiled ones stay serial
+    return inference_executor.map(score, estimators, cost=expected_cost(estimators.values(), len(features)))
+
+# Opt-in micro-batching of concurrent /predict calls (ML_MICROBATCH=1)
+micro_batcher = None
+if os.environ.get('ML_MICROBATCH', '0') == '1' and SERVING_PROCESS:
+    micro_batcher = MicroBatcher(
+        predict_probabilities,
+        window_ms=float(os.environ.get('ML_MICROBATCH_WINDOW_MS', 2.0)),
+        max_rows=int(os.environ.get('ML_MICROBATCH_MAX_ROWS', 64))
+    )
+
+def micro_batched_predictions(features):
+    """Score a one-row feature matrix through the micro-batcher.
+
+    Results have predict_probabilities' shape (a one-element array per
+    model), so cache entries are interchangeable with the other routes'.
+    """
+    return {
+        model_name: result if isinstance(result, Exception) else np.array([result])
+        for model_name, result in micro_batcher.submit(features[0]).items()
+    }
+
+# In-process LRU + TTL cache for /predict, /future and /scenario (ML_CACHE_SIZE=0 disables)
+prediction_cache = PredictionCache(
+    max_entries=int(os.environ.get('ML_CACHE_SIZE', 4096)),
+    ttl=float(os.environ.get('ML_CACHE_TTL', 300)),
+    decimals=int(os.environ.get('ML_CACHE_DECIMALS', 2))
+)
+
+def invalidate_prediction_cache(model_name, artifact):
+    """Drop cached predictions whenever a risk model is (re)loaded"""
+    if artifact.group == 'risk':
+        prediction_cache.clear()
+
+registry.add_listener(invalidate_prediction_cache)
+
+def cached_predictions(features, compute=predict_probabilities):
+    """Run ``compute(features)`` through the prediction cache.
+
+    Results are only cached when every model succeeded.
+    """
+    # group() loads any models not yet loaded, so the key carries their real versions
+    key = prediction_cache.key(features, [registry.version(name) for name in registry.group('risk')])
+    results = prediction_cache.get(key)
+    if results is None:
+        results = compute(features)
+        if not any(isinstance(result, Exception) for result in results.values()):
+            prediction_cache.put(key, results)
+    return results
+
+def risk_levels(probabilities):
+    """Map risk probabilities to High/Medium/Low labels"""
+    probabilities = np.asarray(probabilities, dtype=float)
+    return np.where(probabilities > 0.7, 'High', np.where(probabilities > 0.4, 'Medium', 'Low'))
+
+def risk_level(probability):
+    """Map a single risk probability to a High/Medium/Low label"""
+    return 'High' if probability > 0.7 else 'Medium' if probability > 0.4 else 'Low'
+
+# Startup warm-up: /ready answers 200 only once every model has scored synthetic batches
+readiness = Readiness()
+
+def warm_up_risk_models(rounds=2, seed=0):
+    """Run realistic synthetic inputs through the full risk pipeline (compiled and sklearn paths)"""
+    rng = np.random.default_rng(seed)
+    for _ in range(rounds):
+        for n_rows in WARMUP_BATCH_SIZES:
+            features = build_features(*[rng.uniform(low, high, n_rows) for low, high in INPUT_RANGES.values()])
+            for model_name, result in predict_probabilities(features).items():
+                if isinstance(result, Exception):
+                    raise result
+            risk_levels(np.zeros(n_rows))
+
+def warm_up_steps():
+    """Warm-up callables for every available model, keyed by name"""
+    load_models()
+    steps = {}
+    if registry.group('risk'):
+        steps['risk'] = warm_up_risk_models
+    for name in registry.names():
+        artifact = registry.artifact(name)
+        if artifact.group != 'risk' and artifact.model is not None:
+            steps[name] = lambda artifact=artifact: warm_up_model(artifact.model, artifact.scaler)
+    return steps
+
+def warm_up(background=False):
+    """Load and warm every model, then mark the API ready (ML_WARMUP=0 skips the warm-up)"""
+    if os.environ.get('ML_WARMUP', '1') != '1':
+        load_models()
+        readiness.skip()
+    elif background:
+        readiness.start(warm_up_steps)
+    else:
+        load_models()
+        readiness.run(warm_up_steps)
+
+def warm_up_again():
+    """Warm every loaded model again, outside the one-shot readiness warm-up.
+
+    Used by serve.py after a reload, before the next generation of workers forks.
+    """
+    started = time.perf_counter()
+    steps = warm_up_steps()
+    for name, step in steps.items():
+        try:
+            step()
         except Exception as e:
-            print(f"❌ Error loading {model_name} model: {e}")
+            print(f"⚠️ Warm-up failed for {name}: {e}")
+    print(f"🔥 Re-warmed {len(steps)} models in {time.perf_counter() - started:.2f}s")
+
+def warm_up_reloaded(model_name, artifact):
+    """Warm models swapped in by the hot-reload watcher"""
+    if not readiness.ready:
+        return
+    if artifact.group == 'risk':
+        warm_up_risk_models(rounds=1)
+    else:
+        warm_up_model(artifact.model, artifact.scaler, rounds=1)
+
+registry.add_listener(warm_up_reloaded)
+
+metrics.gauge('climatesphere_prediction_cache_hits_total', 'Prediction cache hits',
+              lambda: prediction_cache.hits, kind='counter')
+metrics.gauge('climatesphere_prediction_cache_misses_total', 'Prediction cache misses',
+              lambda: prediction_cache.misses, kind='counter')
+metrics.gauge('climatesphere_prediction_cache_evictions_total', 'Prediction cache LRU evictions',
+              lambda: prediction_cache.evictions, kind='counter')
+metrics.gauge('climatesphere_prediction_cache_hit_ratio', 'Prediction cache hit ratio since start',
+              lambda: prediction_cache.stats()['hit_rate'])
+metrics.gauge('climatesphere_prediction_cache_entries', 'Entries currently cached',
+              lambda: prediction_cache.stats()['entries'])
+metrics.gauge('climatesphere_microbatch_queue_depth', 'Rows waiting in the micro-batch queue',
+              lambda: micro_batcher.stats()['queue_depth'] if micro_batcher else None)
+metrics.gauge('climatesphere_models_loaded', 'Risk models currently loaded',
+              lambda: sum(registry.artifact(name).model is not None for name in registry.names('risk')))
+metrics.gauge('process_resident_memory_bytes', 'Resident memory size in bytes', process_rss_bytes)
 
-# Load models on startup
-load_models()
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    started = g.get('request_started')
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        labels = (route, request.method, response.status_code)
+        if response.is_streamed:
+            # Streamed bodies are generated after this hook; time them until the response is closed
+            response.call_on_close(lambda: request_latency.observe(time.perf_counter() - started, *labels))
+        else:
+            request_latency.observe(time.perf_counter() - started, *labels)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Metrics in the Prometheus text exposition format (per process)"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
-        'models_loaded': list(models.keys()),
+        'models_loaded': [name for name in registry.names('risk') if registry.artifact(name).model is not None],
+        'models_compiled': list(compiled_models.keys()),
+        'inference': inference_executor.status(),
+        'model_registry': registry.status(),
+        'micro_batching': dict(micro_batcher.stats(), enabled=True) if micro_batcher else {'enabled': False},
+        'prediction_cache': prediction_cache.stats(),
         'timestamp': datetime.now().isoformat()
     })
 
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: 503 until the startup warm-up has finished"""
+    status = readiness.status()
+    status['models_loaded'] = [name for name in registry.names('risk') if registry.artifact(name).model is not None]
+    status['timestamp'] = datetime.now().isoformat()
+    return jsonify(status), 200 if status['ready'] else 503
+
 @app.route('/predict', methods=['POST'])
 def predict_risk():
     """Predict climate risks based on input parameters"""
@@ -63,50 +429,30 @@ def predict_risk():
         humidity = float(data.get('humidity', 60))
         co2_level = float(data.get('co2_level', 400))
         
-        # Normalize values to match training data (0-1 scale)
-        rainfall_norm = rainfall / 300.0  # Assuming max rainfall 300mm
-        temperature_norm = temperature / 50.0  # Assuming max temp 50°C
-        humidity_norm = humidity / 100.0  # Already in percentage
-        co2_norm = co2_level / 600.0  # Assuming max CO2 600ppm
-        
-        # Create feature vector with all 10 features expected by the model
-        # Based on the CSV: Rainfall_mm, Temperature_C, Soil_Moisture, Humidity_%, Wind_Speed_mps, CO2_ppm, Evaporation_mm_day, Rainfall_Lag_mm, plus derived features
-        features = np.array([[
-            rainfall_norm,           # Rainfall_mm (normalized)
-            temperature_norm,        # Temperature_C (normalized) 
-            0.5,                    # Soil_Moisture (default)
-            humidity_norm,          # Humidity_% (normalized)
-            0.3,                    # Wind_Speed_mps (default)
-            co2_norm,               # CO2_ppm (normalized)
-            0.4,                    # Evaporation_mm_day (default)
-            rainfall_norm * 0.8,    # Rainfall_Lag_mm (derived)
-            temperature_norm * humidity_norm,  # Interaction feature
-            rainfall_norm * temperature_norm   # Interaction feature
-        ]])
+        features = build_features(rainfall, temperature, humidity, co2_level)
+        
+        # Coalesce with concurrent requests when micro-batching is on
+        compute = micro_batched_predictions if micro_batcher else predict_probabilities
+        row_results = {
+            model_name: result if isinstance(result, Exception) else result[0]
+            for model_name, result in cached_predictions(features, compute).items()
+        }
         
         predictions = {}
         
         # Make predictions with available models
-        for model_name, model in models.items():
-            try:
-                if hasattr(model, 'predict_proba'):
-                    prob = model.predict_proba(features)[0]
-                    predictions[model_name] = {
-                        'risk_probability': float(prob[1]) if len(prob) > 1 else float(prob[0]),
-                        'risk_level': 'High' if (prob[1] if len(prob) > 1 else prob[0]) > 0.7 else 'Medium' if (prob[1] if len(prob) > 1 else prob[0]) > 0.4 else 'Low'
-                    }
-                else:
-                    pred = model.predict(features)[0]
-                    predictions[model_name] = {
-                        'risk_probability': float(pred),
-                        'risk_level': 'High' if pred > 0.7 else 'Medium' if pred > 0.4 else 'Low'
-                    }
-            except Exception as e:
-                print(f"Error predicting with {model_name}: {e}")
+        for model_name, result in row_results.items():
+            if isinstance(result, Exception):
                 predictions[model_name] = {
                     'risk_probability': 0.5,
                     'risk_level': 'Unknown',
-                    'error': str(e)
+                    'error': str(result)
+                }
+            else:
+                prob = float(result)
+                predictions[model_name] = {
+                    'risk_probability': prob,
+                    'risk_level': risk_level(prob)
                 }
         
         return jsonify({
@@ -123,14 +469,165 @@ def predict_risk():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/predict/batch', methods=['POST'])
+def predict_risk_batch():
+    """Predict climate risks for many input rows in one call.
+
+    Accepts either ``{"rows": [{temperature, rainfall, humidity, co2_level}, ...]}``
+    or columnar lists ``{"temperature": [...], "rainfall": [...], ...}``.
+    Results are returned in columnar form, in input order.
+    
+    With ``Content-Type: application/x-npy`` the body is a .npy array instead
+    (structured with those field names, or N×4 in that order), viewed in
+    place without parsing. ``Accept: application/x-npy`` returns one
+    structured array with ``<model>_probability`` and ``<model>_level``
+    fields (level codes index the ``X-Risk-Levels`` header).
+    """
+    try:
+        defaults = {'temperature': 25, 'rainfall': 100, 'humidity': 60, 'co2_level': 400}
+        
+        try:
+            if request.mimetype == NPY_MIMETYPE:
+                # Column views into the request body; np.asarray below does not copy them
+                data = npy_columns(decode_npy(request.get_data(cache=False)), list(defaults))
+            else:
+                data = request.get_json() or {}
+            if 'rows' in data:
+                rows = data['rows']
+                columns = {
+                    name: np.array([float(row.get(name, default)) for row in rows], dtype=float)
+                    for name, default in defaults.items()
+                }
+                n_rows = len(rows)
+            else:
+                lengths = {len(data[name]) for name in defaults if name in data}
+                if len(lengths) != 1:
+                    return jsonify({'error': 'Columns must be non-empty lists of equal length'}), 400
+                n_rows = lengths.pop()
+                columns = {
+                    name: np.asarray(data[name], dtype=float) if name in data else np.full(n_rows, float(default))
+                    for name, default in defaults.items()
+                }
+        except (TypeError, ValueError, AttributeError) as e:  # PayloadError is a ValueError
+            return jsonify({'error': f'Invalid batch input: {e}'}), 400
+        
+        if n_rows == 0:
+            return jsonify({'error': 'Batch is empty'}), 400
+        if n_rows > MAX_BATCH_ROWS:
+            return jsonify({'error': f'Batch too large ({n_rows} rows, max {MAX_BATCH_ROWS})'}), 413
+        
+        features = build_features(columns['rainfall'], columns['temperature'],
+                                  columns['humidity'], columns['co2_level'])
+        results = predict_probabilities(features)
+        if wants_npy(request.accept_mimetypes):
+            return npy_predictions_response(results, n_rows)
+        
+        predictions = {}
+        for model_name, result in results.items():
+            if isinstance(result, Exception):
+                predictions[model_name] = {
+                    'risk_probability': None,
+                    'risk_level': None,
+                    'error': str(result)
+                }
+            else:
+                predictions[model_name] = {
+                    'risk_probability': result.tolist(),
+                    'risk_level': risk_levels(result).tolist()
+                }
+        
+        return jsonify({
+            'count': n_rows,
+            'predictions': predictions,
+            'input_parameters': {name: values.tolist() for name, values in columns.items()},
+            'timestamp': datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def score_conditions(temperature, rainfall, humidity, co2):
+    """Risk probabilities for raw condition arrays (used by the upload scorer)"""
+    return predict_probabilities(build_features(rainfall, temperature, humidity, co2))
+
+@app.route('/uploads/score', methods=['POST'])
+def score_upload():
+    """Score an uploaded CSV from uploads/raw, streaming NDJSON as chunks finish.
+
+    Body: ``{"filename": "<file in uploads/raw>", "chunk_rows": 10000}``. The
+    scored rows are also written to uploads/processed/<name>_scored.csv.
+    """
+    data = request.get_json(silent=True) or {}
+    filename = data.get('filename') or ''
+    if not filename or os.path.basename(filename) != filename or not filename.lower().endswith('.csv'):
+        return jsonify({'error': 'filename must be the name of a .csv file in uploads/raw'}), 400
+    raw_path = os.path.join(RAW_UPLOAD_DIR, filename)
+    if not os.path.isfile(raw_path):
+        return jsonify({'error': f'{filename} not found in uploads/raw'}), 404
+    try:
+        chunk_rows = int(data.get('chunk_rows', CHUNK_ROWS))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'chunk_rows must be an integer'}), 400
+    if not 1 <= chunk_rows <= MAX_BATCH_ROWS:
+        return jsonify({'error': f'chunk_rows must be between 1 and {MAX_BATCH_ROWS}'}), 400
+
+    processed_path = os.path.join(PROCESSED_UPLOAD_DIR, processed_filename(filename))
+    lines = stream_scored_csv(raw_path, processed_path, score_conditions, risk_levels, chunk_rows)
+    return Response(lines, mimetype='application/x-ndjson', headers={'X-Accel-Buffering': 'no'})
+
+def npy_predictions_response(results, n_rows, shape=None, extra_columns=None):
+    """Binary (.npy) response with a probability and level-code field per model"""
+    columns = {}
+    errors = []
+    for model_name, result in results.items():
+        if isinstance(result, Exception):
+            errors.append(model_name)
+            result = np.full(n_rows, np.nan)
+        columns[f'{model_name}_probability'] = np.asarray(result, dtype=np.float64)
+        columns[f'{model_name}_level'] = risk_level_codes(columns[f'{model_name}_probability'])
+    columns.update(extra_columns or {})
+    response = Response(encode_npy(columns, shape), mimetype=NPY_MIMETYPE)
+    response.headers['X-Row-Count'] = str(n_rows)
+    response.headers['X-Risk-Levels'] = ','.join(RISK_LEVEL_NAMES)
+    if errors:
+        response.headers['X-Model-Errors'] = ','.join(errors)
+    return response
+
+def project_conditions(base_temp, base_rainfall, base_humidity, base_co2, years_ahead):
+    """Project climate conditions forward (simplified climate model).
+
+    ``years_ahead`` may be a scalar or an array; the projections follow its shape.
+    """
+    temp_increase_per_year = 0.1  # 0.1°C per year
+    co2_increase_per_year = 2.5   # 2.5 ppm per year
+    rainfall_change_per_year = -0.5  # -0.5mm per year
+    
+    years_ahead = np.asarray(years_ahead, dtype=float)
+    future_temp = base_temp + (temp_increase_per_year * years_ahead)
+    future_co2 = base_co2 + (co2_increase_per_year * years_ahead)
+    future_rainfall = np.maximum(0, base_rainfall + (rainfall_change_per_year * years_ahead))
+    future_humidity = np.full_like(years_ahead, base_humidity)  # Assume humidity stays relatively stable
+    return future_temp, future_rainfall, future_humidity, future_co2
+
+def parse_year_range(year_range):
+    """Expand a ``year_range`` of {start, end, step} or [start, end, step] into years (end inclusive)"""
+    if isinstance(year_range, dict):
+        start = int(year_range['start'])
+        end = int(year_range['end'])
+        step = int(year_range.get('step', 1))
+    else:
+        start, end = int(year_range[0]), int(year_range[1])
+        step = int(year_range[2]) if len(year_range) > 2 else 1
+    if step <= 0 or end < start:
+        raise ValueError('year_range needs start <= end and a positive step')
+    return np.arange(start, end + 1, step)
+
 @app.route('/future', methods=['POST'])
 def predict_future():
-    """Predict climate trends for future years"""
+    """Predict climate trends for a future year, or a whole range of years"""
     try:
         data = request.get_json()
-        target_year = int(data.get('year', 2030))
         current_year = datetime.now().year
-        years_ahead = target_year - current_year
         
         # Base parameters
         base_temp = float(data.get('base_temperature', 25))
@@ -138,55 +635,30 @@ def predict_future():
         base_humidity = float(data.get('base_humidity', 60))
         base_co2 = float(data.get('base_co2', 400))
         
-        # Project future values (simplified climate model)
-        temp_increase_per_year = 0.1  # 0.1°C per year
-        co2_increase_per_year = 2.5   # 2.5 ppm per year
-        rainfall_change_per_year = -0.5  # -0.5mm per year
+        if 'year_range' in data:
+            return predict_future_range(data['year_range'], current_year,
+                                        base_temp, base_rainfall, base_humidity, base_co2)
         
-        future_temp = base_temp + (temp_increase_per_year * years_ahead)
-        future_co2 = base_co2 + (co2_increase_per_year * years_ahead)
-        future_rainfall = max(0, base_rainfall + (rainfall_change_per_year * years_ahead))
-        future_humidity = base_humidity  # Assume humidity stays relatively stable
+        target_year = int(data.get('year', 2030))
+        years_ahead = target_year - current_year
         
-        # Normalize future values
-        rainfall_norm = future_rainfall / 300.0
-        temp_norm = future_temp / 50.0
-        humidity_norm = future_humidity / 100.0
-        co2_norm = future_co2 / 600.0
+        future_temp, future_rainfall, future_humidity, future_co2 = project_conditions(
+            base_temp, base_rainfall, base_humidity, base_co2, years_ahead)
         
         # Make predictions for future scenario with 10 features
-        features = np.array([[
-            rainfall_norm,
-            temp_norm,
-            0.5,  # Soil_Moisture
-            humidity_norm,
-            0.3,  # Wind_Speed
-            co2_norm,
-            0.4,  # Evaporation
-            rainfall_norm * 0.8,  # Rainfall_Lag
-            temp_norm * humidity_norm,  # Interaction
-            rainfall_norm * temp_norm   # Interaction
-        ]])
+        features = build_features(future_rainfall, future_temp, future_humidity, future_co2)
         
         future_predictions = {}
-        for model_name, model in models.items():
-            try:
-                if hasattr(model, 'predict_proba'):
-                    prob = model.predict_proba(features)[0]
-                    future_predictions[model_name] = float(prob[1]) if len(prob) > 1 else float(prob[0])
-                else:
-                    pred = model.predict(features)[0]
-                    future_predictions[model_name] = float(pred)
-            except Exception as e:
-                future_predictions[model_name] = 0.5
+        for model_name, result in cached_predictions(features).items():
+            future_predictions[model_name] = 0.5 if isinstance(result, Exception) else float(result[0])
         
         return jsonify({
             'target_year': target_year,
             'projected_conditions': {
-                'temperature': future_temp,
-                'rainfall': future_rainfall,
-                'humidity': future_humidity,
-                'co2_level': future_co2
+                'temperature': float(future_temp),
+                'rainfall': float(future_rainfall),
+                'humidity': float(future_humidity),
+                'co2_level': float(future_co2)
             },
             'risk_predictions': future_predictions,
             'timestamp': datetime.now().isoformat()
@@ -195,6 +667,61 @@ def predict_future():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def predict_future_range(year_range, current_year, base_temp, base_rainfall, base_humidity, base_co2):
+    """Project and score every year of a range as one feature matrix"""
+    try:
+        years = parse_year_range(year_range)
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid year_range: {e}'}), 400
+    if len(years) > MAX_BATCH_ROWS:
+        return jsonify({'error': f'year_range too large ({len(years)} years, max {MAX_BATCH_ROWS})'}), 413
+    
+    future_temp, future_rainfall, future_humidity, future_co2 = project_conditions(
+        base_temp, base_rainfall, base_humidity, base_co2, years - current_year)
+    
+    features = build_features(future_rainfall, future_temp, future_humidity, future_co2)
+    
+    future_predictions = {}
+    for model_name, result in cached_predictions(features).items():
+        future_predictions[model_name] = [0.5] * len(years) if isinstance(result, Exception) else result.tolist()
+    
+    return jsonify({
+        'years': years.tolist(),
+        'projected_conditions': {
+            'temperature': future_temp.tolist(),
+            'rainfall': future_rainfall.tolist(),
+            'humidity': future_humidity.tolist(),
+            'co2_level': future_co2.tolist()
+        },
+        'risk_predictions': future_predictions,
+        'timestamp': datetime.now().isoformat()
+    })
+
+# Base conditions for scenario simulations
+SCENARIO_BASE = {'temperature': 25, 'rainfall': 100, 'humidity': 60, 'co2_level': 400}
+
+# Slider defaults and the most points a single /scenario/grid call may score
+SCENARIO_DEFAULTS = {'co2_change': 0, 'deforestation': 0, 'renewable_energy': 50}
+MAX_GRID_POINTS = int(os.environ.get('ML_MAX_GRID_POINTS', 250000))
+
+def scenario_conditions(co2_change_percent, deforestation_percent, renewable_energy_percent):
+    """Apply the scenario impact formulas to scalars or equal-shape arrays"""
+    co2_change_percent = np.asarray(co2_change_percent, dtype=float)
+    deforestation_percent = np.asarray(deforestation_percent, dtype=float)
+    renewable_energy_percent = np.asarray(renewable_energy_percent, dtype=float)
+    
+    # Calculate scenario impacts
+    co2_multiplier = 1 + (co2_change_percent / 100)
+    temp_impact = (co2_change_percent / 100) * 2  # 2°C per 100% CO2 increase
+    rainfall_impact = -(deforestation_percent / 100) * 20  # 20mm reduction per 100% deforestation
+    renewable_impact = -(renewable_energy_percent / 100) * 0.5  # 0.5°C reduction per 100% renewable
+    
+    scenario_temp = SCENARIO_BASE['temperature'] + temp_impact + renewable_impact
+    scenario_co2 = SCENARIO_BASE['co2_level'] * co2_multiplier
+    scenario_rainfall = np.maximum(0, SCENARIO_BASE['rainfall'] + rainfall_impact)
+    scenario_humidity = np.full_like(scenario_temp, SCENARIO_BASE['humidity'])
+    return scenario_temp, scenario_rainfall, scenario_humidity, scenario_co2
+
 @app.route('/scenario', methods=['POST'])
 def scenario_simulation():
     """Simulate what-if scenarios based on user inputs"""
@@ -206,63 +733,26 @@ def scenario_simulation():
         deforestation_percent = float(data.get('deforestation', 0))  # % deforestation
         renewable_energy_percent = float(data.get('renewable_energy', 50))  # % renewable
         
-        # Base conditions
-        base_temp = 25
-        base_rainfall = 100
-        base_humidity = 60
-        base_co2 = 400
-        
-        # Calculate scenario impacts
-        co2_multiplier = 1 + (co2_change_percent / 100)
-        temp_impact = (co2_change_percent / 100) * 2  # 2°C per 100% CO2 increase
-        rainfall_impact = -(deforestation_percent / 100) * 20  # 20mm reduction per 100% deforestation
-        renewable_impact = -(renewable_energy_percent / 100) * 0.5  # 0.5°C reduction per 100% renewable
-        
-        scenario_temp = base_temp + temp_impact + renewable_impact
-        scenario_co2 = base_co2 * co2_multiplier
-        scenario_rainfall = max(0, base_rainfall + rainfall_impact)
-        scenario_humidity = base_humidity
-        
-        # Normalize scenario values
-        rainfall_norm = scenario_rainfall / 300.0
-        temp_norm = scenario_temp / 50.0
-        humidity_norm = scenario_humidity / 100.0
-        co2_norm = scenario_co2 / 600.0
+        scenario_temp, scenario_rainfall, scenario_humidity, scenario_co2 = (
+            float(value) for value in scenario_conditions(
+                co2_change_percent, deforestation_percent, renewable_energy_percent))
         
         # Make predictions for scenario with 10 features
-        features = np.array([[
-            rainfall_norm,
-            temp_norm,
-            0.5,  # Soil_Moisture
-            humidity_norm,
-            0.3,  # Wind_Speed
-            co2_norm,
-            0.4,  # Evaporation
-            rainfall_norm * 0.8,  # Rainfall_Lag
-            temp_norm * humidity_norm,  # Interaction
-            rainfall_norm * temp_norm   # Interaction
-        ]])
+        features = build_features(scenario_rainfall, scenario_temp, scenario_humidity, scenario_co2)
         
         scenario_predictions = {}
-        for model_name, model in models.items():
-            try:
-                if hasattr(model, 'predict_proba'):
-                    prob = model.predict_proba(features)[0]
-                    scenario_predictions[model_name] = {
-                        'risk_probability': float(prob[1]) if len(prob) > 1 else float(prob[0]),
-                        'risk_level': 'High' if (prob[1] if len(prob) > 1 else prob[0]) > 0.7 else 'Medium' if (prob[1] if len(prob) > 1 else prob[0]) > 0.4 else 'Low'
-                    }
-                else:
-                    pred = model.predict(features)[0]
-                    scenario_predictions[model_name] = {
-                        'risk_probability': float(pred),
-                        'risk_level': 'High' if pred > 0.7 else 'Medium' if pred > 0.4 else 'Low'
-                    }
-            except Exception as e:
+        for model_name, result in cached_predictions(features).items():
+            if isinstance(result, Exception):
                 scenario_predictions[model_name] = {
                     'risk_probability': 0.5,
                     'risk_level': 'Unknown'
                 }
+            else:
+                prob = float(result[0])
+                scenario_predictions[model_name] = {
+                    'risk_probability': prob,
+                    'risk_level': risk_level(prob)
+                }
         
         return jsonify({
             'scenario_parameters': {
@@ -283,72 +773,148 @@ def scenario_simulation():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/regional-data/<region>', methods=['GET'])
-def get_regional_data(region):
-    """Get regional climate data"""
+@app.route('/scenario/grid', methods=['POST'])
+def scenario_grid():
+    """Evaluate a dense grid of scenarios (response surface) in one call.
+
+    ``axes`` maps slider names (co2_change, deforestation, renewable_energy)
+    to ``{"min", "max", "steps"}``; sliders without an axis are held at the
+    value given in ``fixed`` (or their default). Surfaces are returned as
+    nested lists shaped by the axes, in the order they were given, or with
+    ``Accept: application/x-npy`` as one structured array of that shape.
+    """
     try:
-        # Load regional data from JSON file
-        import json
+        data = request.get_json() or {}
+        axes = data.get('axes') or {}
+        fixed = data.get('fixed') or {}
+        
+        unknown = set(axes) - set(SCENARIO_DEFAULTS)
+        if not axes or unknown:
+            return jsonify({'error': f'axes must name one or more of {sorted(SCENARIO_DEFAULTS)}'}), 400
+        
         try:
-            with open('../../regional_climate_data.json', 'r') as f:
-                regional_data = json.load(f)
-        except FileNotFoundError:
-            # Fallback regional data
-            regional_data = {
-                'mumbai': {'temperature': 28.5, 'rainfall': 120, 'humidity': 75, 'co2_level': 420},
-                'delhi': {'temperature': 32, 'rainfall': 65, 'humidity': 60, 'co2_level': 450},
-                'kolkata': {'temperature': 30, 'rainfall': 140, 'humidity': 80, 'co2_level': 430},
-                'gujarat': {'temperature': 35, 'rainfall': 45, 'humidity': 55, 'co2_level': 440},
-                'chennai': {'temperature': 31, 'rainfall': 95, 'humidity': 78, 'co2_level': 425},
-                'kashmir': {'temperature': 18, 'rainfall': 180, 'humidity': 65, 'co2_level': 380}
+            axis_values = {
+                name: np.linspace(float(spec['min']), float(spec['max']), int(spec.get('steps', 10)))
+                for name, spec in axes.items()
             }
+            fixed_values = {name: float(fixed.get(name, default))
+                            for name, default in SCENARIO_DEFAULTS.items() if name not in axes}
+        except (KeyError, TypeError, ValueError) as e:
+            return jsonify({'error': f'Invalid grid specification: {e}'}), 400
+        
+        shape = tuple(len(values) for values in axis_values.values())
+        n_points = int(np.prod(shape))
+        if n_points == 0:
+            return jsonify({'error': 'Every axis needs at least one step'}), 400
+        if n_points > MAX_GRID_POINTS:
+            return jsonify({'error': f'Grid too large ({n_points} points, max {MAX_GRID_POINTS})'}), 413
+        
+        # Cartesian product of the axes, one flattened column per slider
+        mesh = np.meshgrid(*axis_values.values(), indexing='ij')
+        sliders = {name: grid_values.ravel() for name, grid_values in zip(axis_values, mesh)}
+        sliders.update({name: np.full(n_points, value) for name, value in fixed_values.items()})
+        
+        scenario_temp, scenario_rainfall, scenario_humidity, scenario_co2 = scenario_conditions(
+            sliders['co2_change'], sliders['deforestation'], sliders['renewable_energy'])
+        features = build_features(scenario_rainfall, scenario_temp, scenario_humidity, scenario_co2)
+        results = predict_probabilities(features)
+        if wants_npy(request.accept_mimetypes):
+            conditions = None
+            if data.get('include_conditions'):
+                conditions = {'temperature': scenario_temp, 'rainfall': scenario_rainfall,
+                              'humidity': scenario_humidity, 'co2_level': scenario_co2}
+            response = npy_predictions_response(results, n_points, shape, conditions)
+            response.headers['X-Grid-Axes'] = ','.join(axis_values)
+            return response
         
-        # Extract region name from full region string (e.g., 'india-mumbai' -> 'mumbai')
-        region_name = region.split('-')[-1] if '-' in region else region
+        surfaces = {}
+        for model_name, result in results.items():
+            surfaces[model_name] = None if isinstance(result, Exception) else result.reshape(shape).tolist()
+        
+        response = {
+            'axes': {name: values.tolist() for name, values in axis_values.items()},
+            'fixed': fixed_values,
+            'shape': list(shape),
+            'risk_surfaces': surfaces,
+            'timestamp': datetime.now().isoformat()
+        }
+        if data.get('include_conditions'):
+            response['projected_conditions'] = {
+                'temperature': scenario_temp.reshape(shape).tolist(),
+                'rainfall': scenario_rainfall.reshape(shape).tolist(),
+                'humidity': scenario_humidity.reshape(shape).tolist(),
+                'co2_level': scenario_co2.reshape(shape).tolist()
+            }
+        return jsonify(response)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/regional-data/<region>', methods=['GET'])
+def get_regional_data(region):
+    """Get regional climate data"""
+    try:
+        # Region keys are normalized by the store (e.g. 'india-mumbai' -> 'mumbai')
+        region_data = regional_store.get(region)
         
-        if region_name in regional_data:
-            return jsonify(regional_data[region_name])
+        if region_data is not None:
+            return jsonify(region_data)
         else:
             # Return default data
-            return jsonify({'temperature': 25, 'rainfall': 100, 'humidity': 65, 'co2_level': 410})
+            return jsonify(DEFAULT_REGION_DATA)
             
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/regional-data', methods=['GET'])
+def get_regional_data_bulk():
+    """Get climate data for several regions at once (?regions=a,b,c), or all regions"""
+    try:
+        regions = [region for region in request.args.get('regions', '').split(',') if region.strip()]
+        if not regions:
+            regions = regional_store.regions()
+        
+        regional_data = {
+            region: data if data is not None else DEFAULT_REGION_DATA
+            for region, data in regional_store.get_many(regions).items()
+        }
+        return jsonify({
+            'regions': regional_data,
+            'count': len(regional_data),
+            'source': regional_store.source
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/dataset-info', methods=['GET'])
 def get_dataset_info():
-    """Get information about the available dataset"""
+    """Get information about an available dataset (?dataset=synthetic|complete|monthly)"""
     try:
-        import pandas as pd
+        dataset = request.args.get('dataset', 'synthetic')
+        if dataset not in dataset_files:
+            return jsonify({'error': f'Unknown dataset {dataset!r}, expected one of {sorted(dataset_files)}'}), 400
         
-        # Try to load synthetic dataset
+        # Served from the statistics sidecar; recomputed only when the CSV changed
         try:
-            df = pd.read_csv('../../synthetic_climate_dataset.csv')
+            stats, from_sidecar = load_dataset_stats(os.path.join(DATA_DIR, dataset_files[dataset]))
             
             info = {
                 'dataset_available': True,
-                'total_records': len(df),
-                'regions': df['Region'].unique().tolist() if 'Region' in df.columns else [],
-                'date_range': {
-                    'start': df['Date'].min() if 'Date' in df.columns else None,
-                    'end': df['Date'].max() if 'Date' in df.columns else None
-                },
-                'features': df.columns.tolist(),
-                'temperature_range': {
-                    'min': float(df['Temperature_C'].min()) if 'Temperature_C' in df.columns else None,
-                    'max': float(df['Temperature_C'].max()) if 'Temperature_C' in df.columns else None
-                },
-                'risk_distribution': {
-                    'flood': int(df['Flood_Risk'].sum()) if 'Flood_Risk' in df.columns else 0,
-                    'drought': int(df['Drought_Risk'].sum()) if 'Drought_Risk' in df.columns else 0,
-                    'heatwave': int(df['Heatwave_Risk'].sum()) if 'Heatwave_Risk' in df.columns else 0
-                }
+                'dataset': dataset,
+                'total_records': stats['total_records'],
+                'regions': stats['regions'],
+                'date_range': stats['date_range'],
+                'features': stats['features'],
+                'temperature_range': stats['temperature_range'],
+                'risk_distribution': stats['risk_distribution'],
+                'stats_source': 'sidecar' if from_sidecar else 'computed'
             }
             
         except FileNotFoundError:
             info = {
                 'dataset_available': False,
-                'message': 'Synthetic dataset not found. Run generate_synthetic_data.py to create it.'
+                'message': f'{dataset_files[dataset]} not found. Run {dataset_generators[dataset]} to create it.'
             }
         
         return jsonify(info)
@@ -356,21 +922,75 @@ def get_dataset_info():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Background retraining (/refine): one training process at a time by default,
+# job records shared by every worker through ML_REFINE_JOB_DIR
+TRAINING_DIR = os.path.abspath(os.path.join(ML_DIR, '..', '..'))
+
+def reload_refined_models(results):
+    """Swap retrained models in right away instead of waiting for the watcher"""
+    reloaded = registry.check_for_updates()
+    print(f"🔄 Refined models swapped in: {reloaded or 'none (loaded lazily on next use)'}")
+
+refine_jobs = RefineJobManager(
+    os.environ.get('ML_REFINE_JOB_DIR', os.path.join(MODEL_DIR, '.refine_jobs')),
+    TRAINING_DIR,
+    max_jobs=int(os.environ.get('ML_REFINE_MAX_JOBS', 1)),
+    n_jobs=int(os.environ.get('ML_REFINE_N_JOBS', 1)),
+    niceness=int(os.environ.get('ML_REFINE_NICE', 10)),
+    on_success=reload_refined_models
+)
+
 @app.route('/refine', methods=['POST'])
 def refine_models():
-    """Endpoint to trigger model retraining (placeholder)"""
+    """Start a background retraining job; poll /refine/<job_id> for progress"""
     try:
-        # This would typically retrain models with new data
-        # For now, just return a success message
+        data = request.get_json(silent=True) or {}
+        dataset = data.get('dataset', 'complete')
+        if dataset not in dataset_files:
+            return jsonify({'error': f"Unknown dataset '{dataset}'. Choose from: {', '.join(dataset_files)}"}), 400
+        dataset_path = os.path.join(DATA_DIR, dataset_files[dataset])
+        if not os.path.exists(dataset_path):
+            return jsonify({
+                'error': f'{dataset_files[dataset]} not found. Run {dataset_generators[dataset]} to create it.'
+            }), 404
+
+        models = data.get('models') or registry.names('risk')
+        unknown = [name for name in models if name not in registry.names('risk')]
+        if unknown:
+            return jsonify({'error': f"Unknown models: {', '.join(unknown)}"}), 400
+        outputs = {name: os.path.dirname(registry.artifact(name).path) for name in models}
+
+        job = refine_jobs.submit(dataset, dataset_path, outputs)
         return jsonify({
-            'message': 'Model refinement initiated',
-            'status': 'success',
+            'message': 'Model refinement started',
+            'status': job['status'],
+            'job_id': job['job_id'],
+            'status_url': f"/refine/{job['job_id']}",
             'timestamp': datetime.now().isoformat()
-        })
+        }), 202
+    except JobLimitReached as e:
+        return jsonify({'error': str(e), 'active_jobs': [job['job_id'] for job in refine_jobs.active_jobs()]}), 429
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/refine/<job_id>', methods=['GET'])
+def refine_job_status(job_id):
+    """Status and progress (0-1) of one refine job"""
+    job = refine_jobs.store.get(job_id)
+    if job is None:
+        return jsonify({'error': f"Unknown job '{job_id}'"}), 404
+    return jsonify(job)
+
+@app.route('/refine', methods=['GET'])
+def refine_job_list():
+    """All refine jobs, newest first"""
+    jobs = refine_jobs.store.list()
+    return jsonify({'jobs': jobs, 'active': sum(job['status'] in ('queued', 'running') for job in jobs)})
+
 if __name__ == '__main__':
     print("🚀 Starting ClimateSphere ML API...")
-    print(f"📊 Loaded models: {list(models.keys())}")
+    print(f"📊 Registered models: {registry.names()} (from {MODEL_DIR})")
+    # With the debug reloader, only the child process that serves requests warms up
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        warm_up(background=True)
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
@@ -0,0 +1,236 @@
+"""
+Background retraining jobs behind /refine
+Jobs run the training pipeline (train_models_complete.py) in a separate
+process, report progress through JSON job files and, on success, atomically
+replace the served model files so the registry swaps the new models in
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import get_context
+
+try:
+    import fcntl
+except ImportError:  # Windows: jobs are only shared within one process there
+    fcntl = None
+
+ACTIVE_STATES = ('queued', 'running')
+
+
+class JobLimitReached(Exception):
+    """Raised when the concurrent job limit is already in use"""
+
+
+class JobStore:
+    """Job records kept as one JSON file per job.
+
+    Files (rather than process memory) let every pre-forked worker, and the
+    training process itself, read and update the same job.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, job_id):
+        return os.path.join(self.directory, f'{job_id}.json')
+
+    @contextmanager
+    def locked(self):
+        """Exclusive lock across processes for read-modify-write sequences"""
+        with self._lock, open(os.path.join(self.directory, '.lock'), 'w') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def write(self, job):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(job, f, indent=2)
+            os.replace(tmp_path, self._path(job['job_id']))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def get(self, job_id):
+        try:
+            with open(self._path(job_id), 'r') as f:
+                job = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return self._check_alive(job)
+
+    def update(self, job_id, **fields):
+        with self.locked():
+            job = self.get(job_id)
+            if job is None:
+                return None
+            job.update(fields)
+            self.write(job)
+        return job
+
+    def list(self):
+        jobs = []
+        for filename in os.listdir(self.directory):
+            if filename.endswith('.json'):
+                job = self.get(filename[:-len('.json')])
+                if job is not None:
+                    jobs.append(job)
+        return sorted(jobs, key=lambda job: job['created_at'], reverse=True)
+
+    def _check_alive(self, job):
+        """Mark jobs whose serving and training processes both died as failed"""
+        if job['status'] in ACTIVE_STATES and not (_pid_alive(job.get('owner_pid')) or _pid_alive(job.get('pid'))):
+            job.update(status='failed', error='interrupted: the process that owned the job exited',
+                       finished_at=time.time())
+        return job
+
+
+def _pid_alive(pid):
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def run_training_job(store_dir, job_id, pipeline_dir, dataset_path, outputs, n_jobs=1, niceness=10):
+    """Process-pool entry point: train into a staging directory, then promote.
+
+    ``outputs`` maps model name -> the directory its served artifacts live
+    in. The scaler, model and pipeline files are moved into place with
+    os.replace in that order, so a reader sees either the old model or the
+    new one, never a partial file.
+    """
+    store = JobStore(store_dir)
+    if niceness and hasattr(os, 'nice'):
+        os.nice(niceness)  # Leave the CPU to the serving processes
+    store.update(job_id, status='running', started_at=time.time(), pid=os.getpid(),
+                 progress=0.0, stage='Starting')
+
+    def report(fraction, message):
+        store.update(job_id, progress=round(0.9 * fraction, 3), stage=message)
+
+    staging_dir = tempfile.mkdtemp(prefix='.refine-', dir=next(iter(outputs.values())))
+    try:
+        if pipeline_dir not in sys.path:
+            sys.path.insert(0, pipeline_dir)
+        import train_models_complete as pipeline
+
+        trained = pipeline.train_climate_models(dataset_path, output_dir=staging_dir, targets=list(outputs),
+                                                progress=report, n_jobs=n_jobs)
+
+        store.update(job_id, progress=0.95, stage='Swapping in new models')
+        results = {}
+        for name, directory in outputs.items():
+            filenames = pipeline.artifact_filenames(pipeline.RISK_TARGETS[name][1])
+            for filename in filenames:
+                os.replace(os.path.join(staging_dir, filename), os.path.join(directory, filename))
+            results[name] = {'accuracy': trained[name]['accuracy'], 'path': os.path.join(directory, filenames[-1])}
+
+        store.update(job_id, status='succeeded', progress=1.0, stage='Done', results=results,
+                     finished_at=time.time())
+        return results
+    except Exception as e:
+        store.update(job_id, status='failed', error=str(e), traceback=traceback.format_exc(),
+                     finished_at=time.time())
+        raise
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+class RefineJobManager:
+    """Submits retraining jobs to a process pool, at most ``max_jobs`` at a time.
+
+    The pool uses the spawn start method so the training process does not
+    inherit the serving process's threads and locks. ``on_success(results)``
+    runs in the serving process once a job's models are in place.
+    """
+
+    def __init__(self, store_dir, pipeline_dir, max_jobs=1, n_jobs=1, niceness=10, on_success=None):
+        self.store = JobStore(store_dir)
+        self.pipeline_dir = pipeline_dir
+        self.max_jobs = max_jobs
+        self.n_jobs = n_jobs
+        self.niceness = niceness
+        self.on_success = on_success
+        self._executor = None
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        # A pool created in the parent cannot be used from a forked worker
+        self._executor = None
+
+    def executor(self):
+        if self._executor is None:
+            context = get_context('spawn')
+            try:
+                # A fresh process per job, so the training memory is returned afterwards
+                self._executor = ProcessPoolExecutor(max_workers=self.max_jobs, mp_context=context,
+                                                     max_tasks_per_child=1)
+            except TypeError:  # Python < 3.11
+                self._executor = ProcessPoolExecutor(max_workers=self.max_jobs, mp_context=context)
+        return self._executor
+
+    def active_jobs(self):
+        return [job for job in self.store.list() if job['status'] in ACTIVE_STATES]
+
+    def submit(self, dataset, dataset_path, outputs):
+        """Queue a job, or raise JobLimitReached when ``max_jobs`` are active"""
+        with self.store.locked():
+            if len(self.active_jobs()) >= self.max_jobs:
+                raise JobLimitReached(f'{self.max_jobs} refine job(s) already running')
+            job = {
+                'job_id': uuid.uuid4().hex[:12],
+                'status': 'queued',
+                'dataset': dataset,
+                'models': list(outputs),
+                'progress': 0.0,
+                'stage': 'Queued',
+                'created_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'owner_pid': os.getpid(),
+                'pid': None,
+                'results': None,
+                'error': None
+            }
+            self.store.write(job)
+
+        future = self.executor().submit(run_training_job, self.store.directory, job['job_id'], self.pipeline_dir,
+                                        dataset_path, outputs, self.n_jobs, self.niceness)
+        future.add_done_callback(lambda done: self._finished(job['job_id'], done))
+        return job
+
+    def _finished(self, job_id, future):
+        error = future.exception()
+        if error is not None:
+            print(f"❌ Refine job {job_id} failed: {error}")
+            # The job file is normally updated by the training process; cover crashes
+            job = self.store.get(job_id)
+            if job is not None and job['status'] in ACTIVE_STATES:
+                self.store.update(job_id, status='failed', error=str(error), finished_at=time.time())
+            return
+        print(f"✅ Refine job {job_id} finished: {sorted(future.result())}")
+        if self.on_success is not None:
+            try:
+                self.on_success(future.result())
+            except Exception as e:
+                print(f"⚠️ Refine job {job_id} post-processing failed: {e}")
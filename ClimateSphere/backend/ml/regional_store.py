@@ -0,0 +1,135 @@
+"""
+Regional climate data store for the ClimateSphere ML API
+Keeps regional_climate_data.json and regional_climate_summary.csv indexed in
+memory and reloads them only when the files change
+"""
+
+import csv
+import json
+import os
+import threading
+import time
+
+# Used when regional_climate_data.json has not been generated yet
+FALLBACK_REGIONAL_DATA = {
+    'mumbai': {'temperature': 28.5, 'rainfall': 120, 'humidity': 75, 'co2_level': 420},
+    'delhi': {'temperature': 32, 'rainfall': 65, 'humidity': 60, 'co2_level': 450},
+    'kolkata': {'temperature': 30, 'rainfall': 140, 'humidity': 80, 'co2_level': 430},
+    'gujarat': {'temperature': 35, 'rainfall': 45, 'humidity': 55, 'co2_level': 440},
+    'chennai': {'temperature': 31, 'rainfall': 95, 'humidity': 78, 'co2_level': 425},
+    'kashmir': {'temperature': 18, 'rainfall': 180, 'humidity': 65, 'co2_level': 380}
+}
+
+# Returned for regions we have no data for
+DEFAULT_REGION_DATA = {'temperature': 25, 'rainfall': 100, 'humidity': 65, 'co2_level': 410}
+
+# regional_climate_summary.csv columns matching the JSON fields
+SUMMARY_MEAN_COLUMNS = {
+    'temperature': 'Temperature_C_mean',
+    'rainfall': 'Rainfall_mm_mean',
+    'humidity': 'Humidity_%_mean',
+    'co2_level': 'CO2_ppm_mean'
+}
+
+
+def normalize_region(region):
+    """Normalize a region key, e.g. 'india-mumbai' -> 'mumbai', 'New York' -> 'newyork'"""
+    region = str(region).strip().lower()
+    region = region.split('-')[-1]
+    return region.replace(' ', '').replace('_', '').replace('.', '')
+
+
+def _parse_number(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return value
+    return int(number) if number.is_integer() and '.' not in str(value) else number
+
+
+class RegionalDataStore:
+    """Indexed, file-backed lookup of per-region climate data.
+
+    Files are re-checked at most every ``check_interval`` seconds and
+    re-parsed only when their mtime or size has changed.
+    """
+
+    def __init__(self, json_path, csv_path=None, check_interval=1.0):
+        self.json_path = json_path
+        self.csv_path = csv_path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._index = {}
+        self._signature = None
+        self._last_check = 0.0
+        self.source = None
+        self.loads = 0
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        # The parent may have held the lock mid-reload when it forked
+        self._lock = threading.Lock()
+
+    def _file_signature(self):
+        signature = []
+        for path in (self.json_path, self.csv_path):
+            if path and os.path.exists(path):
+                stat = os.stat(path)
+                signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def _load(self):
+        """Parse the JSON and CSV into a dict keyed by normalized region"""
+        index = {}
+        source = 'fallback'
+        try:
+            with open(self.json_path, 'r') as f:
+                regional_data = json.load(f)
+            source = 'file'
+        except (FileNotFoundError, ValueError):
+            regional_data = FALLBACK_REGIONAL_DATA
+        for region, record in regional_data.items():
+            index[normalize_region(region)] = dict(record)
+
+        if self.csv_path and os.path.exists(self.csv_path):
+            with open(self.csv_path, 'r', newline='') as f:
+                for row in csv.DictReader(f):
+                    region = normalize_region(row.pop('Region', ''))
+                    summary = {column: _parse_number(value) for column, value in row.items()}
+                    if region not in index:
+                        # Region only present in the CSV: derive the API fields from its means
+                        index[region] = {
+                            field: summary.get(column, DEFAULT_REGION_DATA[field])
+                            for field, column in SUMMARY_MEAN_COLUMNS.items()
+                        }
+                    index[region]['summary'] = summary
+        return index, source
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._signature is not None and now - self._last_check < self.check_interval:
+            return
+        with self._lock:
+            self._last_check = now
+            signature = self._file_signature()
+            if signature == self._signature:
+                return
+            self._index, self.source = self._load()
+            self._signature = signature
+            self.loads += 1
+
+    def get(self, region):
+        """Data for one region, or None if unknown"""
+        self._refresh()
+        return self._index.get(normalize_region(region))
+
+    def get_many(self, regions):
+        """Dict of requested region -> data (None for unknown regions)"""
+        self._refresh()
+        index = self._index
+        return {region: index.get(normalize_region(region)) for region in regions}
+
+    def regions(self):
+        self._refresh()
+        return sorted(self._index)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+ClimateSphere ML API - route consistency checks
+Replays request sequences that share prediction cache entries across routes
+in-process (Flask test client) and fails when any request does not return
+200. Run it with the settings under test, e.g.:
+
+    ML_MICROBATCH=1 python route_checks.py
+"""
+
+import sys
+from datetime import datetime
+
+import prediction_api
+
+# /predict caches the row that /scenario and /future then derive for the same conditions
+SEQUENCES = {
+    'predict then scenario': [
+        ('/predict', {'temperature': 25.15, 'rainfall': 100, 'humidity': 60, 'co2_level': 480}),
+        ('/scenario', {'co2_change': 20}),
+    ],
+    'predict then future': [
+        ('/predict', {'temperature': 25, 'rainfall': 100, 'humidity': 60, 'co2_level': 400}),
+        ('/future', {'year': datetime.now().year}),  # zero years ahead: the base conditions
+    ],
+}
+
+
+def run_checks():
+    """Run every sequence on a cleared cache; returns the failures"""
+    client = prediction_api.app.test_client()
+    failures = []
+    for name, steps in SEQUENCES.items():
+        prediction_api.prediction_cache.clear()
+        for path, payload in steps:
+            response = client.post(path, json=payload)
+            if response.status_code != 200:
+                failures.append(f"{name}: {path} returned {response.status_code} {response.get_data(as_text=True)[:200]}")
+                break
+    return failures
+
+
+if __name__ == '__main__':
+    prediction_api.warm_up()
+    failures = run_checks()
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print(f"✅ {len(SEQUENCES)} route sequences returned 200 "
+              f"(micro-batching {'on' if prediction_api.micro_batcher else 'off'})")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+ClimateSphere ML API - production server
+Pre-fork serving: the master loads every model once, then forks workers that
+share the model memory copy-on-write and accept on one listening socket.
+
+    python serve.py --port 5000 --workers 4
+
+Signals (master): HUP reloads changed model files and replaces the workers
+one generation at a time; TERM/INT stops the workers after in-flight
+requests finish. On platforms without fork() this falls back to a single
+threaded process.
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import make_server
+
+import prediction_api
+
+
+def available_cpus():
+    """CPUs this process may run on (respects cgroup/taskset limits)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def use_thread_pool(server, threads):
+    """Handle ``server``'s requests on a fixed pool of ``threads`` threads.
+
+    The accept loop waits while every thread is busy, so extra connections
+    queue in the listen backlog instead of getting a thread each.
+    """
+    pool = ThreadPoolExecutor(threads, thread_name_prefix='request')
+    free = threading.BoundedSemaphore(threads)
+    close = server.server_close
+
+    def handle(request, client_address):
+        try:
+            server.finish_request(request, client_address)
+        except Exception:
+            server.handle_error(request, client_address)
+        finally:
+            server.shutdown_request(request)
+            free.release()
+
+    def process_request(request, client_address):
+        free.acquire()
+        pool.submit(handle, request, client_address)
+
+    def server_close():
+        # Stop accepting, then wait for in-flight requests
+        close()
+        pool.shutdown(wait=True)
+
+    server.process_request = process_request
+    server.server_close = server_close
+
+
+class PreforkServer:
+    """Master process that owns the socket and supervises forked workers"""
+
+    def __init__(self, host, port, workers, threads=1, pin_cpus=True, graceful_timeout=30.0):
+        self.host = host
+        self.port = port
+        self.cpus = available_cpus()
+        self.n_workers = workers or len(self.cpus)
+        self.threads = threads
+        self.pin_cpus = pin_cpus and hasattr(os, 'sched_setaffinity')
+        self.graceful_timeout = graceful_timeout
+        self.workers = {}  # pid -> worker slot
+        self.running = True
+        self.reload_requested = False
+
+    def bind(self):
+        family = socket.AF_INET6 if ':' in self.host else socket.AF_INET
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((self.host, self.port))
+        self.sock.listen(128)
+        self.sock.set_inheritable(True)
+
+    def preload(self):
+        """Load, compile and warm every model in the master so workers inherit them warm"""
+        prediction_api.warm_up()
+        self.freeze()
+
+    def freeze(self):
+        # Move everything loaded so far out of the GC's reach; otherwise the
+        # collector's bookkeeping writes would un-share the pages in every worker
+        gc.collect()
+        if hasattr(gc, 'freeze'):
+            gc.freeze()
+
+    def spawn(self, slot):
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = slot
+            return
+        # Child
+        try:
+            self.run_worker(slot)
+        finally:
+            os._exit(0)
+
+    def run_worker(self, slot):
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_DFL)
+        if self.pin_cpus:
+            os.sched_setaffinity(0, {self.cpus[slot % len(self.cpus)]})
+
+        server = make_server(self.host, self.port, prediction_api.app, fd=self.sock.fileno())
+        if self.threads > 1:
+            use_thread_pool(server, self.threads)
+
+        def stop(signum, frame):
+            # shutdown() waits for serve_forever to return, so call it off the main thread
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, stop)
+        print(f"👷 Worker {slot} (pid {os.getpid()}) serving on {self.host}:{self.port}")
+        server.serve_forever()
+        server.server_close()
+
+    def stop_workers(self, pids):
+        """TERM the given workers and wait for them, KILLing stragglers"""
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.graceful_timeout
+        remaining = set(pids)
+        while remaining and time.monotonic() < deadline:
+            for pid in list(remaining):
+                try:
+                    done, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    done = pid
+                if done:
+                    remaining.discard(pid)
+                    self.workers.pop(pid, None)
+            time.sleep(0.1)
+        for pid in remaining:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            self.workers.pop(pid, None)
+
+    def reload(self):
+        """Graceful restart: refresh models, start a new generation, retire the old one"""
+        reloaded = prediction_api.registry.check_for_updates()
+        print(f"🔄 Reloading workers (updated models: {reloaded or 'none'})")
+        if hasattr(gc, 'unfreeze'):
+            gc.unfreeze()
+        # warm_up() only runs once per process, so warm the models explicitly before forking
+        if os.environ.get('ML_WARMUP', '1') == '1':
+            prediction_api.warm_up_again()
+        self.freeze()
+        old = list(self.workers)
+        for slot in range(self.n_workers):
+            self.spawn(slot)
+        self.stop_workers(old)
+
+    def run(self):
+        self.bind()
+        self.preload()
+        print(f"🚀 ClimateSphere ML API: {self.n_workers} workers on {self.host}:{self.port}")
+        print(f"📊 Models: {list(prediction_api.registry.group('risk'))}")
+
+        def on_stop(signum, frame):
+            self.running = False
+
+        def on_hup(signum, frame):
+            self.reload_requested = True
+
+        signal.signal(signal.SIGTERM, on_stop)
+        signal.signal(signal.SIGINT, on_stop)
+        signal.signal(signal.SIGHUP, on_hup)
+
+        for slot in range(self.n_workers):
+            self.spawn(slot)
+
+        while self.running:
+            if self.reload_requested:
+                self.reload_requested = False
+                self.reload()
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                pid = 0
+            if pid and pid in self.workers:
+                # A worker died unexpectedly: replace it in the same slot
+                slot = self.workers.pop(pid)
+                print(f"⚠️ Worker {slot} (pid {pid}) exited with status {status}, restarting")
+                self.spawn(slot)
+            else:
+                time.sleep(0.2)
+
+        print("🛑 Stopping workers...")
+        self.stop_workers(list(self.workers))
+        self.sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the ClimateSphere ML API with pre-forked workers')
+    parser.add_argument('--host', default=os.environ.get('ML_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('ML_PORT', 5000)))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('ML_WORKERS', 0)),
+                        help='worker processes (default: one per available CPU)')
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('ML_WORKER_THREADS', 1)),
+                        help='request threads per worker, a fixed pool (default 1: requests are handled one at a time)')
+    parser.add_argument('--no-pin', action='store_true', help='do not pin workers to CPUs')
+    parser.add_argument('--graceful-timeout', type=float, default=30.0)
+    args = parser.parse_args()
+
+    if not hasattr(os, 'fork'):
+        print("⚠️ fork() is not available on this platform, serving from a single process")
+        prediction_api.warm_up()
+        prediction_api.app.run(host=args.host, port=args.port, threaded=True, debug=False)
+        return
+
+    PreforkServer(args.host, args.port, args.workers, threads=args.threads,
+                  pin_cpus=not args.no_pin, graceful_timeout=args.graceful_timeout).run()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Streaming scoring of uploaded climate CSVs
+Reads an upload in fixed-size chunks, maps its columns to the model inputs,
+scores every chunk with the risk models and yields NDJSON lines while the
+scored rows are appended to a processed CSV, so memory use does not grow
+with the file size
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from dataset_stats import StatsAccumulator, write_stats_sidecar
+
+CHUNK_ROWS = 10000
+
+# Column names recognised for each model input (the names
+# ClimateDataCleaner.detect_and_create_features accepts, model2_dataset/clean.py).
+# Only the four API inputs feed the risk models; the other training columns
+# are derived from them (inference_pipeline.derive_features).
+FEATURE_MAPPING = {
+    'temperature': ['Temperature_C', 'temp', 'temperature', 'Temperature', 'TEMP'],
+    'rainfall': ['Rainfall_mm', 'rain', 'rainfall', 'precipitation', 'Rainfall', 'RAIN'],
+    'humidity': ['Humidity_%', 'humidity', 'Humidity', 'HUMIDITY', 'rh'],
+    'co2': ['CO2_ppm', 'co2', 'CO2', 'carbon_dioxide', 'CO2_LEVEL']
+}
+
+# Features the risk models read, with the value used when a column is
+# missing or a cell is empty. The cleaner fills missing features with random
+# data; scoring uses the API's fixed defaults so results are reproducible.
+MODEL_INPUT_DEFAULTS = {'temperature': 25.0, 'rainfall': 100.0, 'humidity': 60.0, 'co2': 400.0}
+
+
+def detect_columns(columns):
+    """Map feature type -> column name, first match per feature like the cleaner"""
+    found = {}
+    for feature_type, possible_names in FEATURE_MAPPING.items():
+        for column in columns:
+            if column in possible_names:
+                found[feature_type] = column
+                break
+    return found
+
+
+def _ndjson(record):
+    return json.dumps(record) + '\n'
+
+
+def stream_scored_csv(raw_path, processed_path, predict_fn, levels_fn, chunk_rows=CHUNK_ROWS):
+    """Score ``raw_path`` chunk by chunk, yielding NDJSON lines.
+
+    ``predict_fn(temperature, rainfall, humidity, co2)`` returns a dict of
+    model name -> probability array (or exception) and ``levels_fn`` maps
+    probabilities to labels. Lines are a ``start`` record, one ``chunk``
+    record per chunk (columnar predictions, like /predict/batch) and an
+    ``end`` (or ``error``) record. The processed CSV - the upload plus a
+    probability and level column per model - is written to a temporary file
+    and renamed into place only once the whole file has been scored, with
+    its statistics sidecar (dataset_stats.py) gathered in the same pass.
+    """
+    started = time.perf_counter()
+    directory = os.path.dirname(os.path.abspath(processed_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.csv.tmp')
+    completed = False
+    try:
+        with os.fdopen(fd, 'w', newline='') as output:
+            rows = 0
+            filled = dict.fromkeys(MODEL_INPUT_DEFAULTS, 0)
+            stats = StatsAccumulator()
+            mapping = None
+            for index, chunk in enumerate(pd.read_csv(raw_path, chunksize=chunk_rows)):
+                if mapping is None:
+                    mapping = detect_columns(chunk.columns)
+                    yield _ndjson({
+                        'type': 'start',
+                        'file': os.path.basename(raw_path),
+                        'columns': mapping,
+                        'defaults_used_for': [name for name in MODEL_INPUT_DEFAULTS if name not in mapping],
+                        'chunk_rows': chunk_rows
+                    })
+
+                inputs = {}
+                for name, default in MODEL_INPUT_DEFAULTS.items():
+                    if name in mapping:
+                        values = pd.to_numeric(chunk[mapping[name]], errors='coerce').to_numpy(dtype=float, copy=True)
+                        missing = np.isnan(values)
+                        filled[name] += int(missing.sum())
+                        values[missing] = default
+                    else:
+                        values = np.full(len(chunk), default)
+                    inputs[name] = values
+
+                predictions = {}
+                for model_name, result in predict_fn(**inputs).items():
+                    if isinstance(result, Exception):
+                        predictions[model_name] = {'risk_probability': None, 'risk_level': None, 'error': str(result)}
+                        chunk[f'{model_name}_risk_probability'] = np.nan
+                        chunk[f'{model_name}_risk_level'] = ''
+                    else:
+                        levels = levels_fn(result)
+                        predictions[model_name] = {'risk_probability': result.tolist(), 'risk_level': levels.tolist()}
+                        chunk[f'{model_name}_risk_probability'] = result
+                        chunk[f'{model_name}_risk_level'] = levels
+
+                chunk.to_csv(output, header=index == 0, index=False)
+                stats.add(chunk)
+                yield _ndjson({'type': 'chunk', 'index': index, 'row_offset': rows, 'count': len(chunk),
+                               'predictions': predictions})
+                rows += len(chunk)
+
+        if mapping is None:
+            raise ValueError('the file has no rows')
+        os.chmod(tmp_path, 0o644)  # mkstemp creates 0600; the Node backend reads these files too
+        os.replace(tmp_path, processed_path)
+        completed = True
+        try:
+            write_stats_sidecar(processed_path, stats.stats())
+        except OSError as e:
+            print(f"⚠️ Could not write stats sidecar for {processed_path}: {e}")
+        yield _ndjson({
+            'type': 'end',
+            'rows': rows,
+            'chunks': index + 1,
+            'missing_values_filled': filled,
+            'processed_file': os.path.basename(processed_path),
+            'duration_seconds': round(time.perf_counter() - started, 3)
+        })
+    except Exception as e:
+        yield _ndjson({'type': 'error', 'error': str(e)})
+    finally:
+        # Also runs when the client disconnects and the generator is closed
+        if not completed and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def processed_filename(raw_filename):
+    stem, _ = os.path.splitext(raw_filename)
+    return f'{stem}_scored.csv'
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Usage: python upload_scoring.py <upload.csv> [processed.csv]")
+        sys.exit(1)
+    import prediction_api
+
+    raw_path = sys.argv[1]
+    processed_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(
+        prediction_api.PROCESSED_UPLOAD_DIR, processed_filename(os.path.basename(raw_path)))
+    for line in stream_scored_csv(raw_path, processed_path, prediction_api.score_conditions,
+                                  prediction_api.risk_levels):
+        record = json.loads(line)
+        if record['type'] == 'chunk':
+            print(f"📦 Chunk {record['index']}: {record['count']} rows")
+        else:
+            print(line, end='')
@@ -0,0 +1,157 @@
+"""
+Startup warm-up for the ClimateSphere ML API
+Runs synthetic batches through every loaded model so the first real request
+does not pay for lazy imports, first-touch page faults or allocator growth
+"""
+
+import threading
+import time
+import traceback
+
+import numpy as np
+
+# Batch sizes run through each model: single rows (the /predict path), small
+# micro-batches and one batch large enough to take the sklearn path
+WARMUP_BATCH_SIZES = (1, 8, 64, 2048)
+
+
+def feature_ranges(model, n_features):
+    """(low, high) arrays spanning the split thresholds of a tree model, per input feature.
+
+    Covers sklearn trees and forests and xgboost models; features without
+    splits (and other models) get the 0-1 range.
+    """
+    low = np.zeros(n_features)
+    high = np.ones(n_features)
+    thresholds = [[] for _ in range(n_features)]
+    trees = getattr(model, 'estimators_', None)
+    if trees is None and hasattr(model, 'tree_'):
+        trees = [model]
+    if trees is not None and all(hasattr(tree, 'tree_') for tree in trees):
+        for tree in trees:
+            split = tree.tree_.feature >= 0
+            for column, threshold in zip(tree.tree_.feature[split], tree.tree_.threshold[split]):
+                thresholds[column].append(threshold)
+    elif hasattr(model, 'get_booster'):
+        booster = model.get_booster()
+        names = booster.feature_names or [f'f{i}' for i in range(n_features)]
+        splits = booster.trees_to_dataframe()
+        splits = splits[splits['Feature'] != 'Leaf']
+        for name, threshold in zip(splits['Feature'], splits['Split']):
+            thresholds[names.index(name)].append(threshold)
+    for column, values in enumerate(thresholds):
+        if values:
+            span = max(values) - min(values) or 1.0
+            low[column] = min(values) - 0.1 * span
+            high[column] = max(values) + 0.1 * span
+    return low, high
+
+
+def synthetic_features(n_rows, low, high, rng):
+    """Random features drawn uniformly between per-feature ``low`` and ``high``"""
+    return rng.uniform(low, high, size=(n_rows, len(low)))
+
+
+def warm_up_model(model, scaler=None, n_features=None, batch_sizes=WARMUP_BATCH_SIZES, rounds=2, seed=0):
+    """Score synthetic batches with one model (and its scaler); returns the rows scored.
+
+    With a fitted StandardScaler, raw inputs are drawn within two standard
+    deviations of its training mean and scaled before scoring; otherwise
+    inputs span the model's own split thresholds, so the batches walk real
+    tree paths.
+    """
+    n_features = n_features or getattr(model, 'n_features_in_', None) or getattr(scaler, 'n_features_in_', None)
+    if n_features is None:
+        raise ValueError('cannot infer the number of input features')
+    rng = np.random.default_rng(seed)
+    if getattr(scaler, 'mean_', None) is not None and getattr(scaler, 'scale_', None) is not None:
+        low, high = scaler.mean_ - 2 * scaler.scale_, scaler.mean_ + 2 * scaler.scale_
+    else:
+        scaler = None
+        low, high = feature_ranges(model, n_features)
+    predict = model.predict_proba if hasattr(model, 'predict_proba') else model.predict
+    scored = 0
+    for _ in range(rounds):
+        for n_rows in batch_sizes:
+            features = synthetic_features(n_rows, low, high, rng)
+            if scaler is not None:
+                features = scaler.transform(features)
+            predict(features)
+            scored += n_rows
+    return scored
+
+
+class Readiness:
+    """Tracks the warm-up phase; the API reports ready once it has finished"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self.started_at = None
+        self.finished_at = None
+        self.models_warmed = []
+        self.errors = {}
+
+    @property
+    def ready(self):
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        return self._event.wait(timeout)
+
+    def run(self, steps):
+        """Run the warm-up once and mark the service ready.
+
+        ``steps`` is a dict of name -> callable, or a function returning one
+        (so model loading can happen on the warm-up thread too).
+        """
+        with self._lock:
+            if self.started_at is not None:
+                return
+            self.started_at = time.time()
+        if callable(steps):
+            try:
+                steps = steps()
+            except Exception as e:
+                self.errors['load'] = str(e)
+                print(f"⚠️ Warm-up could not load models: {e}")
+                steps = {}
+        for name, step in steps.items():
+            try:
+                step()
+                self.models_warmed.append(name)
+            except Exception as e:
+                self.errors[name] = str(e)
+                print(f"⚠️ Warm-up failed for {name}: {e}")
+                traceback.print_exc()
+        self.finished_at = time.time()
+        self._event.set()
+        print(f"🔥 Warm-up finished in {self.finished_at - self.started_at:.2f}s "
+              f"({len(self.models_warmed)} models warmed)")
+
+    def start(self, steps):
+        """Run the warm-up on a background thread so /health answers meanwhile"""
+        thread = threading.Thread(target=self.run, args=(steps,), name='warm-up', daemon=True)
+        thread.start()
+        return thread
+
+    def skip(self):
+        """Mark the service ready without warming up (ML_WARMUP=0)"""
+        with self._lock:
+            self.started_at = self.finished_at = time.time()
+        self._event.set()
+
+    def status(self):
+        status = 'ready' if self.ready else 'warming_up' if self.started_at else 'starting'
+        duration = None
+        if self.started_at is not None:
+            duration = (self.finished_at or time.time()) - self.started_at
+        return {
+            'ready': self.ready,
+            'status': status,
+            'warm_up': {
+                'models_warmed': list(self.models_warmed),
+                'errors': dict(self.errors),
+                'duration_seconds': duration
+            }
+        }
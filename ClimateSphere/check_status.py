@@ -9,6 +9,9 @@ from datetime import datetime
 def check_service(name, url, expected_status=200):
     try:
         response = requests.get(url, timeout=5)
+        if response.status_code == 503 and url.endswith('/ready'):
+            print(f"⏳ {name}: WARMING UP ({response.status_code})")
+            return False, None
         if response.status_code == expected_status:
             print(f"✅ {name}: HEALTHY ({response.status_code})")
             return True, response.json() if response.headers.get('content-type', '').startswith('application/json') else response.text
@@ -33,7 +36,7 @@ def main():
     
     services = [
         ("Backend API", "http://localhost:3000/health"),
-        ("ML API", "http://localhost:5000/health"),
+        ("ML API", "http://localhost:5000/ready"),
         ("Frontend", "http://localhost:8000/index.html"),
     ]
     
@@ -50,6 +53,8 @@ def main():
                 print(f"   📊 Models: {', '.join(data['models_loaded'])}")
             if 'status' in data:
                 print(f"   📈 Status: {data['status']}")
+            if 'warm_up' in data and data['warm_up'].get('duration_seconds') is not None:
+                print(f"   🔥 Warm-up: {data['warm_up']['duration_seconds']:.1f}s")
     
     print()
     if all_healthy:
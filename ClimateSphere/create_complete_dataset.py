@@ -6,178 +6,178 @@ Generates comprehensive climate data for all regions and scenarios
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
+import argparse
 import json
 import os
+import time
 
-def create_complete_climate_dataset():
-    """Create a comprehensive climate dataset with all required features"""
+from backend.ml.dataset_stats import write_stats_sidecar
+
+# Extended regional data (matching frontend regions)
+REGIONS_DATA = {
+    'mumbai': {'temp': 28.5, 'rain': 120, 'humidity': 75, 'co2': 420, 'country': 'India'},
+    'delhi': {'temp': 32, 'rain': 65, 'humidity': 60, 'co2': 450, 'country': 'India'},
+    'kolkata': {'temp': 30, 'rain': 140, 'humidity': 80, 'co2': 430, 'country': 'India'},
+    'gujarat': {'temp': 35, 'rain': 45, 'humidity': 55, 'co2': 440, 'country': 'India'},
+    'chennai': {'temp': 31, 'rain': 95, 'humidity': 78, 'co2': 425, 'country': 'India'},
+    'kashmir': {'temp': 18, 'rain': 180, 'humidity': 65, 'co2': 380, 'country': 'India'},
+    'california': {'temp': 22, 'rain': 85, 'humidity': 60, 'co2': 410, 'country': 'USA'},
+    'texas': {'temp': 28, 'rain': 75, 'humidity': 65, 'co2': 415, 'country': 'USA'},
+    'florida': {'temp': 26, 'rain': 130, 'humidity': 80, 'co2': 405, 'country': 'USA'},
+    'newyork': {'temp': 15, 'rain': 110, 'humidity': 70, 'co2': 400, 'country': 'USA'},
+    'beijing': {'temp': 14, 'rain': 60, 'humidity': 55, 'co2': 480, 'country': 'China'},
+    'shanghai': {'temp': 18, 'rain': 115, 'humidity': 75, 'co2': 470, 'country': 'China'},
+    'guangzhou': {'temp': 24, 'rain': 165, 'humidity': 80, 'co2': 460, 'country': 'China'},
+    'london': {'temp': 12, 'rain': 150, 'humidity': 75, 'co2': 390, 'country': 'UK'},
+    'manchester': {'temp': 10, 'rain': 170, 'humidity': 80, 'co2': 385, 'country': 'UK'},
+    'edinburgh': {'temp': 9, 'rain': 160, 'humidity': 78, 'co2': 380, 'country': 'UK'},
+    'dubai': {'temp': 38, 'rain': 15, 'humidity': 45, 'co2': 450, 'country': 'UAE'},
+    'abudhabi': {'temp': 37, 'rain': 12, 'humidity': 50, 'co2': 445, 'country': 'UAE'},
+    'karachi': {'temp': 30, 'rain': 35, 'humidity': 70, 'co2': 435, 'country': 'Pakistan'},
+    'lahore': {'temp': 28, 'rain': 55, 'humidity': 65, 'co2': 440, 'country': 'Pakistan'},
+    'islamabad': {'temp': 25, 'rain': 85, 'humidity': 60, 'co2': 425, 'country': 'Pakistan'},
+    'moscow': {'temp': 8, 'rain': 90, 'humidity': 70, 'co2': 420, 'country': 'Russia'},
+    'stpetersburg': {'temp': 6, 'rain': 95, 'humidity': 75, 'co2': 415, 'country': 'Russia'},
+    'novosibirsk': {'temp': 2, 'rain': 70, 'humidity': 65, 'co2': 410, 'country': 'Russia'}
+}
+
+def generate_climate_records(n_samples, seed=42, regions_data=REGIONS_DATA, today=None, rng=None):
+    """Generate ``n_samples`` climate records with whole-array NumPy operations
+
+    Same model as the original per-row loop (regional baselines, seasonal and
+    monsoon terms, warming trends, noise, risk labels and rare extreme
+    events), drawn from ``rng`` (default ``np.random.default_rng(seed)``).
+    """
+    rng = rng if rng is not None else np.random.default_rng(seed)
+    regions = list(regions_data)
+    base = pd.DataFrame.from_dict(regions_data, orient='index')
     
-    print("🌍 Creating complete climate dataset...")
+    # Random region and date (last 10 years)
+    region_codes = rng.integers(0, len(regions), n_samples)
+    days_back = rng.integers(0, 365 * 10, n_samples)
+    today = np.datetime64(today or datetime.now().date(), 'D')
+    dates = today - days_back.astype('timedelta64[D]')
+    years = dates.astype('datetime64[Y]')
+    year = years.astype(int) + 1970
+    month = dates.astype('datetime64[M]').astype(int) % 12 + 1
+    day_of_year = (dates - years).astype(int) + 1
     
-    # Set random seed for reproducibility
-    np.random.seed(42)
-    
-    # Extended regional data (matching frontend regions)
-    regions_data = {
-        'mumbai': {'temp': 28.5, 'rain': 120, 'humidity': 75, 'co2': 420, 'country': 'India'},
-        'delhi': {'temp': 32, 'rain': 65, 'humidity': 60, 'co2': 450, 'country': 'India'},
-        'kolkata': {'temp': 30, 'rain': 140, 'humidity': 80, 'co2': 430, 'country': 'India'},
-        'gujarat': {'temp': 35, 'rain': 45, 'humidity': 55, 'co2': 440, 'country': 'India'},
-        'chennai': {'temp': 31, 'rain': 95, 'humidity': 78, 'co2': 425, 'country': 'India'},
-        'kashmir': {'temp': 18, 'rain': 180, 'humidity': 65, 'co2': 380, 'country': 'India'},
-        'california': {'temp': 22, 'rain': 85, 'humidity': 60, 'co2': 410, 'country': 'USA'},
-        'texas': {'temp': 28, 'rain': 75, 'humidity': 65, 'co2': 415, 'country': 'USA'},
-        'florida': {'temp': 26, 'rain': 130, 'humidity': 80, 'co2': 405, 'country': 'USA'},
-        'newyork': {'temp': 15, 'rain': 110, 'humidity': 70, 'co2': 400, 'country': 'USA'},
-        'beijing': {'temp': 14, 'rain': 60, 'humidity': 55, 'co2': 480, 'country': 'China'},
-        'shanghai': {'temp': 18, 'rain': 115, 'humidity': 75, 'co2': 470, 'country': 'China'},
-        'guangzhou': {'temp': 24, 'rain': 165, 'humidity': 80, 'co2': 460, 'country': 'China'},
-        'london': {'temp': 12, 'rain': 150, 'humidity': 75, 'co2': 390, 'country': 'UK'},
-        'manchester': {'temp': 10, 'rain': 170, 'humidity': 80, 'co2': 385, 'country': 'UK'},
-        'edinburgh': {'temp': 9, 'rain': 160, 'humidity': 78, 'co2': 380, 'country': 'UK'},
-        'dubai': {'temp': 38, 'rain': 15, 'humidity': 45, 'co2': 450, 'country': 'UAE'},
-        'abudhabi': {'temp': 37, 'rain': 12, 'humidity': 50, 'co2': 445, 'country': 'UAE'},
-        'karachi': {'temp': 30, 'rain': 35, 'humidity': 70, 'co2': 435, 'country': 'Pakistan'},
-        'lahore': {'temp': 28, 'rain': 55, 'humidity': 65, 'co2': 440, 'country': 'Pakistan'},
-        'islamabad': {'temp': 25, 'rain': 85, 'humidity': 60, 'co2': 425, 'country': 'Pakistan'},
-        'moscow': {'temp': 8, 'rain': 90, 'humidity': 70, 'co2': 420, 'country': 'Russia'},
-        'stpetersburg': {'temp': 6, 'rain': 95, 'humidity': 75, 'co2': 415, 'country': 'Russia'},
-        'novosibirsk': {'temp': 2, 'rain': 70, 'humidity': 65, 'co2': 410, 'country': 'Russia'}
-    }
-    
-    # Generate comprehensive dataset
-    n_samples = 5000  # Increased sample size
-    data = []
-    
-    print(f"Generating {n_samples} climate records for {len(regions_data)} regions...")
-    
-    for i in range(n_samples):
-        # Select random region
-        region = np.random.choice(list(regions_data.keys()))
-        base_data = regions_data[region]
-        
-        # Generate date (last 10 years for more data)
-        days_back = np.random.randint(0, 365 * 10)
-        date = datetime.now() - timedelta(days=days_back)
-        
-        # Seasonal variations
-        month = date.month
-        day_of_year = date.timetuple().tm_yday
-        
-        # Temperature seasonal pattern
-        seasonal_temp = 8 * np.sin(2 * np.pi * (day_of_year - 80) / 365)
-        
-        # Rainfall seasonal pattern (varies by region)
-        if base_data['country'] in ['India']:
-            # Monsoon pattern
-            monsoon_factor = 2 if 6 <= month <= 9 else 0.3
-            seasonal_rain = base_data['rain'] * monsoon_factor * np.sin(2 * np.pi * (day_of_year - 150) / 365)
-        else:
-            # General seasonal pattern
-            seasonal_rain = base_data['rain'] * 0.5 * np.sin(2 * np.pi * (day_of_year - 30) / 365)
-        
-        # Add climate change trend (gradual increase over years)
-        years_from_2015 = (date.year - 2015)
-        climate_trend_temp = years_from_2015 * 0.1  # 0.1°C per year
-        climate_trend_co2 = years_from_2015 * 2.5   # 2.5 ppm per year
-        
-        # Random variations
-        temp_noise = np.random.normal(0, 3)
-        rain_noise = np.random.normal(0, 20)
-        humidity_noise = np.random.normal(0, 5)
-        co2_noise = np.random.normal(0, 10)
-        
-        # Calculate final values
-        temperature = base_data['temp'] + seasonal_temp + climate_trend_temp + temp_noise
-        rainfall = max(0, base_data['rain'] + seasonal_rain + rain_noise)
-        humidity = max(10, min(100, base_data['humidity'] + humidity_noise))
-        co2_level = max(300, base_data['co2'] + climate_trend_co2 + co2_noise)
-        
-        # Calculate derived features for ML models
-        soil_moisture = max(0, min(100, humidity * 0.7 + rainfall * 0.08 + np.random.normal(0, 5)))
-        wind_speed = max(0, np.random.normal(12, 4))
-        evaporation = max(0, temperature * 0.25 + wind_speed * 0.15 + np.random.normal(0, 1))
-        rainfall_lag = rainfall * np.random.uniform(0.6, 0.95)
-        
-        # Additional climate indicators
-        heat_index = temperature + (humidity / 100) * 5
-        drought_index = max(0, 100 - rainfall - (humidity / 2))
-        flood_potential = rainfall + (temperature - 20) * 2 if temperature > 20 else rainfall
-        
-        # Calculate risk labels based on realistic thresholds
-        flood_risk = 1 if (rainfall > 150 and temperature > 25) or flood_potential > 180 else 0
-        drought_risk = 1 if (rainfall < 30 and temperature > 32) or drought_index > 70 else 0
-        heatwave_risk = 1 if (temperature > 38 and humidity < 40) or heat_index > 45 else 0
-        
-        # Extreme weather events (rare but important)
-        extreme_event = 0
-        if np.random.random() < 0.02:  # 2% chance of extreme event
-            if np.random.random() < 0.4:  # 40% flood
-                rainfall *= 3
-                flood_risk = 1
-                extreme_event = 1
-            elif np.random.random() < 0.6:  # 60% of remaining = drought
-                rainfall *= 0.1
-                temperature += 5
-                drought_risk = 1
-                extreme_event = 2
-            else:  # Heatwave
-                temperature += 8
-                humidity *= 0.7
-                heatwave_risk = 1
-                extreme_event = 3
-        
-        # Add record
-        record = {
-            'Date': date.strftime('%Y-%m-%d'),
-            'Region': region,
-            'Country': base_data['country'],
-            'Rainfall_mm': round(rainfall, 2),
-            'Temperature_C': round(temperature, 2),
-            'Soil_Moisture': round(soil_moisture, 2),
-            'Humidity_%': round(humidity, 2),
-            'Wind_Speed_mps': round(wind_speed, 2),
-            'CO2_ppm': round(co2_level, 2),
-            'Evaporation_mm_day': round(evaporation, 2),
-            'Rainfall_Lag_mm': round(rainfall_lag, 2),
-            'Heat_Index': round(heat_index, 2),
-            'Drought_Index': round(drought_index, 2),
-            'Flood_Potential': round(flood_potential, 2),
-            'Extreme_Event': extreme_event,
-            'Flood_Risk': flood_risk,
-            'Drought_Risk': drought_risk,
-            'Heatwave_Risk': heatwave_risk,
-            'Month': month,
-            'Year': date.year,
-            'Season': get_season(month)
-        }
-        
-        data.append(record)
+    base_temp = base['temp'].to_numpy(dtype=float)[region_codes]
+    base_rain = base['rain'].to_numpy(dtype=float)[region_codes]
+    base_humidity = base['humidity'].to_numpy(dtype=float)[region_codes]
+    base_co2 = base['co2'].to_numpy(dtype=float)[region_codes]
+    monsoon_region = (base['country'] == 'India').to_numpy()[region_codes]
     
-    # Create DataFrame
-    df = pd.DataFrame(data)
+    # Seasonal patterns: monsoon rainfall for India, a general cycle elsewhere
+    seasonal_temp = 8 * np.sin(2 * np.pi * (day_of_year - 80) / 365)
+    monsoon_factor = np.where((month >= 6) & (month <= 9), 2, 0.3)
+    seasonal_rain = np.where(monsoon_region,
+                             base_rain * monsoon_factor * np.sin(2 * np.pi * (day_of_year - 150) / 365),
+                             base_rain * 0.5 * np.sin(2 * np.pi * (day_of_year - 30) / 365))
     
-    # Add additional derived features
-    df['Temperature_Anomaly'] = df.groupby('Region')['Temperature_C'].transform(lambda x: x - x.mean())
-    df['Rainfall_Anomaly'] = df.groupby('Region')['Rainfall_mm'].transform(lambda x: x - x.mean())
+    # Climate change trend (0.1°C and 2.5 ppm per year since 2015)
+    years_from_2015 = year - 2015
+    
+    temperature = base_temp + seasonal_temp + years_from_2015 * 0.1 + rng.normal(0, 3, n_samples)
+    rainfall = np.maximum(0, base_rain + seasonal_rain + rng.normal(0, 20, n_samples))
+    humidity = np.clip(base_humidity + rng.normal(0, 5, n_samples), 10, 100)
+    co2_level = np.maximum(300, base_co2 + years_from_2015 * 2.5 + rng.normal(0, 10, n_samples))
+    
+    # Derived features for ML models
+    soil_moisture = np.clip(humidity * 0.7 + rainfall * 0.08 + rng.normal(0, 5, n_samples), 0, 100)
+    wind_speed = np.maximum(0, rng.normal(12, 4, n_samples))
+    evaporation = np.maximum(0, temperature * 0.25 + wind_speed * 0.15 + rng.normal(0, 1, n_samples))
+    rainfall_lag = rainfall * rng.uniform(0.6, 0.95, n_samples)
+    
+    # Additional climate indicators
+    heat_index = temperature + (humidity / 100) * 5
+    drought_index = np.maximum(0, 100 - rainfall - humidity / 2)
+    flood_potential = np.where(temperature > 20, rainfall + (temperature - 20) * 2, rainfall)
+    
+    # Risk labels from realistic thresholds
+    flood_risk = ((rainfall > 150) & (temperature > 25)) | (flood_potential > 180)
+    drought_risk = ((rainfall < 30) & (temperature > 32)) | (drought_index > 70)
+    heatwave_risk = ((temperature > 38) & (humidity < 40)) | (heat_index > 45)
+    
+    # Extreme weather events in 2% of records: 40% floods, then 60% of the
+    # rest droughts, the remainder heatwaves. They change the recorded
+    # conditions after the indicators above were computed.
+    extreme = rng.random(n_samples) < 0.02
+    flood_event = extreme & (rng.random(n_samples) < 0.4)
+    drought_event = extreme & ~flood_event & (rng.random(n_samples) < 0.6)
+    heatwave_event = extreme & ~flood_event & ~drought_event
+    rainfall = np.where(flood_event, rainfall * 3, np.where(drought_event, rainfall * 0.1, rainfall))
+    temperature = temperature + np.where(drought_event, 5, 0) + np.where(heatwave_event, 8, 0)
+    humidity = np.where(heatwave_event, humidity * 0.7, humidity)
+    flood_risk |= flood_event
+    drought_risk |= drought_event
+    heatwave_risk |= heatwave_event
+    extreme_event = np.select([flood_event, drought_event, heatwave_event], [1, 2, 3], 0)
+    
+    countries = base['country'].to_numpy(dtype=object)
+    seasons = np.array([get_season(m) for m in range(1, 13)], dtype=object)
+    return pd.DataFrame({
+        'Date': dates,
+        'Region': np.array(regions, dtype=object)[region_codes],
+        'Country': countries[region_codes],
+        'Rainfall_mm': np.round(rainfall, 2),
+        'Temperature_C': np.round(temperature, 2),
+        'Soil_Moisture': np.round(soil_moisture, 2),
+        'Humidity_%': np.round(humidity, 2),
+        'Wind_Speed_mps': np.round(wind_speed, 2),
+        'CO2_ppm': np.round(co2_level, 2),
+        'Evaporation_mm_day': np.round(evaporation, 2),
+        'Rainfall_Lag_mm': np.round(rainfall_lag, 2),
+        'Heat_Index': np.round(heat_index, 2),
+        'Drought_Index': np.round(drought_index, 2),
+        'Flood_Potential': np.round(flood_potential, 2),
+        'Extreme_Event': extreme_event,
+        'Flood_Risk': flood_risk.astype(int),
+        'Drought_Risk': drought_risk.astype(int),
+        'Heatwave_Risk': heatwave_risk.astype(int),
+        'Month': month,
+        'Year': year,
+        'Season': seasons[month - 1]
+    })
+
+def create_complete_climate_dataset(n_samples=5000, seed=42, output_file='complete_climate_dataset.csv',
+                                    summaries=True):
+    """Create a comprehensive climate dataset with all required features
+
+    ``summaries=False`` writes only the main dataset (e.g. a large
+    stress-test file) and leaves the regional and monthly files alone.
+    """
+    
+    print("🌍 Creating complete climate dataset...")
+    print(f"Generating {n_samples:,} climate records for {len(REGIONS_DATA)} regions...")
+    
+    started = time.perf_counter()
+    df = generate_climate_records(n_samples, seed=seed)
+    
+    # Add additional derived features (built-in group means, no per-group Python calls)
+    region_groups = df.groupby('Region')
+    df['Temperature_Anomaly'] = df['Temperature_C'] - region_groups['Temperature_C'].transform('mean')
+    df['Rainfall_Anomaly'] = df['Rainfall_mm'] - region_groups['Rainfall_mm'].transform('mean')
     df['Climate_Risk_Score'] = (df['Flood_Risk'] + df['Drought_Risk'] + df['Heatwave_Risk']) * 100 / 3
+    print(f"⚡ Generated in {time.perf_counter() - started:.2f}s")
     
     # Save main dataset
-    output_file = 'complete_climate_dataset.csv'
     df.to_csv(output_file, index=False)
+    write_stats_sidecar(output_file)
     
-    print(f"✅ Generated {len(data)} comprehensive climate records")
+    print(f"✅ Generated {len(df):,} comprehensive climate records")
     print(f"📁 Dataset saved as: {output_file}")
     
     # Generate summary statistics
     print_dataset_summary(df)
     
-    # Create regional summary
-    create_regional_summary(df, regions_data)
-    
-    # Create time series data for predictions
-    create_time_series_data(df)
+    if summaries:
+        # Create regional summary
+        create_regional_summary(df, REGIONS_DATA)
+        
+        # Create time series data for predictions
+        create_time_series_data(df)
     
     return df
 
@@ -198,7 +198,7 @@ def print_dataset_summary(df):
     print(f"Total Records: {len(df):,}")
     print(f"Regions: {df['Region'].nunique()}")
     print(f"Countries: {df['Country'].nunique()}")
-    print(f"Date Range: {df['Date'].min()} to {df['Date'].max()}")
+    print(f"Date Range: {df['Date'].min():%Y-%m-%d} to {df['Date'].max():%Y-%m-%d}")
     print(f"Years Covered: {df['Year'].max() - df['Year'].min() + 1}")
     
     print(f"\n🌡️ Temperature Statistics:")
@@ -243,20 +243,31 @@ def create_regional_summary(df, regions_data):
     # Save regional summary
     regional_summary.to_csv('regional_climate_summary.csv', index=False)
     
-    # Create JSON for API
+    # Create JSON for API (one grouped pass instead of filtering per region)
+    region_stats = df.groupby('Region').agg(
+        temperature=('Temperature_C', 'mean'),
+        rainfall=('Rainfall_mm', 'mean'),
+        humidity=('Humidity_%', 'mean'),
+        co2_level=('CO2_ppm', 'mean'),
+        flood_events=('Flood_Risk', 'sum'),
+        drought_events=('Drought_Risk', 'sum'),
+        heatwave_events=('Heatwave_Risk', 'sum'),
+        total_records=('Region', 'size')
+    )
+    
     regional_json = {}
     for region in regions_data.keys():
-        region_data = df[df['Region'] == region]
-        if len(region_data) > 0:
+        if region in region_stats.index:
+            stats = region_stats.loc[region]
             regional_json[region] = {
-                'temperature': float(region_data['Temperature_C'].mean()),
-                'rainfall': float(region_data['Rainfall_mm'].mean()),
-                'humidity': float(region_data['Humidity_%'].mean()),
-                'co2_level': float(region_data['CO2_ppm'].mean()),
-                'flood_events': int(region_data['Flood_Risk'].sum()),
-                'drought_events': int(region_data['Drought_Risk'].sum()),
-                'heatwave_events': int(region_data['Heatwave_Risk'].sum()),
-                'total_records': int(len(region_data))
+                'temperature': float(stats['temperature']),
+                'rainfall': float(stats['rainfall']),
+                'humidity': float(stats['humidity']),
+                'co2_level': float(stats['co2_level']),
+                'flood_events': int(stats['flood_events']),
+                'drought_events': int(stats['drought_events']),
+                'heatwave_events': int(stats['heatwave_events']),
+                'total_records': int(stats['total_records'])
             }
     
     with open('regional_climate_data.json', 'w') as f:
@@ -287,19 +298,30 @@ def create_time_series_data(df):
     
     # Save time series data
     monthly_data.to_csv('monthly_climate_timeseries.csv', index=False)
+    write_stats_sidecar('monthly_climate_timeseries.csv')
     print("📁 Time series data saved as: monthly_climate_timeseries.csv")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Create the complete climate dataset')
+    parser.add_argument('--rows', type=int, default=5000, help='number of records (default 5000)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='complete_climate_dataset.csv')
+    parser.add_argument('--skip-summaries', action='store_true',
+                        help='only write the main dataset, not the regional and monthly files')
+    args = parser.parse_args()
+    
     try:
         # Create complete dataset
-        df = create_complete_climate_dataset()
+        df = create_complete_climate_dataset(args.rows, seed=args.seed, output_file=args.output,
+                                             summaries=not args.skip_summaries)
         
         print("\n🎉 Complete dataset creation finished!")
         print("\nFiles created:")
-        print("- complete_climate_dataset.csv (Main dataset)")
-        print("- regional_climate_summary.csv (Regional statistics)")
-        print("- regional_climate_data.json (API data)")
-        print("- monthly_climate_timeseries.csv (Time series data)")
+        print(f"- {args.output} (Main dataset)")
+        if not args.skip_summaries:
+            print("- regional_climate_summary.csv (Regional statistics)")
+            print("- regional_climate_data.json (API data)")
+            print("- monthly_climate_timeseries.csv (Time series data)")
         
         print(f"\n📊 Dataset ready for ML training with {len(df):,} records!")
         
@@ -1,130 +1,210 @@
 #!/usr/bin/env python3
 """
 Generate Synthetic Climate Dataset
-Creates realistic climate data for ML model training and predictions
+Creates realistic climate data for ML model training and predictions.
+Records are generated in chunks with array operations and streamed to CSV
+(or Parquet), so memory use does not grow with the sample count.
+
+    python generate_synthetic_data.py --samples 50000000 --output big.csv
 """
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
+import argparse
 import json
 import os
 
-def generate_synthetic_climate_data():
-    """Generate synthetic climate dataset with realistic patterns"""
+from backend.ml.dataset_stats import write_stats_sidecar
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = pq = None
+
+# Regional climate parameters (based on real data)
+REGIONS_DATA = {
+    'mumbai': {'temp': 28.5, 'rain': 120, 'humidity': 75, 'co2': 420},
+    'delhi': {'temp': 32, 'rain': 65, 'humidity': 60, 'co2': 450},
+    'kolkata': {'temp': 30, 'rain': 140, 'humidity': 80, 'co2': 430},
+    'gujarat': {'temp': 35, 'rain': 45, 'humidity': 55, 'co2': 440},
+    'chennai': {'temp': 31, 'rain': 95, 'humidity': 78, 'co2': 425},
+    'kashmir': {'temp': 18, 'rain': 180, 'humidity': 65, 'co2': 380},
+    'california': {'temp': 22, 'rain': 85, 'humidity': 60, 'co2': 410},
+    'texas': {'temp': 28, 'rain': 75, 'humidity': 65, 'co2': 415},
+    'florida': {'temp': 26, 'rain': 130, 'humidity': 80, 'co2': 405},
+    'newyork': {'temp': 15, 'rain': 110, 'humidity': 70, 'co2': 400},
+    'beijing': {'temp': 14, 'rain': 60, 'humidity': 55, 'co2': 480},
+    'shanghai': {'temp': 18, 'rain': 115, 'humidity': 75, 'co2': 470},
+    'london': {'temp': 12, 'rain': 150, 'humidity': 75, 'co2': 390},
+    'dubai': {'temp': 38, 'rain': 15, 'humidity': 45, 'co2': 450},
+    'karachi': {'temp': 30, 'rain': 35, 'humidity': 70, 'co2': 435},
+    'moscow': {'temp': 8, 'rain': 90, 'humidity': 70, 'co2': 420}
+}
+
+# Rows generated (and written) per step; part of what the seed reproduces
+CHUNK_ROWS = 500000
+
+def select_regions(regions=None):
+    """REGIONS_DATA restricted to ``regions`` (names), all regions by default"""
+    if not regions:
+        return REGIONS_DATA
+    unknown = [region for region in regions if region not in REGIONS_DATA]
+    if unknown:
+        raise ValueError(f"Unknown regions: {', '.join(unknown)}. Choose from: {', '.join(REGIONS_DATA)}")
+    return {region: REGIONS_DATA[region] for region in regions}
+
+def synthetic_records(n_rows, regions_data, end_date, days, rng):
+    """One chunk of synthetic records as a DataFrame"""
+    names = np.array(list(regions_data), dtype=object)
+    base = np.array([[data['temp'], data['rain'], data['humidity'], data['co2']] for data in regions_data.values()])
     
-    print("🌍 Generating synthetic climate dataset...")
+    # Random region and date (within ``days`` before ``end_date``)
+    region_codes = rng.integers(0, len(names), n_rows)
+    base_temp, base_rain, base_humidity, base_co2 = base[region_codes].T
+    dates = end_date - rng.integers(0, days, n_rows).astype('timedelta64[D]')
+    month = dates.astype('datetime64[M]').astype(int) % 12 + 1
     
-    # Set random seed for reproducibility
-    np.random.seed(42)
-    
-    # Number of samples to generate
-    n_samples = 2000
-    
-    # Regional climate parameters (based on real data)
-    regions_data = {
-        'mumbai': {'temp': 28.5, 'rain': 120, 'humidity': 75, 'co2': 420},
-        'delhi': {'temp': 32, 'rain': 65, 'humidity': 60, 'co2': 450},
-        'kolkata': {'temp': 30, 'rain': 140, 'humidity': 80, 'co2': 430},
-        'gujarat': {'temp': 35, 'rain': 45, 'humidity': 55, 'co2': 440},
-        'chennai': {'temp': 31, 'rain': 95, 'humidity': 78, 'co2': 425},
-        'kashmir': {'temp': 18, 'rain': 180, 'humidity': 65, 'co2': 380},
-        'california': {'temp': 22, 'rain': 85, 'humidity': 60, 'co2': 410},
-        'texas': {'temp': 28, 'rain': 75, 'humidity': 65, 'co2': 415},
-        'florida': {'temp': 26, 'rain': 130, 'humidity': 80, 'co2': 405},
-        'newyork': {'temp': 15, 'rain': 110, 'humidity': 70, 'co2': 400},
-        'beijing': {'temp': 14, 'rain': 60, 'humidity': 55, 'co2': 480},
-        'shanghai': {'temp': 18, 'rain': 115, 'humidity': 75, 'co2': 470},
-        'london': {'temp': 12, 'rain': 150, 'humidity': 75, 'co2': 390},
-        'dubai': {'temp': 38, 'rain': 15, 'humidity': 45, 'co2': 450},
-        'karachi': {'temp': 30, 'rain': 35, 'humidity': 70, 'co2': 435},
-        'moscow': {'temp': 8, 'rain': 90, 'humidity': 70, 'co2': 420}
-    }
+    # Seasonal variations
+    seasonal_temp_adj = 5 * np.sin(2 * np.pi * (month - 3) / 12)  # Peak in summer
+    seasonal_rain_adj = 30 * np.sin(2 * np.pi * (month - 6) / 12)  # Peak in monsoon
     
-    regions = list(regions_data.keys())
+    # Final values with random variations
+    temperature = base_temp + seasonal_temp_adj + rng.normal(0, 2.5, n_rows)
+    rainfall = np.maximum(0, base_rain + seasonal_rain_adj + rng.normal(0, 15, n_rows))
+    humidity = np.clip(base_humidity + rng.normal(0, 4, n_rows), 10, 100)
+    co2_level = np.maximum(300, base_co2 + rng.normal(0, 8, n_rows))
     
-    # Generate synthetic data
-    data = []
+    # Derived features
+    soil_moisture = np.clip(humidity * 0.8 + rainfall * 0.1, 0, 100)
+    wind_speed = np.maximum(0, rng.normal(15, 5, n_rows))
+    evaporation = np.maximum(0, temperature * 0.3 + wind_speed * 0.1)
+    rainfall_lag = rainfall * rng.uniform(0.7, 0.9, n_rows)
     
-    for i in range(n_samples):
-        # Select random region
-        region = np.random.choice(regions)
-        base_data = regions_data[region]
-        
-        # Generate date (last 5 years)
-        days_back = np.random.randint(0, 365 * 5)
-        date = datetime.now() - timedelta(days=days_back)
-        
-        # Add seasonal variations
-        month = date.month
-        seasonal_temp_adj = 5 * np.sin(2 * np.pi * (month - 3) / 12)  # Peak in summer
-        seasonal_rain_adj = 30 * np.sin(2 * np.pi * (month - 6) / 12)  # Peak in monsoon
-        
-        # Add random variations
-        temp_noise = np.random.normal(0, 2.5)
-        rain_noise = np.random.normal(0, 15)
-        humidity_noise = np.random.normal(0, 4)
-        co2_noise = np.random.normal(0, 8)
-        
-        # Calculate final values
-        temperature = base_data['temp'] + seasonal_temp_adj + temp_noise
-        rainfall = max(0, base_data['rain'] + seasonal_rain_adj + rain_noise)
-        humidity = max(10, min(100, base_data['humidity'] + humidity_noise))
-        co2_level = max(300, base_data['co2'] + co2_noise)
-        
-        # Calculate derived features
-        soil_moisture = max(0, min(100, humidity * 0.8 + rainfall * 0.1))
-        wind_speed = max(0, np.random.normal(15, 5))
-        evaporation = max(0, temperature * 0.3 + wind_speed * 0.1)
-        rainfall_lag = rainfall * np.random.uniform(0.7, 0.9)
-        
-        # Calculate risk labels (for ML training)
-        flood_risk = 1 if (rainfall > 150 and temperature > 25) else 0
-        drought_risk = 1 if (rainfall < 50 and temperature > 30) else 0
-        heatwave_risk = 1 if (temperature > 35 and humidity < 50) else 0
+    return pd.DataFrame({
+        'Date': dates,
+        'Region': names[region_codes],
+        'Rainfall_mm': np.round(rainfall, 2),
+        'Temperature_C': np.round(temperature, 2),
+        'Soil_Moisture': np.round(soil_moisture, 2),
+        'Humidity_%': np.round(humidity, 2),
+        'Wind_Speed_mps': np.round(wind_speed, 2),
+        'CO2_ppm': np.round(co2_level, 2),
+        'Evaporation_mm_day': np.round(evaporation, 2),
+        'Rainfall_Lag_mm': np.round(rainfall_lag, 2),
+        # Risk labels (for ML training)
+        'Flood_Risk': ((rainfall > 150) & (temperature > 25)).astype(int),
+        'Drought_Risk': ((rainfall < 50) & (temperature > 30)).astype(int),
+        'Heatwave_Risk': ((temperature > 35) & (humidity < 50)).astype(int)
+    })
+
+def generate_chunks(n_samples, regions=None, days=365 * 5, end_date=None, seed=42, chunk_rows=CHUNK_ROWS):
+    """Yield the dataset as DataFrames of up to ``chunk_rows`` records.
+
+    The same arguments always yield the same records.
+    """
+    if days < 1:
+        raise ValueError('days must be at least 1')
+    regions_data = select_regions(regions)
+    end_date = np.datetime64(end_date or datetime.now().date(), 'D')
+    rng = np.random.default_rng(seed)
+    for start in range(0, n_samples, chunk_rows):
+        yield synthetic_records(min(chunk_rows, n_samples - start), regions_data, end_date, days, rng)
+
+class DatasetSummary:
+    """Running summary statistics over the generated chunks"""
+    
+    def __init__(self):
+        self.records = 0
+        self.regions = set()
+        self.minimum = {}
+        self.maximum = {}
+        self.risk_counts = {'Flood_Risk': 0, 'Drought_Risk': 0, 'Heatwave_Risk': 0}
+    
+    def update(self, chunk):
+        self.records += len(chunk)
+        self.regions.update(chunk['Region'].unique())
+        for column in ('Date', 'Temperature_C', 'Rainfall_mm', 'CO2_ppm'):
+            low, high = chunk[column].min(), chunk[column].max()
+            self.minimum[column] = min(self.minimum.get(column, low), low)
+            self.maximum[column] = max(self.maximum.get(column, high), high)
+        for column in self.risk_counts:
+            self.risk_counts[column] += int(chunk[column].sum())
+    
+    def print(self):
+        print("\n📊 Dataset Summary:")
+        print(f"Regions: {len(self.regions)}")
+        print(f"Date range: {self.minimum['Date']:%Y-%m-%d} to {self.maximum['Date']:%Y-%m-%d}")
+        print(f"Temperature range: {self.minimum['Temperature_C']:.1f}°C to {self.maximum['Temperature_C']:.1f}°C")
+        print(f"Rainfall range: {self.minimum['Rainfall_mm']:.1f}mm to {self.maximum['Rainfall_mm']:.1f}mm")
+        print(f"CO2 range: {self.minimum['CO2_ppm']:.1f}ppm to {self.maximum['CO2_ppm']:.1f}ppm")
         
-        # Add record
-        data.append({
-            'Date': date.strftime('%Y-%m-%d'),
-            'Region': region,
-            'Rainfall_mm': round(rainfall, 2),
-            'Temperature_C': round(temperature, 2),
-            'Soil_Moisture': round(soil_moisture, 2),
-            'Humidity_%': round(humidity, 2),
-            'Wind_Speed_mps': round(wind_speed, 2),
-            'CO2_ppm': round(co2_level, 2),
-            'Evaporation_mm_day': round(evaporation, 2),
-            'Rainfall_Lag_mm': round(rainfall_lag, 2),
-            'Flood_Risk': flood_risk,
-            'Drought_Risk': drought_risk,
-            'Heatwave_Risk': heatwave_risk
-        })
-    
-    # Create DataFrame
-    df = pd.DataFrame(data)
-    
-    # Save to CSV
-    output_file = 'synthetic_climate_dataset.csv'
-    df.to_csv(output_file, index=False)
-    
-    print(f"✅ Generated {len(data)} synthetic climate records")
+        # Risk distribution
+        print(f"\n⚠️ Risk Distribution:")
+        for column, label in (('Flood_Risk', 'Flood'), ('Drought_Risk', 'Drought'), ('Heatwave_Risk', 'Heatwave')):
+            count = self.risk_counts[column]
+            print(f"{label} Risk: {count:,} records ({count / self.records * 100:.1f}%)")
+
+def write_chunks(chunks, output_file, file_format='csv'):
+    """Stream chunks to ``output_file`` via a temporary file; returns a DatasetSummary"""
+    if file_format == 'parquet' and pq is None:
+        raise RuntimeError('Parquet output needs pyarrow (pip install pyarrow)')
+    summary = DatasetSummary()
+    tmp_file = f"{output_file}.{os.getpid()}.tmp"
+    writer = None
+    try:
+        if file_format == 'parquet':
+            try:
+                for chunk in chunks:
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(tmp_file, table.schema)
+                    writer.write_table(table)
+                    summary.update(chunk)
+            finally:
+                if writer is not None:
+                    writer.close()
+        else:
+            with open(tmp_file, 'w', newline='') as f:
+                for chunk in chunks:
+                    chunk.to_csv(f, header=summary.records == 0, index=False)
+                    summary.update(chunk)
+        os.replace(tmp_file, output_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    return summary
+
+def generate_synthetic_climate_data(n_samples=2000, regions=None, days=365 * 5, end_date=None, seed=42,
+                                    output_file='synthetic_climate_dataset.csv', file_format=None):
+    """Generate synthetic climate dataset with realistic patterns
+
+    Writes ``n_samples`` records for ``regions`` (default all), dated within
+    ``days`` before ``end_date`` (default today), to ``output_file`` as CSV
+    or Parquet (chosen from the extension unless ``file_format`` is given).
+    Returns the DatasetSummary.
+    """
+    if n_samples < 1:
+        # Zero records would leave a header-less, empty CSV that no reader accepts
+        raise ValueError(f'n_samples must be at least 1 (got {n_samples})')
+    
+    print("🌍 Generating synthetic climate dataset...")
+    file_format = file_format or ('parquet' if output_file.endswith('.parquet') else 'csv')
+    
+    chunks = generate_chunks(n_samples, regions=regions, days=days, end_date=end_date, seed=seed)
+    summary = write_chunks(chunks, output_file, file_format)
+    if file_format == 'csv':
+        write_stats_sidecar(output_file)
+    
+    print(f"✅ Generated {summary.records:,} synthetic climate records")
     print(f"📁 Dataset saved as: {output_file}")
     
     # Generate summary statistics
-    print("\n📊 Dataset Summary:")
-    print(f"Regions: {len(regions)}")
-    print(f"Date range: {df['Date'].min()} to {df['Date'].max()}")
-    print(f"Temperature range: {df['Temperature_C'].min():.1f}°C to {df['Temperature_C'].max():.1f}°C")
-    print(f"Rainfall range: {df['Rainfall_mm'].min():.1f}mm to {df['Rainfall_mm'].max():.1f}mm")
-    print(f"CO2 range: {df['CO2_ppm'].min():.1f}ppm to {df['CO2_ppm'].max():.1f}ppm")
+    if summary.records:
+        summary.print()
     
-    # Risk distribution
-    print(f"\n⚠️ Risk Distribution:")
-    print(f"Flood Risk: {df['Flood_Risk'].sum()} records ({df['Flood_Risk'].mean()*100:.1f}%)")
-    print(f"Drought Risk: {df['Drought_Risk'].sum()} records ({df['Drought_Risk'].mean()*100:.1f}%)")
-    print(f"Heatwave Risk: {df['Heatwave_Risk'].sum()} records ({df['Heatwave_Risk'].mean()*100:.1f}%)")
-    
-    return df
+    return summary
 
 def create_regional_data_json():
     """Create regional data JSON for API"""
@@ -154,19 +234,35 @@ def create_regional_data_json():
     print("📁 Regional data saved as: regional_climate_data.json")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate the synthetic climate dataset')
+    parser.add_argument('--samples', type=int, default=2000, help='number of records (default 2000)')
+    parser.add_argument('--regions', default='', help='comma-separated regions (default: all)')
+    parser.add_argument('--days', type=int, default=365 * 5, help='date span in days (default 5 years)')
+    parser.add_argument('--end-date', default=None, help='last date, YYYY-MM-DD (default today)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='synthetic_climate_dataset.csv', help='.csv or .parquet file')
+    parser.add_argument('--skip-regional-json', action='store_true',
+                        help='do not rewrite regional_climate_data.json')
+    args = parser.parse_args()
+    if args.samples < 1:
+        parser.error('--samples must be at least 1')
+    
     try:
         # Generate synthetic dataset
-        df = generate_synthetic_climate_data()
-        
-        # Create regional data JSON
-        create_regional_data_json()
+        generate_synthetic_climate_data(args.samples, regions=[r for r in args.regions.split(',') if r],
+                                        days=args.days, end_date=args.end_date, seed=args.seed,
+                                        output_file=args.output)
         
         print("\n🎉 Synthetic data generation completed successfully!")
         print("Files created:")
-        print("- synthetic_climate_dataset.csv (ML training data)")
-        print("- regional_climate_data.json (API reference data)")
+        print(f"- {args.output} (ML training data)")
+        
+        # Create regional data JSON
+        if not args.skip_regional_json:
+            create_regional_data_json()
+            print("- regional_climate_data.json (API reference data)")
         
     except Exception as e:
         print(f"❌ Error generating synthetic data: {e}")
         import traceback
-        traceback.print_exc()
\ No newline at end of file
+        traceback.print_exc()
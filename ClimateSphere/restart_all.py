@@ -6,6 +6,8 @@ import subprocess
 import time
 import sys
 import os
+import urllib.error
+import urllib.request
 
 def run_command(command, cwd=None):
     """Run a command in the background"""
@@ -29,6 +31,21 @@ def run_command(command, cwd=None):
         print(f"❌ Error starting command: {e}")
         return None
 
+def wait_until_ready(name, url, timeout=120):
+    """Poll ``url`` until it answers 200 (e.g. the ML API's /ready after warm-up)"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                if response.status == 200:
+                    print(f"   ✅ {name} ready")
+                    return True
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(0.5)
+    print(f"   ⚠️ {name} not ready after {timeout}s ({url})")
+    return False
+
 def main():
     print("🌍 ClimateSphere - Restarting All Services")
     print("=" * 50)
@@ -39,21 +56,21 @@ def main():
     print("🔄 Starting Backend API...")
     backend_dir = os.path.join(script_dir, "backend")
     run_command("npm run dev", backend_dir)
-    time.sleep(2)
+    wait_until_ready("Backend API", "http://localhost:3000/health")
     
     print("🤖 Starting ML API...")
     ml_dir = os.path.join(script_dir, "backend", "ml")
     run_command("python prediction_api.py", ml_dir)
-    time.sleep(2)
+    # /ready answers 200 once the models are loaded and warmed up
+    wait_until_ready("ML API", "http://localhost:5000/ready")
     
     print("🌐 Starting Frontend Server...")
     frontend_dir = os.path.join(script_dir, "frontend")
     run_command("python serve_stable.py", frontend_dir)
-    time.sleep(2)
+    wait_until_ready("Frontend", "http://localhost:8000/index.html")
     
     print("\n✅ All services started!")
     print("🚀 ClimateSphere should be available at: http://localhost:8000")
-    print("\n💡 Tip: Wait 10-15 seconds for all services to fully start")
     print("🔍 Run 'python check_status.py' to verify all services are healthy")
 
 if __name__ == "__main__":
@@ -11,53 +11,157 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import classification_report, accuracy_score
 import joblib
+import argparse
+import copy
 import os
+import sys
+import uuid
 
-def train_climate_models():
-    """Train all climate prediction models"""
+# The inference pipeline (feature derivation + folded scaler) is shared with the ML API
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend', 'ml'))
+from inference_pipeline import FEATURE_COLUMNS, FOLD_TOLERANCE, build_pipeline
+
+# Risk model name -> (target column, model filename, banner)
+RISK_TARGETS = {
+    'flood': ('Flood_Risk', 'FloodRisk_Model.pkl', '🌊 Training Flood Risk Model...'),
+    'drought': ('Drought_Risk', 'DroughtRisk_Model.pkl', '🏜️ Training Drought Risk Model...'),
+    'heatwave': ('Heatwave_Risk', 'HeatwaveRisk_Model.pkl', '🔥 Training Heatwave Risk Model...')
+}
+
+# Rows of a virtual dataset generated and held in memory at a time
+SHARD_ROWS = 1000000
+
+# Trees per risk model, and the most held-out rows kept for evaluating a sharded run
+N_ESTIMATORS = 100
+MAX_TEST_ROWS = 200000
+
+def train_climate_models(dataset_path='complete_climate_dataset.csv', output_dir='.', targets=None,
+                         progress=None, n_jobs=None, dataset=None, fold_tolerance=FOLD_TOLERANCE,
+                         shard_rows=SHARD_ROWS):
+    """Train all climate prediction models
+
+    ``targets`` limits training to some of RISK_TARGETS; ``progress`` is
+    called as ``progress(fraction, message)`` between steps. ``dataset`` is
+    an optional VirtualDataset (virtual_dataset.py) to train on instead of
+    ``dataset_path``; it is generated and trained on ``shard_rows`` rows at
+    a time (see train_sharded_models), so memory does not grow with its size.
+    ``fold_tolerance`` bounds the probability drift of folding the scaler
+    into the trees (see inference_pipeline.build_pipeline).
+    """
     
     print("🤖 Starting Complete ML Model Training...")
+    report = progress or (lambda fraction, message: None)
+    targets = list(targets or RISK_TARGETS)
+    
+    if dataset is not None:
+        models = train_sharded_models(dataset, output_dir, targets, report, n_jobs=n_jobs,
+                                      fold_tolerance=fold_tolerance, shard_rows=shard_rows)
+        report(1.0, 'Training finished')
+        print("\n✅ All models trained successfully!")
+        return models
     
     # Load the complete dataset
+    report(0.0, f'Loading {os.path.basename(dataset_path)}')
     try:
-        df = pd.read_csv('complete_climate_dataset.csv')
+        df = pd.read_csv(dataset_path)
         print(f"✅ Loaded dataset with {len(df)} records")
     except FileNotFoundError:
+        if dataset_path != 'complete_climate_dataset.csv':
+            raise
         print("❌ Dataset not found. Creating it first...")
         os.system('python create_complete_dataset.py')
-        df = pd.read_csv('complete_climate_dataset.csv')
+        df = pd.read_csv(dataset_path)
     
     # Prepare features for ML models
-    feature_columns = [
-        'Rainfall_mm', 'Temperature_C', 'Soil_Moisture', 'Humidity_%',
-        'Wind_Speed_mps', 'CO2_ppm', 'Evaporation_mm_day', 'Rainfall_Lag_mm',
-        'Heat_Index', 'Drought_Index'
-    ]
+    missing = [column for column in FEATURE_COLUMNS + [RISK_TARGETS[name][0] for name in targets]
+               if column not in df.columns]
+    if missing:
+        raise ValueError(f"Dataset is missing columns: {', '.join(missing)}")
     
-    X = df[feature_columns]
+    # Plain arrays, so the scaler matches the arrays the served pipeline feeds it
+    X = df[FEATURE_COLUMNS].to_numpy()
     
     # Train individual models
     models = {}
-    
-    # 1. Flood Risk Model
-    print("\n🌊 Training Flood Risk Model...")
-    y_flood = df['Flood_Risk']
-    models['flood'] = train_individual_model(X, y_flood, 'FloodRisk_Model.pkl')
-    
-    # 2. Drought Risk Model  
-    print("\n🏜️ Training Drought Risk Model...")
-    y_drought = df['Drought_Risk']
-    models['drought'] = train_individual_model(X, y_drought, 'DroughtRisk_Model.pkl')
-    
-    # 3. Heatwave Risk Model
-    print("\n🔥 Training Heatwave Risk Model...")
-    y_heatwave = df['Heatwave_Risk']
-    models['heatwave'] = train_individual_model(X, y_heatwave, 'HeatwaveRisk_Model.pkl')
-    
+    for i, name in enumerate(targets):
+        target_column, model_filename, banner = RISK_TARGETS[name]
+        print(f"\n{banner}")
+        report(0.05 + 0.9 * i / len(targets), f'Training {name} model')
+        models[name] = train_individual_model(X, df[target_column], os.path.join(output_dir, model_filename),
+                                              n_jobs=n_jobs, fold_tolerance=fold_tolerance)
+    
+    report(1.0, 'Training finished')
     print("\n✅ All models trained successfully!")
     return models
 
-def train_individual_model(X, y, model_filename):
+def train_sharded_models(dataset, output_dir, targets, report, n_jobs=None, fold_tolerance=FOLD_TOLERANCE,
+                         shard_rows=SHARD_ROWS):
+    """Train the risk models on a VirtualDataset one block-aligned shard at a time.
+
+    Each shard is generated, split 80/20 like the CSV path, and adds its
+    share of the forest's trees (``warm_start``) before it is dropped, so
+    peak memory is about one shard whatever the dataset size. The scaler
+    is fitted on the first shard's training rows; up to MAX_TEST_ROWS
+    held-out rows, spread over the shards, are kept for evaluation.
+    """
+    columns = FEATURE_COLUMNS + [RISK_TARGETS[name][0] for name in targets]
+    n_shards = min(max(1, -(-len(dataset) // shard_rows)), dataset.n_blocks, N_ESTIMATORS)
+    trees = [len(part) for part in np.array_split(np.arange(N_ESTIMATORS), n_shards)]
+    print(f"✅ Training on {len(dataset):,} virtual records (seed {dataset.seed}) in {n_shards} shard(s)")
+    
+    scaler = StandardScaler()
+    models = {name: RandomForestClassifier(n_estimators=0, random_state=42, max_depth=10, n_jobs=n_jobs,
+                                           warm_start=True)
+              for name in targets}
+    test_rows = MAX_TEST_ROWS // n_shards
+    X_tests, y_tests = [], {name: [] for name in targets}
+    for shard in range(n_shards):
+        start, stop = dataset.shard(shard, n_shards)
+        report(0.9 * shard / n_shards, f'Generating and training on rows {start:,}-{stop:,}')
+        df = dataset.to_frame(columns, start=start, stop=stop)
+        train_idx, test_idx = train_test_split(np.arange(len(df)), test_size=0.2, random_state=42 + shard)
+        X = df[FEATURE_COLUMNS].to_numpy()
+        if shard == 0:
+            scaler.fit(X[train_idx])
+        X_train_scaled = scaler.transform(X[train_idx])
+        X_tests.append(X[test_idx[:test_rows]])
+        for name, model in models.items():
+            y = df[RISK_TARGETS[name][0]].to_numpy()
+            model.n_estimators += trees[shard]
+            model.fit(X_train_scaled, y[train_idx])
+            y_tests[name].append(y[test_idx[:test_rows]])
+        del df, X, X_train_scaled
+        print(f"   Shard {shard + 1}/{n_shards}: rows {start:,}-{stop:,}, {trees[shard]} trees per model")
+    
+    X_test = np.concatenate(X_tests)
+    results = {}
+    for name, model in models.items():
+        target_column, model_filename, banner = RISK_TARGETS[name]
+        print(f"\n{banner}")
+        model.warm_start = False
+        accuracy = accuracy_score(np.concatenate(y_tests[name]), model.predict(scaler.transform(X_test)))
+        print(f"Model Accuracy: {accuracy:.3f}")
+        results[name] = export_model(model, copy.deepcopy(scaler), accuracy, X_test,
+                                     os.path.join(output_dir, model_filename), fold_tolerance)
+    return results
+
+def artifact_filenames(model_filename):
+    """(scaler, model, pipeline) filenames saved for a model, in the order they are written"""
+    return (model_filename.replace('.pkl', '_scaler.pkl'), model_filename,
+            model_filename.replace('_Model.pkl', '_Pipeline.pkl'))
+
+def dump_atomic(obj, filename):
+    """joblib.dump via a temporary file and rename, so readers (including a
+    server that memory-maps the old file) never see a half-written pickle"""
+    tmp_filename = f"{filename}.{os.getpid()}.tmp"
+    try:
+        joblib.dump(obj, tmp_filename)
+        os.replace(tmp_filename, filename)
+    finally:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+
+def train_individual_model(X, y, model_filename, n_jobs=None, fold_tolerance=FOLD_TOLERANCE):
     """Train an individual model"""
     
     # Split data
@@ -69,7 +173,7 @@ def train_individual_model(X, y, model_filename):
     X_test_scaled = scaler.transform(X_test)
     
     # Train model
-    model = RandomForestClassifier(n_estimators=100, random_state=42, max_depth=10)
+    model = RandomForestClassifier(n_estimators=N_ESTIMATORS, random_state=42, max_depth=10, n_jobs=n_jobs)
     model.fit(X_train_scaled, y_train)
     
     # Evaluate
@@ -78,14 +182,49 @@ def train_individual_model(X, y, model_filename):
     
     print(f"Model Accuracy: {accuracy:.3f}")
     
-    # Save model and scaler
-    joblib.dump(model, model_filename)
-    scaler_filename = model_filename.replace('.pkl', '_scaler.pkl')
-    joblib.dump(scaler, scaler_filename)
-    
-    print(f"✅ Saved: {model_filename}")
-    
-    return {'model': model, 'scaler': scaler, 'accuracy': accuracy}
+    return export_model(model, scaler, accuracy, X_test, model_filename, fold_tolerance)
+
+def export_model(model, scaler, accuracy, X_test, model_filename, fold_tolerance=FOLD_TOLERANCE):
+    """Build the inference pipeline and save scaler, model and pipeline for a trained model"""
+    
+    # Inference pipeline served by the ML API, with the scaler folded into the trees
+    # (kept separate when folding it changes test probabilities by more than fold_tolerance)
+    pipeline = build_pipeline(model, scaler, metadata={'accuracy': accuracy},
+                              check_features=X_test, tolerance=fold_tolerance)
+    fold_error = pipeline.metadata.get('max_fold_error', 0.0)
+    print(f"Pipeline: scaler {'folded into the trees' if pipeline.fused else 'kept'}, "
+          f"max probability difference of the fold {fold_error:.4f} (tolerance {fold_tolerance})")
+    
+    # One id for the files of this run, so a server never pairs this scaler
+    # with a model from another run
+    scaler.training_id_ = model.training_id_ = uuid.uuid4().hex[:12]
+    
+    # Save scaler, model and pipeline (pipeline last: a watching server reloads on it)
+    scaler_filename, _, pipeline_filename = artifact_filenames(model_filename)
+    dump_atomic(scaler, scaler_filename)
+    dump_atomic(model, model_filename)
+    dump_atomic(pipeline, pipeline_filename)
+    
+    print(f"✅ Saved: {model_filename}, {pipeline_filename}")
+    
+    return {'model': model, 'scaler': scaler, 'pipeline': pipeline, 'accuracy': accuracy}
 
 if __name__ == "__main__":
-    train_climate_models()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Train the flood, drought and heatwave risk models')
+    parser.add_argument('--dataset', default='complete_climate_dataset.csv', help='Training CSV')
+    parser.add_argument('--virtual-rows', type=int, default=None,
+                        help='Train on this many rows generated on the fly (virtual_dataset.py) instead of the CSV')
+    parser.add_argument('--seed', type=int, default=42, help='Seed of the virtual dataset')
+    parser.add_argument('--shard-rows', type=int, default=SHARD_ROWS,
+                        help='Virtual rows generated and trained on at a time (bounds memory)')
+    parser.add_argument('--output-dir', default='.')
+    parser.add_argument('--fold-tolerance', type=float, default=FOLD_TOLERANCE,
+                        help='Keep the scaler separate when folding it changes test probabilities by more than this')
+    args = parser.parse_args()
+
+    dataset = None
+    if args.virtual_rows:
+        from virtual_dataset import complete_climate_dataset
+        dataset = complete_climate_dataset(args.virtual_rows, seed=args.seed)
+    train_climate_models(args.dataset, output_dir=args.output_dir, dataset=dataset,
+                         fold_tolerance=args.fold_tolerance, shard_rows=args.shard_rows)
\ No newline at end of file
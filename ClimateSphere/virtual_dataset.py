@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Virtual Climate Datasets
+Datasets that are never written to disk: any row range is generated on
+demand, deterministically from (seed, row index), with a counter-based
+random generator (Philox).
+
+Rows are grouped in fixed-size blocks. Block ``b`` draws from Philox keyed by
+the seed with the counter starting at ``b << 192``, so a block can be
+regenerated on its own, on any worker, without generating the blocks before
+it. Memory is bounded by the block size.
+
+    python virtual_dataset.py --dataset complete --rows 10000000 --start 5000000 --stop 5000005
+"""
+
+import argparse
+import functools
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Rows per block; part of what the seed reproduces (changing it changes the rows)
+BLOCK_ROWS = 65536
+
+# Fixed reference date for generators that date records relative to "today",
+# so a virtual dataset does not change from one day to the next
+REFERENCE_DATE = '2025-01-01'
+
+MODEL4_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'model_one_three_four', 'One_Earth', 'Model 4')
+
+
+class VirtualDataset:
+    """Rows ``0 .. n_rows-1`` produced by ``records(n_rows, rng)`` block by block.
+
+    ``records`` returns a DataFrame of ``n_rows`` records drawn from the
+    ``np.random.Generator`` it is given; it must be picklable (a module-level
+    function or a ``functools.partial`` of one) for the dataset to be sent to
+    worker processes.
+    """
+
+    def __init__(self, records, n_rows, seed=42, block_rows=BLOCK_ROWS):
+        if n_rows < 0 or block_rows < 1:
+            raise ValueError('n_rows must be >= 0 and block_rows >= 1')
+        self.records = records
+        self.n_rows = int(n_rows)
+        self.seed = seed
+        self.block_rows = int(block_rows)
+        self.key = np.random.SeedSequence(seed).generate_state(2, np.uint64)
+
+    def __len__(self):
+        return self.n_rows
+
+    @property
+    def n_blocks(self):
+        return -(-self.n_rows // self.block_rows)
+
+    def block_rng(self, block):
+        """Generator for one block: Philox with the block index in the counter's top word"""
+        counter = np.array([0, 0, 0, block], dtype=np.uint64)
+        return np.random.Generator(np.random.Philox(counter=counter, key=self.key))
+
+    def block(self, block):
+        """All rows of one block, indexed by their row numbers"""
+        if not 0 <= block < self.n_blocks:
+            raise IndexError(f'Block {block} out of range (0-{self.n_blocks - 1})')
+        start = block * self.block_rows
+        stop = min(start + self.block_rows, self.n_rows)
+        df = self.records(stop - start, self.block_rng(block))
+        df.index = pd.RangeIndex(start, stop)
+        return df
+
+    def iter_chunks(self, start=0, stop=None):
+        """Yield rows ``start .. stop-1`` as one DataFrame per block (partial at the ends)"""
+        stop = self.n_rows if stop is None else min(stop, self.n_rows)
+        if start < 0 or start > stop:
+            raise IndexError(f'Row range {start}-{stop} out of range (0-{self.n_rows})')
+        for block in range(start // self.block_rows, -(-stop // self.block_rows)):
+            df = self.block(block)
+            first = block * self.block_rows
+            if start > first or stop < first + len(df):
+                df = df.iloc[max(start - first, 0):stop - first]
+            yield df
+
+    def __iter__(self):
+        return self.iter_chunks()
+
+    def rows(self, start, stop):
+        """Rows ``start .. stop-1`` as one DataFrame"""
+        return self.to_frame(start=start, stop=stop)
+
+    def shard(self, index, count):
+        """Block-aligned row range ``(start, stop)`` of shard ``index`` out of ``count``"""
+        if not 0 <= index < count:
+            raise IndexError(f'Shard {index} out of range (0-{count - 1})')
+        blocks = np.array_split(np.arange(self.n_blocks), count)[index]
+        if not len(blocks):
+            return self.n_rows, self.n_rows
+        return int(blocks[0]) * self.block_rows, min((int(blocks[-1]) + 1) * self.block_rows, self.n_rows)
+
+    def to_frame(self, columns=None, start=0, stop=None, dtypes=None):
+        """Materialize ``columns`` (default all) of a row range, chunk by chunk.
+
+        Only the requested columns are kept, in arrays allocated once, so
+        peak memory is the result plus one block. ``dtypes`` overrides the
+        dtype of some columns (e.g. ``np.float32`` for features).
+        """
+        stop = self.n_rows if stop is None else min(stop, self.n_rows)
+        arrays = None
+        offset = 0
+        for chunk in self.iter_chunks(start, stop):
+            if arrays is None:
+                columns = list(columns or chunk.columns)
+                arrays = {column: np.empty(stop - start, dtype=(dtypes or {}).get(column, chunk[column].to_numpy().dtype))
+                          for column in columns}
+            for column in columns:
+                arrays[column][offset:offset + len(chunk)] = chunk[column].to_numpy()
+            offset += len(chunk)
+        if arrays is None:
+            return pd.DataFrame(columns=list(columns or []))
+        return pd.DataFrame(arrays, index=pd.RangeIndex(start, stop))
+
+
+# ---------------------------------------------------------------------------
+# Virtual versions of the repository's generators
+# ---------------------------------------------------------------------------
+
+def _complete_records(n_rows, rng, today):
+    from create_complete_dataset import generate_climate_records
+    return generate_climate_records(n_rows, today=today, rng=rng)
+
+
+def _synthetic_records(n_rows, rng, regions, days, end_date):
+    from generate_synthetic_data import select_regions, synthetic_records
+    return synthetic_records(n_rows, select_regions(regions), np.datetime64(end_date, 'D'), days, rng)
+
+
+def _whatif_records(n_rows, rng, noise_ratio, missing_ratio):
+    if MODEL4_DIR not in sys.path:
+        sys.path.insert(0, MODEL4_DIR)
+    from synthetic_data_generator import generate_climate_dataset
+    # The Model 4 generator uses the RandomState API; run it over the block's Philox stream
+    return generate_climate_dataset(n_rows, rng=np.random.RandomState(rng.bit_generator),
+                                    noise_ratio=noise_ratio, missing_ratio=missing_ratio, verbose=False)
+
+
+def complete_climate_dataset(n_rows, seed=42, today=REFERENCE_DATE, block_rows=BLOCK_ROWS):
+    """create_complete_dataset.py records (risk model training data)"""
+    return VirtualDataset(functools.partial(_complete_records, today=today), n_rows, seed, block_rows)
+
+
+def synthetic_climate_dataset(n_rows, seed=42, regions=None, days=365 * 5, end_date=REFERENCE_DATE,
+                              block_rows=BLOCK_ROWS):
+    """generate_synthetic_data.py records"""
+    return VirtualDataset(functools.partial(_synthetic_records, regions=regions, days=days, end_date=end_date),
+                          n_rows, seed, block_rows)
+
+
+def whatif_dataset(n_rows, seed=42, noise_ratio=0.07, missing_ratio=0.02, block_rows=BLOCK_ROWS):
+    """Model 4 synthetic_data_generator.py records (noise and missing values applied per block)"""
+    return VirtualDataset(functools.partial(_whatif_records, noise_ratio=noise_ratio, missing_ratio=missing_ratio),
+                          n_rows, seed, block_rows)
+
+
+DATASETS = {
+    'complete': complete_climate_dataset,
+    'synthetic': synthetic_climate_dataset,
+    'whatif': whatif_dataset
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Print a row range of a virtual dataset')
+    parser.add_argument('--dataset', choices=DATASETS, default='complete')
+    parser.add_argument('--rows', type=int, default=1000000, help='Rows in the virtual dataset')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--start', type=int, default=0)
+    parser.add_argument('--stop', type=int, default=None, help='End of the range (default start + 10)')
+    args = parser.parse_args()
+
+    dataset = DATASETS[args.dataset](args.rows, seed=args.seed)
+    stop = args.start + 10 if args.stop is None else args.stop
+    print(f"🌍 Virtual '{args.dataset}' dataset: {len(dataset):,} rows in {dataset.n_blocks:,} blocks")
+    print(dataset.rows(args.start, stop))
@@ -2,17 +2,39 @@
 # Perfect Realistic Synthetic Climate Risk Dataset Generator (1920–2024)
 # Model 2: Risk Probability (Flood, Drought, Heatwave)
 # Author: Krishna Marathe
+#
+# The work is split into shards (one country × block of years). Each shard
+# draws from its own SeedSequence child stream, so the output depends only on
+# the seed and the shard layout, never on the number of worker processes.
+# Shards run in a process pool and each one writes its own partition:
+#
+#   python new_coutry_wise.py                                  # 11 countries × 5 regions, yearly
+#   python new_coutry_wise.py --regions-per-country 200 --resolution daily --workers 8 --no-combine
+#
+# CSV runs also concatenate the partitions into perfect_realistic_climate_risk.csv,
+# the file clean.py reads (--combine FILE to change it, --no-combine to skip).
 # ------------------------------------------------------------
 
+import argparse
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import numpy as np
 import pandas as pd
-import random
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = pq = None
 
 # -----------------------------
 # 1️⃣ Base Configurations
 # -----------------------------
-np.random.seed(42)
-random.seed(42)
+SEED = 42
 
 countries = [
     'India', 'USA', 'China', 'Brazil', 'Australia', 'Russia',
@@ -49,65 +71,12 @@ country_states_cities = {
 
 years = list(range(1920, 2025))
 
-# -----------------------------
-# 2️⃣ Risk Classification
-# -----------------------------
-def classify_risk(score):
-    if score < 35:
-        return 'Low'
-    elif score < 70:
-        return 'Medium'
-    else:
-        return 'High'
+RESOLUTIONS = ('yearly', 'monthly', 'daily')
 
-# -----------------------------
-# 3️⃣ Generate Realistic Synthetic Data
-# -----------------------------
-data = []
-
-for country in countries:
-    base_lat, base_lon = country_coords[country]
-    states_cities = country_states_cities[country]
-
-    for year in years:
-        for region in states_cities:
-            # Regional coordinates with slight variation
-            lat = base_lat + np.random.uniform(-0.5, 0.5)
-            lon = base_lon + np.random.uniform(-0.5, 0.5)
-
-            # Climate features with realistic trends
-            temperature = np.random.normal(20 + 0.03*(year-1920), 8)  # warming trend
-            rainfall = np.random.normal(150, 60)
-            rainfall = max(rainfall, 10)
-            soil_moisture = np.clip(0.05 + 0.005*rainfall + np.random.normal(0,0.05), 0.05, 0.7)
-            humidity = np.clip(30 + 0.2*rainfall + np.random.normal(0,10), 20, 95)
-            wind_speed = np.clip(np.random.normal(10,5), 0, 25)
-            co2_level = 280 + 0.5*(year-1920) + np.random.normal(0,5)
-            evaporation = max(np.random.normal(5,2), 0.5)
-            rainfall_lag = rainfall - np.random.normal(0, 15)
-
-            # Introduce region-specific variation factors
-            region_factor = np.random.uniform(0.8, 1.5)
-            year_factor = 1 + 0.005*(year-1920)
-
-            # Risk Scores (Realistic fluctuations)
-            flood_risk = np.clip((rainfall * soil_moisture / (evaporation+0.1)) * region_factor + np.random.normal(0,5), 0, 100)
-            drought_risk = np.clip((temperature / (rainfall+1) * (1-soil_moisture) * 10) * region_factor + np.random.normal(0,5), 0, 100)
-            heatwave_risk = np.clip((temperature * (1-humidity/100) * (co2_level/400) * 5) * region_factor * year_factor + np.random.normal(0,5), 0, 100)
-
-            data.append([
-                country, region, year, lat, lon,
-                round(rainfall,2), round(temperature,2), round(soil_moisture,3),
-                round(humidity,2), round(wind_speed,2), round(co2_level,2),
-                round(evaporation,2), round(rainfall_lag,2),
-                round(flood_risk,2), classify_risk(flood_risk),
-                round(drought_risk,2), classify_risk(drought_risk),
-                round(heatwave_risk,2), classify_risk(heatwave_risk)
-            ])
+# Seasonal temperature swing (°C) added to monthly and daily rows; peaks in
+# mid-July in the northern hemisphere and mid-January in the southern one
+SEASONAL_AMPLITUDE = 6.0
 
-# -----------------------------
-# 4️⃣ Columns
-# -----------------------------
 columns = [
     'Country', 'Region', 'Year', 'Latitude', 'Longitude',
     'Rainfall_mm', 'Temperature_C', 'Soil_Moisture', 'Humidity_%', 'Wind_Speed_mps', 'CO2_ppm', 'Evaporation_mm_day', 'Rainfall_Lag_mm',
@@ -116,11 +85,261 @@ columns = [
     'HeatwaveRisk_Score', 'HeatwaveRisk_Level'
 ]
 
-df = pd.DataFrame(data, columns=columns)
+# -----------------------------
+# 2️⃣ Risk Classification
+# -----------------------------
+# Scores below LOW_RISK_BELOW are Low, below HIGH_RISK_FROM Medium, the rest High
+LOW_RISK_BELOW = 35
+HIGH_RISK_FROM = 70
+
+
+def classify_risk_levels(scores):
+    """Low / Medium / High label for each risk score of an array"""
+    return np.where(scores < LOW_RISK_BELOW, 'Low', np.where(scores < HIGH_RISK_FROM, 'Medium', 'High')).astype(object)
+
+
+def country_regions(country, regions_per_country=None):
+    """Region names for a country; beyond the named ones, numbered regions are added"""
+    named = country_states_cities[country]
+    if regions_per_country is None:
+        return list(named)
+    if regions_per_country <= len(named):
+        return named[:regions_per_country]
+    return named + [f'{country} Region {i}' for i in range(len(named) + 1, regions_per_country + 1)]
+
+
+def year_periods(year, resolution):
+    """Period columns and season phase (0-1 through the year) for one year's rows"""
+    if resolution == 'yearly':
+        return {}, None
+    if resolution == 'monthly':
+        months = np.arange(1, 13)
+        return {'Month': months}, (months - 0.5) / 12
+    dates = np.arange(np.datetime64(f'{year}-01-01'), np.datetime64(f'{year + 1}-01-01'))
+    day_of_year = (dates - dates[0]).astype(int)
+    return {'Date': dates}, (day_of_year + 0.5) / len(dates)
+
 
 # -----------------------------
-# 5️⃣ Save Dataset
+# 3️⃣ Generate Realistic Synthetic Data
 # -----------------------------
-df.to_csv("perfect_realistic_climate_risk.csv", index=False)
-print("✅ Perfect dataset saved as 'perfect_realistic_climate_risk.csv'")
-print(df.head())
+def generate_year(country, year, regions, resolution, rng):
+    """All rows of one country and year (period by period, region by region)"""
+    base_lat, base_lon = country_coords[country]
+    period_columns, phase = year_periods(year, resolution)
+    n_periods = 1 if phase is None else len(phase)
+    n = n_periods * len(regions)
+
+    # Regional coordinates with slight variation
+    lat = base_lat + rng.uniform(-0.5, 0.5, n)
+    lon = base_lon + rng.uniform(-0.5, 0.5, n)
+
+    # Climate features with realistic trends
+    temperature = rng.normal(20 + 0.03*(year-1920), 8, n)  # warming trend
+    if phase is not None:
+        season = np.cos(2 * np.pi * (phase - 0.54)) * SEASONAL_AMPLITUDE * np.sign(base_lat)
+        temperature += np.repeat(season, len(regions))
+    rainfall = np.maximum(rng.normal(150, 60, n), 10)
+    soil_moisture = np.clip(0.05 + 0.005*rainfall + rng.normal(0, 0.05, n), 0.05, 0.7)
+    humidity = np.clip(30 + 0.2*rainfall + rng.normal(0, 10, n), 20, 95)
+    wind_speed = np.clip(rng.normal(10, 5, n), 0, 25)
+    co2_level = 280 + 0.5*(year-1920) + rng.normal(0, 5, n)
+    evaporation = np.maximum(rng.normal(5, 2, n), 0.5)
+    rainfall_lag = rainfall - rng.normal(0, 15, n)
+
+    # Introduce region-specific variation factors
+    region_factor = rng.uniform(0.8, 1.5, n)
+    year_factor = 1 + 0.005*(year-1920)
+
+    # Risk Scores (Realistic fluctuations)
+    flood_risk = np.clip((rainfall * soil_moisture / (evaporation+0.1)) * region_factor + rng.normal(0, 5, n), 0, 100)
+    drought_risk = np.clip((temperature / (rainfall+1) * (1-soil_moisture) * 10) * region_factor + rng.normal(0, 5, n), 0, 100)
+    heatwave_risk = np.clip((temperature * (1-humidity/100) * (co2_level/400) * 5) * region_factor * year_factor + rng.normal(0, 5, n), 0, 100)
+
+    df = pd.DataFrame({
+        'Country': np.full(n, country, dtype=object),
+        'Region': np.tile(np.array(regions, dtype=object), n_periods),
+        'Year': np.full(n, year),
+        'Latitude': lat, 'Longitude': lon,
+        'Rainfall_mm': rainfall.round(2), 'Temperature_C': temperature.round(2), 'Soil_Moisture': soil_moisture.round(3),
+        'Humidity_%': humidity.round(2), 'Wind_Speed_mps': wind_speed.round(2), 'CO2_ppm': co2_level.round(2),
+        'Evaporation_mm_day': evaporation.round(2), 'Rainfall_Lag_mm': rainfall_lag.round(2),
+        'FloodRisk_Score': flood_risk.round(2), 'FloodRisk_Level': classify_risk_levels(flood_risk),
+        'DroughtRisk_Score': drought_risk.round(2), 'DroughtRisk_Level': classify_risk_levels(drought_risk),
+        'HeatwaveRisk_Score': heatwave_risk.round(2), 'HeatwaveRisk_Level': classify_risk_levels(heatwave_risk)
+    })
+    # Period columns go right after Year
+    for offset, (name, values) in enumerate(period_columns.items(), start=3):
+        df.insert(offset, name, np.repeat(values, len(regions)))
+    return df
+
+
+def plan_shards(years_per_shard=10, selected_countries=None, first_year=years[0], last_year=years[-1]):
+    """(country, first year, last year) for every shard, in a fixed order"""
+    shards = []
+    for country in selected_countries or countries:
+        for start in range(first_year, last_year + 1, years_per_shard):
+            shards.append((country, start, min(start + years_per_shard - 1, last_year)))
+    return shards
+
+
+def shard_path(output_dir, shard, file_format):
+    country, start, end = shard
+    return os.path.join(output_dir, f'Country={country}', f'{start}-{end}.{file_format}')
+
+
+def write_shard(shard, seed_sequence, output_dir, regions_per_country=None, resolution='yearly', file_format='csv'):
+    """Generate one shard year by year and write it to its partition file; returns the row count"""
+    country, start, end = shard
+    rng = np.random.default_rng(seed_sequence)
+    regions = country_regions(country, regions_per_country)
+    path = shard_path(output_dir, shard, file_format)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_file = f'{path}.{os.getpid()}.tmp'
+
+    frames = (generate_year(country, year, regions, resolution, rng) for year in range(start, end + 1))
+    rows = 0
+    writer = None
+    try:
+        if file_format == 'parquet':
+            try:
+                for df in frames:
+                    table = pa.Table.from_pandas(df, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(tmp_file, table.schema)
+                    writer.write_table(table)
+                    rows += len(df)
+            finally:
+                if writer is not None:
+                    writer.close()
+        else:
+            with open(tmp_file, 'w', newline='') as f:
+                for df in frames:
+                    df.to_csv(f, header=rows == 0, index=False)
+                    rows += len(df)
+        os.replace(tmp_file, path)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    return rows
+
+
+def generate_dataset(output_dir='perfect_realistic_climate_risk', seed=SEED, regions_per_country=None,
+                     resolution='yearly', years_per_shard=10, workers=None, file_format='csv',
+                     selected_countries=None):
+    """Generate every shard in a process pool and write the partitioned dataset.
+
+    Shard ``i`` uses child ``i`` of ``SeedSequence(seed)``, so the same seed
+    and shard layout give the same files whatever ``workers`` is. A
+    ``_manifest.json`` listing the shards and their row counts is written
+    last. Returns the manifest.
+    """
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"Unknown resolution '{resolution}' (expected one of {', '.join(RESOLUTIONS)})")
+    if file_format not in ('csv', 'parquet'):
+        raise ValueError(f"Unknown format '{file_format}' (expected csv or parquet)")
+    if file_format == 'parquet' and pq is None:
+        raise RuntimeError('Parquet output needs pyarrow (pip install pyarrow)')
+    unknown = sorted(set(selected_countries or []) - set(countries))
+    if unknown:
+        raise ValueError(f"Unknown countries: {', '.join(unknown)}")
+
+    shards = plan_shards(years_per_shard, selected_countries)
+    seeds = np.random.SeedSequence(seed).spawn(len(shards))
+    workers = workers or os.cpu_count() or 1
+    # Only ever delete the output of an earlier run (marked by its manifest)
+    if os.path.isdir(output_dir) and os.listdir(output_dir):
+        if not os.path.isfile(os.path.join(output_dir, '_manifest.json')):
+            raise FileExistsError(f"'{output_dir}' is not empty and holds no _manifest.json from an earlier run; "
+                                  f"choose another --output-dir")
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+
+    print(f"🌍 Generating {len(shards)} shards ({resolution}) with {workers} worker(s)...")
+    started = time.time()
+    row_counts = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(write_shard, shard, shard_seed, output_dir, regions_per_country, resolution, file_format): shard
+            for shard, shard_seed in zip(shards, seeds)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            row_counts[futures[future]] = future.result()
+            if done % max(1, len(shards) // 10) == 0 or done == len(shards):
+                print(f"   {done}/{len(shards)} shards, {sum(row_counts.values()):,} rows")
+
+    manifest = {
+        'seed': seed,
+        'resolution': resolution,
+        'regions_per_country': regions_per_country,
+        'years_per_shard': years_per_shard,
+        'format': file_format,
+        'rows': sum(row_counts.values()),
+        'shards': [
+            {'country': shard[0], 'first_year': shard[1], 'last_year': shard[2],
+             'path': os.path.relpath(shard_path(output_dir, shard, file_format), output_dir),
+             'rows': row_counts[shard]}
+            for shard in shards
+        ]
+    }
+    with open(os.path.join(output_dir, '_manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"✅ {manifest['rows']:,} rows written to '{output_dir}/' in {time.time() - started:.1f}s")
+    return manifest
+
+
+def combine_partitions(output_dir, output_file):
+    """Concatenate the CSV partitions, in shard order, into one CSV file"""
+    with open(os.path.join(output_dir, '_manifest.json')) as f:
+        manifest = json.load(f)
+    if manifest['format'] != 'csv':
+        raise ValueError('Only CSV partitions can be combined')
+    tmp_file = f'{output_file}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_file, 'wb') as out:
+            for index, shard in enumerate(manifest['shards']):
+                with open(os.path.join(output_dir, shard['path']), 'rb') as part:
+                    header = part.readline()
+                    if index == 0:
+                        out.write(header)
+                    shutil.copyfileobj(part, out)
+        os.replace(tmp_file, output_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    print(f"✅ Combined dataset saved as '{output_file}'")
+
+
+# -----------------------------
+# 4️⃣ Save Dataset
+# -----------------------------
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate the 1920–2024 country climate risk dataset')
+    parser.add_argument('--output-dir', default='perfect_realistic_climate_risk', help='Directory for the partitioned output')
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--regions-per-country', type=int, default=None,
+                        help='Regions per country (default: the 5 named ones; more adds numbered regions)')
+    parser.add_argument('--resolution', choices=RESOLUTIONS, default='yearly')
+    parser.add_argument('--years-per-shard', type=int, default=10)
+    parser.add_argument('--countries', default=None, help='Comma-separated subset of countries')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: one per CPU)')
+    parser.add_argument('--format', choices=('csv', 'parquet'), default='csv')
+    parser.add_argument('--combine', default='perfect_realistic_climate_risk.csv', metavar='FILE',
+                        help='Also concatenate the CSV partitions into FILE, the file clean.py reads '
+                             '(default: perfect_realistic_climate_risk.csv)')
+    parser.add_argument('--no-combine', action='store_true', help='Only write the partitions')
+    args = parser.parse_args()
+
+    generate_dataset(
+        output_dir=args.output_dir,
+        seed=args.seed,
+        regions_per_country=args.regions_per_country,
+        resolution=args.resolution,
+        years_per_shard=args.years_per_shard,
+        workers=args.workers,
+        file_format=args.format,
+        selected_countries=args.countries.split(',') if args.countries else None
+    )
+    if args.format == 'csv' and not args.no_combine:
+        combine_partitions(args.output_dir, args.combine)
+        print(pd.read_csv(args.combine, nrows=5))
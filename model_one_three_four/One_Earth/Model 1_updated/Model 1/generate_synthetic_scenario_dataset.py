@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+import argparse
 import os
 
 # -----------------------------
@@ -39,59 +40,73 @@ slider_columns = [
     "Reforestation_Percent",
     "Water_Conservation_Percent"
 ]
+SLIDER = {col: i for i, col in enumerate(slider_columns)}
 
-# -----------------------------
-# LOAD BASE DATA
-# -----------------------------
-df_base = pd.read_csv(base_dataset_path)
+prediction_columns = ["Pred_Temperature_C", "Pred_CO2_ppm", "Pred_Rainfall_mm"]
 
-# For simplicity, pick columns from base dataset
-# Ensure it has 'Pred_Temperature_C', 'Pred_CO2_ppm', 'Pred_Rainfall_mm'
-if not all(col in df_base.columns for col in ["Pred_Temperature_C", "Pred_CO2_ppm", "Pred_Rainfall_mm"]):
-    raise ValueError("Base dataset must contain 'Pred_Temperature_C', 'Pred_CO2_ppm', 'Pred_Rainfall_mm'")
 
 # -----------------------------
 # GENERATE SYNTHETIC SCENARIO DATA
 # -----------------------------
-rows = []
-
-for country, cities in regions_cities.items():
-    for city in cities:
-        for year in years:
-            for month in months:
-                # pick random base row from Model 1 dataset
-                base_row = df_base.sample(1).iloc[0]
-
-                # random slider values
-                sliders = {col: np.random.uniform(0, 100) for col in slider_columns}
-
-                # compute scenario impact
-                ΔTemp = -0.02 * sliders["CO2_Reduction_Percent"] + 0.01 * sliders["Urban_Heat_Control_Percent"]
-                ΔCO2 = -0.05 * sliders["CO2_Reduction_Percent"] + 0.01 * sliders["Forest_Expansion_Percent"]
-                ΔRainfall = 0.03 * sliders["Reforestation_Percent"] - 0.02 * sliders["Deforestation_Reduction_Percent"]
-
-                # predicted outputs
-                Pred_Temperature_C = base_row["Pred_Temperature_C"] + ΔTemp
-                Pred_CO2_ppm = base_row["Pred_CO2_ppm"] + ΔCO2
-                Pred_Rainfall_mm = base_row["Pred_Rainfall_mm"] + ΔRainfall
-
-                row = {
-                    "Country": country,
-                    "State/City": city,
-                    "Year": year,
-                    "Month": month,
-                    **sliders,
-                    "Pred_Temperature_C": Pred_Temperature_C,
-                    "Pred_CO2_ppm": Pred_CO2_ppm,
-                    "Pred_Rainfall_mm": Pred_Rainfall_mm,
-                }
-
-                rows.append(row)
-
-# create dataframe
-df_synthetic = pd.DataFrame(rows)
-
-# save
-df_synthetic.to_csv(output_dataset_path, index=False)
-print(f"✅ Synthetic scenario dataset saved at {output_dataset_path}")
-print(f"Shape: {df_synthetic.shape}")
+def generate_scenarios(df_base, regions_cities=regions_cities, years=years, months=months,
+                       draws_per_month=1, seed=None):
+    """One row per country × city × year × month × draw, built with array operations.
+
+    Each row takes a random base row from ``df_base`` and random slider
+    values (0-100), and shifts the base predictions by the scenario impact.
+    """
+    # Ensure it has 'Pred_Temperature_C', 'Pred_CO2_ppm', 'Pred_Rainfall_mm'
+    if not all(col in df_base.columns for col in prediction_columns):
+        raise ValueError("Base dataset must contain 'Pred_Temperature_C', 'Pred_CO2_ppm', 'Pred_Rainfall_mm'")
+
+    rng = np.random.default_rng(seed)
+    places = [(country, city) for country, cities in regions_cities.items() for city in cities]
+    per_place = len(years) * len(months) * draws_per_month
+    n = len(places) * per_place
+
+    # pick random base rows from Model 1 dataset
+    base = df_base[prediction_columns].to_numpy(dtype=float)[rng.integers(len(df_base), size=n)]
+
+    # random slider values
+    sliders = rng.uniform(0, 100, size=(n, len(slider_columns)))
+
+    # compute scenario impact
+    ΔTemp = -0.02 * sliders[:, SLIDER["CO2_Reduction_Percent"]] + 0.01 * sliders[:, SLIDER["Urban_Heat_Control_Percent"]]
+    ΔCO2 = -0.05 * sliders[:, SLIDER["CO2_Reduction_Percent"]] + 0.01 * sliders[:, SLIDER["Forest_Expansion_Percent"]]
+    ΔRainfall = 0.03 * sliders[:, SLIDER["Reforestation_Percent"]] - 0.02 * sliders[:, SLIDER["Deforestation_Reduction_Percent"]]
+
+    df = pd.DataFrame({
+        "Country": np.repeat(np.array([country for country, _ in places], dtype=object), per_place),
+        "State/City": np.repeat(np.array([city for _, city in places], dtype=object), per_place),
+        "Year": np.tile(np.repeat(years, len(months) * draws_per_month), len(places)),
+        "Month": np.tile(np.repeat(months, draws_per_month), len(places) * len(years)),
+    })
+    df[slider_columns] = sliders
+
+    # predicted outputs
+    df["Pred_Temperature_C"] = base[:, 0] + ΔTemp
+    df["Pred_CO2_ppm"] = base[:, 1] + ΔCO2
+    df["Pred_Rainfall_mm"] = base[:, 2] + ΔRainfall
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the synthetic Model 1 scenario dataset")
+    parser.add_argument("--base", default=base_dataset_path, help="Base Model 1 dataset with Pred_* columns")
+    parser.add_argument("--output", default=output_dataset_path)
+    parser.add_argument("--draws-per-month", type=int, default=1, help="Slider draws per city and month")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    # -----------------------------
+    # LOAD BASE DATA
+    # -----------------------------
+    df_base = pd.read_csv(args.base)
+
+    # create dataframe
+    df_synthetic = generate_scenarios(df_base, draws_per_month=args.draws_per_month, seed=args.seed)
+
+    # save
+    df_synthetic.to_csv(args.output, index=False)
+    print(f"✅ Synthetic scenario dataset saved at {args.output}")
+    print(f"Shape: {df_synthetic.shape}")
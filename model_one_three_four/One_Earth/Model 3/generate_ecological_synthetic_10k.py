@@ -1,47 +1,32 @@
 # generate_ecological_synthetic_10k.py
 """
-Generates synthetic ecological dataset (~10,000 rows) for:
+Generates synthetic ecological dataset (site × month records, 10,000 rows by default) for:
  - NDVI (monthly-like values)
  - landcover (Forest, Grassland, Urban)
  - species presence (binary) for one example species
  - climate drivers: temp, rainfall, co2, enso, human_disturbance
 Includes controlled noise, missing values, and outliers.
+Every quantity is computed for a whole block of sites at once, and blocks are
+streamed to the CSV, so large monitoring networks fit in memory:
+
+    python generate_ecological_synthetic_10k.py --sites 50000 --months 360 --output ecological_50k_sites.csv
+
 Output: ecological_synthetic_10k.csv
 """
 
+import argparse
+import os
+
 import numpy as np
 import pandas as pd
 
-np.random.seed(42)
-
-n = 10000  # total rows (site-month records, or aggregated samples)
-time_idx = np.arange(n)
-# Simulate site ids to mimic multiple spatial points (e.g., 200 sites repeated in time)
-n_sites = 200
-site_ids = np.tile(np.arange(n_sites), int(np.ceil(n / n_sites)))[:n]
-years = 2000 + (time_idx // 12)  # approximate years
-months = (time_idx % 12) + 1
-
-# Regions/types for sites (assign 200 sites across ecoregions)
+# Regions/types for sites
 ecoregions = ['Tropical', 'Temperate', 'Boreal', 'Savanna', 'Mediterranean']
-site_region = {i: np.random.choice(ecoregions) for i in range(n_sites)}
-regions = [site_region[s] for s in site_ids]
 
 # Baseline per-region NDVI and seasonal amplitude
 region_ndvi_base = {'Tropical': 0.6, 'Temperate': 0.45, 'Boreal': 0.35, 'Savanna': 0.4, 'Mediterranean': 0.38}
 region_ndvi_amp = {'Tropical': 0.05, 'Temperate': 0.12, 'Boreal': 0.08, 'Savanna': 0.2, 'Mediterranean': 0.15}
 
-# Climate drivers (global-ish but with per-site noise)
-co2 = 380 + 0.02 * time_idx + np.random.normal(0, 1.0, n)            # ppm
-enso = np.sin(2 * np.pi * time_idx / 60.0) + np.random.normal(0, 0.2, n)
-temp = 14 + 0.01 * time_idx / 12.0 + 0.5 * enso + np.random.normal(0, 0.8, n)  # local mean temp
-rainfall = 100 + 20 * np.sin(2 * np.pi * months / 12.0) + np.random.normal(0, 15, n)
-
-# Human disturbance index per site (0 no-disturbance - 1 high disturbance)
-site_human_base = {i: np.clip(np.random.beta(2, 5), 0, 1) for i in range(n_sites)}
-human_disturbance = np.array([site_human_base[s] for s in site_ids]) + np.random.normal(0, 0.05, n)
-human_disturbance = np.clip(human_disturbance, 0.0, 1.0)
-
 # Landcover baseline probabilities per region
 land_probs = {
     'Tropical': [0.7, 0.1, 0.2],     # Forest, Grassland, Urban
@@ -52,74 +37,162 @@ land_probs = {
 }
 land_types = ['Forest', 'Grassland', 'Urban']
 
-rows = []
-for i in range(n):
-    s = site_ids[i]
-    reg = regions[i]
-    base_ndvi = region_ndvi_base[reg]
-    amp = region_ndvi_amp[reg]
+# Per-region lookup arrays, indexed by position in ecoregions
+NDVI_BASE = np.array([region_ndvi_base[r] for r in ecoregions])
+NDVI_AMP = np.array([region_ndvi_amp[r] for r in ecoregions])
+LAND_PROBS = np.array([land_probs[r] for r in ecoregions])
+REGION_NAMES = np.array(ecoregions, dtype=object)
+LAND_NAMES = np.array(land_types, dtype=object)
+FOREST = land_types.index('Forest')
+
+# Rows generated per block (rounded to whole sites)
+CHUNK_ROWS = 1_000_000
+
+
+def sample_categories(probs, rng):
+    """One category index per row of an N×K probability matrix (inverse-CDF sampling)"""
+    cdf = np.cumsum(probs, axis=1)
+    u = rng.random(len(probs)) * cdf[:, -1]
+    # Index of the first bucket whose cumulative probability exceeds u
+    return np.minimum((u[:, np.newaxis] >= cdf).sum(axis=1), probs.shape[1] - 1)
+
+
+def site_attributes(n_sites, rng):
+    """Ecoregion index and baseline human disturbance (0 no-disturbance - 1 high) per site"""
+    region_idx = rng.integers(len(ecoregions), size=n_sites)
+    human_base = np.clip(rng.beta(2, 5, n_sites), 0, 1)
+    return region_idx, human_base
+
+
+def simulate_block(sites, n_months, region_idx, human_base, start_year, rng):
+    """Site-month records for ``sites`` (site ids), month by month within each site"""
+    n = len(sites) * n_months
+    t = np.tile(np.arange(n_months), len(sites))    # months since the start
+    site_ids = np.repeat(sites, n_months)
+    reg = np.repeat(region_idx[sites], n_months)
+    site_human = np.repeat(human_base[sites], n_months)
+    years = start_year + t // 12
+    months = t % 12 + 1
+
+    # Climate drivers (global-ish but with per-site noise)
+    co2 = 380 + 0.02 * t + rng.normal(0, 1.0, n)            # ppm
+    enso = np.sin(2 * np.pi * t / 60.0) + rng.normal(0, 0.2, n)
+    temp = 14 + 0.01 * t / 12.0 + 0.5 * enso + rng.normal(0, 0.8, n)  # local mean temp
+    rainfall = 100 + 20 * np.sin(2 * np.pi * months / 12.0) + rng.normal(0, 15, n)
+    human_disturbance = np.clip(site_human + rng.normal(0, 0.05, n), 0.0, 1.0)
 
     # Seasonality
-    season = amp * np.sin(2 * np.pi * (months[i] - 1) / 12.0)
-
+    season = NDVI_AMP[reg] * np.sin(2 * np.pi * (months - 1) / 12.0)
     # Trend: NDVI may slowly decline with rising human_disturbance & temp anomalies
-    ndvi_trend = -0.0005 * (years[i] - 2000) * (site_human_base[s] + 0.5)  # slow decline for disturbed sites
-
+    ndvi_trend = -0.0005 * (years - start_year) * (site_human + 0.5)  # slow decline for disturbed sites
     # instantaneous NDVI influenced by rainfall (positive), temp (neg if too hot), human disturbance (neg)
-    ndvi = base_ndvi + season + 0.001 * (rainfall[i] - 100) - 0.002 * (temp[i] - 14) - 0.2 * human_disturbance[i] + ndvi_trend + np.random.normal(0, 0.03)
-
-    ndvi = float(np.clip(ndvi, -0.1, 0.95))
+    ndvi = (NDVI_BASE[reg] + season + 0.001 * (rainfall - 100) - 0.002 * (temp - 14)
+            - 0.2 * human_disturbance + ndvi_trend + rng.normal(0, 0.03, n))
+    ndvi = np.clip(ndvi, -0.1, 0.95)
 
     # Landcover: start from baseline region probs, but more disturbed sites are more likely to be Grassland/Urban
-    p = np.array(land_probs[reg])
-    p = p * (1 - 0.6 * human_disturbance[i])  # reduce forest prob with disturbance
+    p = LAND_PROBS[reg] * (1 - 0.6 * human_disturbance)[:, np.newaxis]  # reduce forest prob with disturbance
     # add small random fluctuations
-    p = p + np.random.normal(0, 0.02, 3)
-    p = np.clip(p, 0.001, None)
-    p = p / p.sum()
-    land = np.random.choice(land_types, p=p)
+    p = np.clip(p + rng.normal(0, 0.02, (n, 3)), 0.001, None)
+    land = sample_categories(p, rng)
 
     # Species suitability (example species prefers forest + moderate temp + high NDVI)
-    suit = 0.0
-    if land == 'Forest':
-        suit += 0.6
-    suit += 0.2 * (1 - abs((temp[i] - 18) / 6))   # prefers around 18C (tolerance)
-    suit += 0.4 * ndvi
-    suit -= 0.5 * human_disturbance[i]
+    suit = (0.6 * (land == FOREST)
+            + 0.2 * (1 - np.abs((temp - 18) / 6))   # prefers around 18C (tolerance)
+            + 0.4 * ndvi
+            - 0.5 * human_disturbance)
     species_prob = 1 / (1 + np.exp(-5 * (suit - 0.5)))  # logistic squeeze
-    species_presence = np.random.rand() < species_prob
-
-    rows.append({
-        'site_id': int(s),
-        'year': int(years[i]),
-        'month': int(months[i]),
-        'region': reg,
-        'co2_ppm': round(float(co2[i]), 2),
-        'enso': round(float(enso[i]), 3),
-        'temp_c': round(float(temp[i]), 2),
-        'rainfall_mm': round(float(rainfall[i]), 2),
-        'human_disturbance': round(float(human_disturbance[i]), 3),
-        'ndvi': round(ndvi, 3),
-        'landcover': land,
-        'species_presence': int(species_presence)
+    species_presence = rng.random(n) < species_prob
+
+    return pd.DataFrame({
+        'site_id': site_ids,
+        'year': years,
+        'month': months,
+        'region': REGION_NAMES[reg],
+        'co2_ppm': co2.round(2),
+        'enso': enso.round(3),
+        'temp_c': temp.round(2),
+        'rainfall_mm': rainfall.round(2),
+        'human_disturbance': human_disturbance.round(3),
+        'ndvi': ndvi.round(3),
+        'landcover': LAND_NAMES[land],
+        'species_presence': species_presence.astype(int)
     })
 
-df = pd.DataFrame(rows)
-
-# Inject controlled corruption (3% rows) to make pipeline robust
-num_corrupt = int(0.03 * n)
-idxs = np.random.choice(df.index, size=num_corrupt, replace=False)
-# set some ndvi to nan
-df.loc[idxs[: num_corrupt//3], 'ndvi'] = np.nan
-# set some rainfall to negative sentinel
-df.loc[idxs[num_corrupt//3: 2*num_corrupt//3], 'rainfall_mm'] *= -1
-# set some co2 to huge sentinel
-df.loc[idxs[2*num_corrupt//3:], 'co2_ppm'] = 9999.0
-
-# Shuffle rows (simulate arbitrary uploads)
-df = df.sample(frac=1, random_state=42).reset_index(drop=True)
-
-out = "ecological_synthetic_10k.csv"
-df.to_csv(out, index=False)
-print(f"✅ Saved synthetic ecological dataset to {out}. Shape: {df.shape}")
-print(df.head(10))
+
+def corrupt(df, rng, nan_ndvi=0.01, negative_rainfall=0.01, co2_sentinel=0.01):
+    """Inject controlled corruption (fractions of rows) to make the pipeline robust"""
+    counts = [int(ratio * len(df)) for ratio in (nan_ndvi, negative_rainfall, co2_sentinel)]
+    idxs = rng.choice(len(df), size=sum(counts), replace=False)
+    nan_rows, negative_rows, co2_rows = np.split(idxs, np.cumsum(counts)[:2])
+    # set some ndvi to nan
+    df.loc[nan_rows, 'ndvi'] = np.nan
+    # set some rainfall to negative sentinel
+    df.loc[negative_rows, 'rainfall_mm'] *= -1
+    # set some co2 to huge sentinel
+    df.loc[co2_rows, 'co2_ppm'] = 9999.0
+    return df
+
+
+def generate_ecological_dataset(n_sites=200, n_months=50, start_year=2000, seed=42,
+                                nan_ndvi=0.01, negative_rainfall=0.01, co2_sentinel=0.01,
+                                shuffle=True, output_file='ecological_synthetic_10k.csv',
+                                chunk_rows=CHUNK_ROWS):
+    """Simulate ``n_sites`` × ``n_months`` records and write them to ``output_file``.
+
+    Sites are processed in blocks of about ``chunk_rows`` rows; corruption
+    ratios apply to each block and ``shuffle`` shuffles rows within a block
+    (the whole dataset when it fits in one). Returns the row count.
+    """
+    rng = np.random.default_rng(seed)
+    region_idx, human_base = site_attributes(n_sites, rng)
+    sites_per_block = max(1, chunk_rows // n_months)
+
+    tmp_file = f"{output_file}.{os.getpid()}.tmp"
+    rows = 0
+    try:
+        with open(tmp_file, 'w', newline='') as f:
+            for first in range(0, n_sites, sites_per_block):
+                sites = np.arange(first, min(first + sites_per_block, n_sites))
+                df = simulate_block(sites, n_months, region_idx, human_base, start_year, rng)
+                df = corrupt(df, rng, nan_ndvi, negative_rainfall, co2_sentinel)
+                if shuffle:
+                    # Shuffle rows (simulate arbitrary uploads)
+                    df = df.take(rng.permutation(len(df))).reset_index(drop=True)
+                df.to_csv(f, header=rows == 0, index=False)
+                rows += len(df)
+                if n_sites > sites_per_block:
+                    print(f"   {min(first + sites_per_block, n_sites):,}/{n_sites:,} sites, {rows:,} rows")
+        os.replace(tmp_file, output_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    return rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate the synthetic ecological site-month dataset')
+    parser.add_argument('--sites', type=int, default=200, help='Monitoring sites')
+    parser.add_argument('--months', type=int, default=50, help='Months per site')
+    parser.add_argument('--start-year', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--nan-ndvi', type=float, default=0.01, help='Fraction of rows with NDVI set to NaN')
+    parser.add_argument('--negative-rainfall', type=float, default=0.01, help='Fraction of rows with negated rainfall')
+    parser.add_argument('--co2-sentinel', type=float, default=0.01, help='Fraction of rows with CO2 set to 9999')
+    parser.add_argument('--no-shuffle', action='store_true', help='Keep rows in site/month order')
+    parser.add_argument('--output', default='ecological_synthetic_10k.csv')
+    args = parser.parse_args()
+
+    n_rows = generate_ecological_dataset(
+        n_sites=args.sites,
+        n_months=args.months,
+        start_year=args.start_year,
+        seed=args.seed,
+        nan_ndvi=args.nan_ndvi,
+        negative_rainfall=args.negative_rainfall,
+        co2_sentinel=args.co2_sentinel,
+        shuffle=not args.no_shuffle,
+        output_file=args.output
+    )
+    print(f"✅ Saved synthetic ecological dataset to {args.output}. Shape: ({n_rows}, 12)")
+    print(pd.read_csv(args.output, nrows=10))
@@ -6,7 +6,7 @@ from pathlib import Path
 
 warnings.filterwarnings('ignore')
 
-def generate_climate_dataset(num_samples=20000, seed=42, noise_ratio=0.07, missing_ratio=0.02):
+def generate_climate_dataset(num_samples=20000, seed=42, noise_ratio=0.07, missing_ratio=0.02, rng=None, verbose=True):
     """
     Generate robust synthetic climate dataset for ML training.
     
@@ -20,36 +20,43 @@ def generate_climate_dataset(num_samples=20000, seed=42, noise_ratio=0.07, missi
         Proportion of samples to add noise to (0-1)
     missing_ratio : float
         Proportion of missing values per column (0-1)
+    rng : np.random.RandomState, optional
+        Random source to draw from instead of seeding one with ``seed``
+        (e.g. a RandomState over a Philox block stream)
+    verbose : bool
+        Print progress and validation messages
     
     Returns:
     --------
     pd.DataFrame : Clean, validated dataset ready for ML
     """
     
-    np.random.seed(seed)
-    print(f"🔧 Generating {num_samples} samples with {noise_ratio*100}% noise and {missing_ratio*100}% missing values...")
+    # RandomState(seed) draws the same values as np.random.seed(seed) did
+    rng = rng if rng is not None else np.random.RandomState(seed)
+    if verbose:
+        print(f"🔧 Generating {num_samples} samples with {noise_ratio*100}% noise and {missing_ratio*100}% missing values...")
     
     # ============================================================================
     # STEP 1: Generate base features with realistic ranges
     # ============================================================================
     
-    year = np.random.randint(2025, 2100, num_samples)
-    population_growth = np.random.uniform(0, 3.5, num_samples)
-    industrial_growth = np.random.uniform(0, 6, num_samples)
+    year = rng.randint(2025, 2100, num_samples)
+    population_growth = rng.uniform(0, 3.5, num_samples)
+    industrial_growth = rng.uniform(0, 6, num_samples)
     
     # Generate correlated features from the start (not after)
     # This ensures proper bounds
-    co2_base = np.random.uniform(-10, 50, num_samples)
-    co2_change = co2_base + 0.5 * industrial_growth + np.random.normal(0, 1.5, num_samples)
+    co2_base = rng.uniform(-10, 50, num_samples)
+    co2_change = co2_base + 0.5 * industrial_growth + rng.normal(0, 1.5, num_samples)
     co2_change = np.clip(co2_change, -10, 70)  # Keep within original bounds
     
-    deforestation_base = np.random.uniform(0, 70, num_samples)
-    deforestation = deforestation_base + 0.4 * industrial_growth + np.random.normal(0, 2, num_samples)
+    deforestation_base = rng.uniform(0, 70, num_samples)
+    deforestation = deforestation_base + 0.4 * industrial_growth + rng.normal(0, 2, num_samples)
     deforestation = np.clip(deforestation, 0, 90)  # Keep within bounds
     
     # Renewable energy increases over time (realistic trend)
-    renewable_base = np.random.uniform(5, 70, num_samples)
-    renewable = renewable_base + 0.3 * (year - 2025) + np.random.normal(0, 5, num_samples)
+    renewable_base = rng.uniform(5, 70, num_samples)
+    renewable = renewable_base + 0.3 * (year - 2025) + rng.normal(0, 5, num_samples)
     renewable = np.clip(renewable, 0, 100)
     
     # ============================================================================
@@ -63,7 +70,7 @@ def generate_climate_dataset(num_samples=20000, seed=42, noise_ratio=0.07, missi
         0.012 * renewable +
         0.004 * population_growth * industrial_growth +  # interaction term
         0.5 * np.sin((year - 2020) / 10) +              # periodic cycle
-        np.random.normal(0, 0.25, num_samples)
+        rng.normal(0, 0.25, num_samples)
     )
     
     # Risk index (composite measure)
@@ -73,7 +80,7 @@ def generate_climate_dataset(num_samples=20000, seed=42, noise_ratio=0.07, missi
         0.012 * deforestation -
         0.006 * renewable +
         0.003 * industrial_growth +
-        np.random.normal(0, 0.05, num_samples)
+        rng.normal(0, 0.05, num_samples)
     )
     
     # Additional realistic features
@@ -81,23 +88,23 @@ def generate_climate_dataset(num_samples=20000, seed=42, noise_ratio=0.07, missi
         0.15 * temperature_change +
         0.002 * co2_change +
         0.05 * np.log1p(year - 2024) +
-        np.random.normal(0, 0.1, num_samples)
+        rng.normal(0, 0.1, num_samples)
     )
     
     # Extreme weather events (count data)
     extreme_weather_base = (
         2.5 * np.maximum(temperature_change, 0) +
         0.05 * deforestation +
-        np.random.poisson(2, num_samples)
+        rng.poisson(2, num_samples)
     )
-    extreme_weather_events = np.maximum(0, extreme_weather_base + np.random.normal(0, 1, num_samples))
+    extreme_weather_events = np.maximum(0, extreme_weather_base + rng.normal(0, 1, num_samples))
     
     # Biodiversity loss
     biodiversity_loss = (
         0.6 * deforestation +
         0.3 * temperature_change -
         0.1 * renewable +
-        np.random.normal(0, 3, num_samples)
+        rng.normal(0, 3, num_samples)
     )
     
     # ============================================================================
@@ -105,12 +112,12 @@ def generate_climate_dataset(num_samples=20000, seed=42, noise_ratio=0.07, missi
     # ============================================================================
     
     if noise_ratio > 0:
-        error_indices = np.random.choice(num_samples, size=int(noise_ratio * num_samples), replace=False)
+        error_indices = rng.choice(num_samples, size=int(noise_ratio * num_samples), replace=False)
         
         # Add multiplicative noise
-        temperature_change[error_indices] *= np.random.uniform(0.5, 2.0, len(error_indices))
-        risk_index[error_indices] *= np.random.uniform(0.6, 1.8, len(error_indices))
-        sea_level_rise[error_indices] *= np.random.uniform(0.5, 2.2, len(error_indices))
+        temperature_change[error_indices] *= rng.uniform(0.5, 2.0, len(error_indices))
+        risk_index[error_indices] *= rng.uniform(0.6, 1.8, len(error_indices))
+        sea_level_rise[error_indices] *= rng.uniform(0.5, 2.2, len(error_indices))
     
     # ============================================================================
     # STEP 4: Apply bounds AFTER adding noise (critical!)
@@ -146,7 +153,7 @@ def generate_climate_dataset(num_samples=20000, seed=42, noise_ratio=0.07, missi
                           "temperature_change", "risk_index", "sea_level_rise_meters"]
         
         for col in missing_columns:
-            mask = np.random.rand(num_samples) < missing_ratio
+            mask = rng.rand(num_samples) < missing_ratio
             data.loc[mask, col] = np.nan
     
     # ============================================================================
@@ -155,7 +162,8 @@ def generate_climate_dataset(num_samples=20000, seed=42, noise_ratio=0.07, missi
     
     # Check for infinite values
     if np.isinf(data.select_dtypes(include=[np.number]).values).any():
-        print("⚠️  WARNING: Infinite values detected! Replacing with NaN...")
+        if verbose:
+            print("⚠️  WARNING: Infinite values detected! Replacing with NaN...")
         data.replace([np.inf, -np.inf], np.nan, inplace=True)
     
     # Validate ranges
@@ -165,7 +173,8 @@ def generate_climate_dataset(num_samples=20000, seed=42, noise_ratio=0.07, missi
     assert data['temperature_change'].between(-2, 6).all() or data['temperature_change'].isna().any(), "Temperature out of bounds"
     assert data['risk_index'].between(0, 1).all() or data['risk_index'].isna().any(), "Risk index out of bounds"
     
-    print("✅ Data validation passed!")
+    if verbose:
+        print("✅ Data validation passed!")
     
     return data
 